@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark feature_stats.compute_stats against a single-threaded full parse.
+
+The baseline is what verifying a merged output used to mean: ``json.load``
+the whole FeatureCollection and walk it. Each mode runs in a fresh process
+so peak RSS is measured independently.
+"""
+import argparse
+import collections
+import contextlib
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import merge_osm_results
+from bench_merge_osm_results import _peak_rss, _write_synthetic_inputs
+
+
+def _full_parse(path: str) -> int:
+    with open(path, encoding="utf-8") as f:
+        doc = json.load(f)
+    types = collections.Counter()
+    vertices = 0
+    for feature in doc["features"]:
+        geometry = feature.get("geometry") or {}
+        types[geometry.get("type")] += 1
+        vertices += len(geometry.get("coordinates") or ())
+    return len(doc["features"])
+
+
+def _run(path: str, workers: int, queue) -> None:
+    start = time.perf_counter()
+    if workers:
+        from feature_stats import compute_stats
+
+        features = compute_stats(Path(path), workers=workers)[0].features
+    else:
+        features = _full_parse(path)
+    queue.put((time.perf_counter() - start, _peak_rss(), features))
+
+
+def _measure(path: Path, workers: int) -> Dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run, args=(str(path), workers, queue))
+    proc.start()
+    elapsed, peak_rss, features = queue.get()
+    proc.join()
+    return {"elapsed": elapsed, "peak_rss": peak_rss, "features": features}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark parallel feature_stats against a full json.load."
+    )
+    parser.add_argument("--input", help="Merged output to scan (default: synthetic)")
+    parser.add_argument(
+        "--files", type=int, default=4, help="Synthetic files to merge (default: 4)"
+    )
+    parser.add_argument(
+        "--features",
+        type=int,
+        default=50000,
+        help="Features per synthetic file (default: 50000)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, os.cpu_count() or 1}),
+        help="Worker counts to time (default: 1 and all CPUs)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.input:
+            path = Path(args.input)
+        else:
+            input_dir = Path(tmp) / "input"
+            input_dir.mkdir()
+            print(f"Generating {args.files} x {args.features} synthetic features...")
+            _write_synthetic_inputs(input_dir, args.files, args.features)
+            path = Path(tmp) / "merged.geojson"
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                merge_osm_results.merge_geojson(input_dir, path)
+        size = path.stat().st_size
+        print(f"Input: {size / 1e6:.1f} MB ({path})\n")
+
+        modes: List = [("json.load", 0)] + [(f"stats x{n}", n) for n in args.workers]
+        baseline = None
+        for label, workers in modes:
+            result = _measure(path, workers)
+            baseline = baseline or result["elapsed"]
+            print(
+                f"{label:<10} {result['elapsed']:7.2f}s  "
+                f"{size / 1e6 / result['elapsed']:7.1f} MB/s  "
+                f"peak RSS {result['peak_rss'] / 1e6:8.1f} MB  "
+                f"x{baseline / result['elapsed']:5.2f}  "
+                f"({result['features']} features)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark geojson_io backends on the bundled boundary files and on a
+synthetic road FeatureCollection.
+
+For every installed backend this times a full load (read + parse), a load
+through mmap, per-feature dumps (the merge_osm_results hot loop) and a
+whole-document dump. Dumps are timed with ``--compact-json`` output so each
+backend's own serializer is measured. ``scan`` is timed once since only msgspec makes it lazy.
+"""
+import argparse
+import glob
+import os
+import random
+import tempfile
+import timeit
+from pathlib import Path
+
+import geojson_io
+
+_HIGHWAYS = ["primary", "secondary", "tertiary", "residential", "service", "track"]
+
+
+def _synthetic_collection(features: int, vertices: int) -> dict:
+    rng = random.Random(42)
+    items = []
+    for i in range(features):
+        lon = rng.uniform(105.2, 114.6)
+        lat = rng.uniform(-8.8, -5.9)
+        items.append({
+            "type": "Feature",
+            "properties": {
+                "@id": f"way/{i}",
+                "highway": rng.choice(_HIGHWAYS),
+                "name": f"Jalan {i}",
+            },
+            "geometry": {
+                "type": "LineString",
+                "coordinates": [
+                    [round(lon + v * 4e-4, 7), round(lat + v * 2e-4, 7)]
+                    for v in range(vertices)
+                ],
+            },
+        })
+    return {"type": "FeatureCollection", "features": items}
+
+
+def _best(fn, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def _compare(label: str, path: Path, repeat: int) -> None:
+    size = os.path.getsize(path)
+    print(f"📄 {label} ({size / 1e6:.1f} MB)")
+    baseline = None
+    geojson_io.set_compact_output(True)
+    # stdlib first so the speed-up column reads against it.
+    for name in sorted(geojson_io.available_backends(), key=lambda n: n != "stdlib"):
+        geojson_io.set_backend(name)
+        load = _best(lambda: geojson_io.load(path, use_mmap=False), repeat)
+        load_mmap = _best(lambda: geojson_io.load(path, use_mmap=True), repeat)
+        doc = geojson_io.load(path)
+        features = doc.get("features") or [doc]
+        dumps = geojson_io.get_backend().dumps
+        per_feature = _best(lambda: [dumps(f) for f in features], repeat)
+        whole = _best(lambda: geojson_io.dumps(doc), repeat)
+        baseline = baseline or load + per_feature
+        print(
+            f"   {name:<8} load {load * 1000:9.1f} ms ({size / load / 1e6:6.1f} MB/s)  "
+            f"mmap {load_mmap * 1000:9.1f} ms  "
+            f"dumps/feature {per_feature * 1000:9.1f} ms  "
+            f"dump {whole * 1000:9.1f} ms  "
+            f"x{baseline / (load + per_feature):5.2f}"
+        )
+    geojson_io.set_compact_output(False)
+    scan = _best(lambda: geojson_io.scan(path), repeat)
+    print(f"   scan     {scan * 1000:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark geojson_io backends.")
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="GeoJSON files (default: boundaries-provinsi-pulau-jawa/*.geojson)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repeats (default: 3)")
+    parser.add_argument(
+        "--synthetic-features",
+        type=int,
+        default=200_000,
+        help="Features in the synthetic FeatureCollection (default: 200000, 0 to skip)",
+    )
+    parser.add_argument(
+        "--vertices",
+        type=int,
+        default=12,
+        help="Vertices per synthetic LineString (default: 12)",
+    )
+    args = parser.parse_args()
+
+    print(f"Backends: {', '.join(geojson_io.available_backends())}")
+    files = args.files or sorted(glob.glob("boundaries-provinsi-pulau-jawa/*.geojson"))
+    for file_path in files:
+        _compare(file_path, Path(file_path), args.repeat)
+
+    if args.synthetic_features:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "synthetic.geojson"
+            geojson_io.set_backend("stdlib")
+            geojson_io.dump(
+                _synthetic_collection(args.synthetic_features, args.vertices), path
+            )
+            _compare(
+                f"synthetic FeatureCollection ({args.synthetic_features} features)",
+                path,
+                max(1, args.repeat),
+            )
+
+
+if __name__ == "__main__":
+    main()
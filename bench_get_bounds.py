@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark split_geojson.get_bounds against the previous list-based version.
+"""
+import argparse
+import glob
+import timeit
+import tracemalloc
+
+from split_geojson import get_bounds, load_geojson
+
+
+def get_bounds_lists(geom):
+    """Previous implementation: flatten every ring into Python lists."""
+    coords = []
+
+    if geom['type'] == 'MultiPolygon':
+        for polygon in geom['coordinates']:
+            for ring in polygon:
+                coords.extend(ring)
+    elif geom['type'] == 'Polygon':
+        for ring in geom['coordinates']:
+            coords.extend(ring)
+
+    lons = [c[0] for c in coords]
+    lats = [c[1] for c in coords]
+
+    return min(lons), min(lats), max(lons), max(lats)
+
+
+def _synthetic_geometry(polygons, vertices):
+    return {
+        'type': 'MultiPolygon',
+        'coordinates': [
+            [[[105.0 + p * 1e-3 + v * 1e-6, -8.0 + v * 1e-6] for v in range(vertices)]]
+            for p in range(polygons)
+        ],
+    }
+
+
+def _peak_bytes(fn, geom):
+    tracemalloc.start()
+    fn(geom)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def _compare(label, geom, repeat):
+    print(f"📄 {label}")
+    assert get_bounds(geom) == get_bounds_lists(geom), "bounds differ"
+    for name, fn in (("lists", get_bounds_lists), ("numpy", get_bounds)):
+        elapsed = min(timeit.repeat(lambda: fn(geom), number=1, repeat=repeat))
+        print(
+            f"   {name:<6} {elapsed * 1000:9.3f} ms  "
+            f"peak alloc {_peak_bytes(fn, geom) / 1024:10.1f} KB"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark get_bounds implementations.")
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="GeoJSON files (default: boundaries-provinsi-pulau-jawa/*.geojson)",
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Timing repeats (default: 20)")
+    parser.add_argument(
+        "--synthetic-vertices",
+        type=int,
+        default=2_000_000,
+        help="Vertices in the synthetic MultiPolygon (default: 2000000, 0 to skip)",
+    )
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob("boundaries-provinsi-pulau-jawa/*.geojson"))
+    for file_path in files:
+        data = load_geojson(file_path)
+        _compare(file_path, data.get('geometry', data), args.repeat)
+
+    if args.synthetic_vertices:
+        polygons = 1000
+        geom = _synthetic_geometry(polygons, args.synthetic_vertices // polygons)
+        _compare(
+            f"synthetic MultiPolygon ({args.synthetic_vertices} vertices)",
+            geom,
+            max(1, args.repeat // 10),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark merge_osm_results: full json.load merge vs streaming merge.
+
+Each mode runs in a fresh process so peak RSS is measured independently.
+"""
+import argparse
+import contextlib
+import filecmp
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import merge_osm_results
+
+_HIGHWAYS = ["primary", "secondary", "tertiary", "residential", "service", "track"]
+
+
+def _write_synthetic_inputs(input_dir: Path, files: int, features: int) -> None:
+    rng = random.Random(42)
+    for idx in range(files):
+        collection = {
+            "type": "FeatureCollection",
+            "generator": "overpass-turbo",
+            "features": [],
+        }
+        for n in range(features):
+            lon = 105.2 + rng.random() * 9.2
+            lat = -8.8 + rng.random() * 3.0
+            coords = [
+                [round(lon + i * 0.0004, 7), round(lat + rng.uniform(-2e-4, 2e-4), 7)]
+                for i in range(rng.randint(2, 40))
+            ]
+            way_id = idx * features + n
+            collection["features"].append({
+                "type": "Feature",
+                "properties": {
+                    "@id": f"way/{way_id}",
+                    "highway": rng.choice(_HIGHWAYS),
+                    "name": f"Jalan {way_id % 997}",
+                },
+                "geometry": {"type": "LineString", "coordinates": coords},
+                "id": f"way/{way_id}",
+            })
+        path = input_dir / f"synthetic_{idx:02d}.geojson"
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(collection, f, ensure_ascii=False)
+
+
+def _peak_rss() -> int:
+    # VmHWM resets on exec, unlike ru_maxrss which inherits the parent's peak.
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _run_merge(input_dir: str, output_file: str, stream: bool, queue) -> None:
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        merge_osm_results.merge_geojson(Path(input_dir), Path(output_file), stream=stream)
+        elapsed = time.perf_counter() - start
+    queue.put((elapsed, _peak_rss()))
+
+
+def _measure(input_dir: Path, output_file: Path, stream: bool) -> Dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(
+        target=_run_merge, args=(str(input_dir), str(output_file), stream, queue)
+    )
+    proc.start()
+    elapsed, peak_rss = queue.get()
+    proc.join()
+    return {"elapsed": elapsed, "peak_rss": peak_rss}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark full-load vs streaming merge_osm_results.merge_geojson."
+    )
+    parser.add_argument(
+        "--input-dir",
+        help="Directory with .geojson inputs (default: generate synthetic data)",
+    )
+    parser.add_argument(
+        "--files", type=int, default=4, help="Synthetic files to generate (default: 4)"
+    )
+    parser.add_argument(
+        "--features",
+        type=int,
+        default=50000,
+        help="Features per synthetic file (default: 50000)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        if args.input_dir:
+            input_dir = Path(args.input_dir)
+        else:
+            input_dir = tmp_dir / "input"
+            input_dir.mkdir()
+            print(f"Generating {args.files} x {args.features} synthetic features...")
+            _write_synthetic_inputs(input_dir, args.files, args.features)
+
+        input_bytes = sum(p.stat().st_size for p in input_dir.glob("*.geojson"))
+        print(f"Input: {input_bytes / 1e6:.1f} MB in {input_dir}\n")
+
+        outputs: List[Path] = []
+        for label, stream in (("full-load", False), ("streaming", True)):
+            output_file = tmp_dir / f"{label}.geojson"
+            result = _measure(input_dir, output_file, stream)
+            outputs.append(output_file)
+            mb_per_s = input_bytes / 1e6 / result["elapsed"]
+            print(
+                f"{label:<10} {result['elapsed']:7.2f}s  "
+                f"{mb_per_s:7.1f} MB/s  peak RSS {result['peak_rss'] / 1e6:8.1f} MB"
+            )
+
+        identical = filecmp.cmp(outputs[0], outputs[1], shallow=False)
+        print(f"\nOutputs byte-identical: {'yes' if identical else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pipeline scripts on synthetic data and compare with a baseline.
+
+Cases, each run in a fresh process so peak RSS is measured independently:
+
+    merge_osm_results         merge_osm_results.merge_geojson, full load
+    merge_osm_results.stream  the same with stream=True
+    merge_geojson             merge_geojson.merge_geojson of the boundaries
+    merge_geojson.dissolve    merge_geojson.dissolve_geojson of the boundaries
+    split_geojson             split_geojson._split_by_line (longitude), per boundary
+    fix_geojson               fix_geojson.fix_geojson, per boundary
+    verify_split              verify_split stats of the merged roads + boundary checks
+
+Inputs come from synthetic_data.py. With ``--data-dir`` they are kept and
+reused while the generator settings match, so a multi-GB dataset is only
+written once. ``--save-baseline`` stores the results as JSON; ``--baseline``
+compares a run with one and exits with status 1 when a case got slower, or
+needs more memory, by more than ``--tolerance``.
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import geojson_io
+import synthetic_data
+from bench_merge_osm_results import _peak_rss
+
+_DATA_MANIFEST = "synthetic.json"
+
+
+def _boundary_files(data: Path, dataset: str = "boundaries") -> List[Path]:
+    return sorted((data / dataset).glob("*.geojson"))
+
+
+def _merge_roads(data: Path, work: Path, workers: int, stream: bool = False) -> None:
+    import merge_osm_results
+
+    merge_osm_results.merge_geojson(data / "roads", work / "merged.geojson", stream=stream)
+
+
+def _stream_roads(data: Path, work: Path, workers: int) -> None:
+    _merge_roads(data, work, workers, stream=True)
+
+
+def _merge_boundaries(data: Path, work: Path, workers: int) -> None:
+    import merge_geojson
+
+    merge_geojson.merge_geojson(data / "boundaries", work / "merged.geojson")
+
+
+def _dissolve_boundaries(data: Path, work: Path, workers: int) -> None:
+    import merge_geojson
+
+    merge_geojson.dissolve_geojson(data / "boundaries", work / "dissolved.geojson", workers)
+
+
+def _split_boundaries(data: Path, work: Path, workers: int) -> None:
+    from bench_split_geojson import _run
+    from split_geojson import load_geojson
+
+    for file_path in _boundary_files(data):
+        _run(load_geojson(str(file_path)), str(work / file_path.stem), {"engine": "clip"})
+
+
+def _fix_boundaries(data: Path, work: Path, workers: int) -> None:
+    import fix_geojson
+
+    for file_path in _boundary_files(data, "boundaries_invalid"):
+        fix_geojson.fix_geojson(file_path, work / file_path.name)
+
+
+def _verify(data: Path, work: Path, workers: int) -> None:
+    import verify_split
+
+    verify_split.print_collection_stats(str(data / "merged.geojson"), workers, 20000)
+    for file_path in _boundary_files(data):
+        verify_split.verify_geojson(str(file_path))
+
+
+# name -> (function(data dir, scratch dir, workers), dataset it reads, unit of the rate)
+CASES: Dict[str, Tuple[Callable[..., None], str, str]] = {
+    "merge_osm_results": (_merge_roads, "roads", "features"),
+    "merge_osm_results.stream": (_stream_roads, "roads", "features"),
+    "merge_geojson": (_merge_boundaries, "boundaries", "vertices"),
+    "merge_geojson.dissolve": (_dissolve_boundaries, "boundaries", "vertices"),
+    "split_geojson": (_split_boundaries, "boundaries", "vertices"),
+    "fix_geojson": (_fix_boundaries, "boundaries_invalid", "vertices"),
+    "verify_split": (_verify, "merged", "features"),
+}
+
+
+def _count_lines(path: Path) -> int:
+    with path.open("rb") as f:
+        return sum(1 for _ in f)
+
+
+def _count_vertices(coords) -> int:
+    if coords and isinstance(coords[0], (int, float)):
+        return 1
+    return sum(_count_vertices(c) for c in coords)
+
+
+def prepare_data(data: Path, params: Dict) -> Dict:
+    """Generate (or reuse) the synthetic inputs; return the data manifest."""
+    manifest_path = data / _DATA_MANIFEST
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("params") == params:
+            print(f"Reusing synthetic data in {data}")
+            return manifest
+    print(f"Generating synthetic data in {data} ...")
+    start = time.perf_counter()
+    # Drop files of a previous, larger dataset.
+    for pattern in ("roads/synthetic_*.geojson", "boundaries*/provinsi_sintetis_*.geojson"):
+        for stale in data.glob(pattern):
+            stale.unlink()
+    roads = synthetic_data.write_roads(
+        data / "roads",
+        files=params["files"],
+        size_mb=params["roads_mb"],
+        overlap=params["overlap"],
+        seed=params["seed"],
+    )
+    # Same shapes twice; only the second has self-intersecting islands
+    # (fix_geojson's input; split_geojson expects repaired boundaries).
+    boundaries = {
+        name: synthetic_data.write_boundaries(
+            data / name,
+            provinces=params["provinces"],
+            vertices=params["vertices"],
+            islands=params["islands"],
+            invalid=invalid,
+            seed=params["seed"],
+        )
+        for name, invalid in (("boundaries", 0.0), ("boundaries_invalid", params["invalid"]))
+    }
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        _stream_roads(data, data, 1)
+    # One feature per line between the header and footer lines.
+    road_features = sum(_count_lines(path) - 2 for path in roads)
+    manifest = {
+        "params": params,
+        "datasets": {
+            "roads": {
+                "bytes": sum(path.stat().st_size for path in roads),
+                "features": road_features,
+            },
+            **{
+                name: {
+                    "bytes": sum(path.stat().st_size for path in paths),
+                    "vertices": sum(
+                        _count_vertices(geojson_io.load(path)["geometry"]["coordinates"])
+                        for path in paths
+                    ),
+                }
+                for name, paths in boundaries.items()
+            },
+            "merged": {
+                "bytes": (data / "merged.geojson").stat().st_size,
+                "features": _count_lines(data / "merged.geojson") - 2,
+            },
+        },
+    }
+    manifest_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    print(f"   done in {time.perf_counter() - start:.1f}s")
+    return manifest
+
+
+def _run_case(name: str, data: str, work: str, workers: int, queue) -> None:
+    func = CASES[name][0]
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        func(Path(data), Path(work), workers)
+        elapsed = time.perf_counter() - start
+    # Pool workers count once they are reaped.
+    cpu = sum(
+        usage.ru_utime + usage.ru_stime
+        for usage in map(resource.getrusage, (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+    )
+    queue.put((elapsed, cpu, _peak_rss()))
+
+
+def _measure(name: str, data: Path, work: Path, workers: int) -> Tuple[float, float, int]:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_case, args=(name, str(data), str(work), workers, queue))
+    proc.start()
+    proc.join()
+    if proc.exitcode != 0:
+        raise RuntimeError(f"{name} failed (exit code {proc.exitcode})")
+    return queue.get()
+
+
+def run_cases(
+    names: List[str], data: Path, manifest: Dict, repeat: int = 3, workers: int = 1
+) -> Dict[str, Dict]:
+    """Time every case ``repeat`` times; median wall/CPU time, highest peak RSS."""
+    results = {}
+    for name in names:
+        _, dataset, unit = CASES[name]
+        size = manifest["datasets"][dataset]
+        runs = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory(prefix="bench-", dir=data) as work:
+                runs.append(_measure(name, data, Path(work), workers))
+        elapsed = statistics.median(run[0] for run in runs)
+        results[name] = {
+            "elapsed_s": elapsed,
+            "cpu_s": statistics.median(run[1] for run in runs),
+            "peak_rss_bytes": max(run[2] for run in runs),
+            "input_bytes": size["bytes"],
+            "mb_per_s": size["bytes"] / 1e6 / elapsed,
+            "unit": unit,
+            "items": size[unit],
+            "items_per_s": size[unit] / elapsed,
+        }
+        _print_result(name, results[name])
+    return results
+
+
+def _print_result(name: str, result: Dict, base: Optional[Dict] = None) -> None:
+    line = (
+        f"{name:<26} {result['elapsed_s']:8.2f}s {result['mb_per_s']:8.1f} MB/s "
+        f"{result['items_per_s']:10.0f} {result['unit'][:4]}/s "
+        f"peak RSS {result['peak_rss_bytes'] / 1e6:8.1f} MB"
+    )
+    if base is not None:
+        line += (
+            f"  time x{result['elapsed_s'] / base['elapsed_s']:5.2f}"
+            f"  RSS x{result['peak_rss_bytes'] / base['peak_rss_bytes']:5.2f}"
+        )
+    print(line)
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Print each case against ``baseline``; return the regressed case names."""
+    if results["dataset"] != baseline.get("dataset"):
+        print("⚠️  The baseline used different synthetic data; ratios are not comparable")
+    print(f"\nAgainst baseline from {baseline.get('created', '?')} (tolerance {tolerance:.0%}):")
+    regressions = []
+    for name, result in results["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            print(f"{name:<26} (not in baseline)")
+            continue
+        _print_result(name, result, base)
+        slower = result["elapsed_s"] > base["elapsed_s"] * (1 + tolerance)
+        bigger = result["peak_rss_bytes"] > base["peak_rss_bytes"] * (1 + tolerance)
+        if slower or bigger:
+            regressions.append(name)
+            what = [label for label, hit in (("time", slower), ("memory", bigger)) if hit]
+            print(f"   ❌ regression: {', '.join(what)}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pipeline scripts on synthetic data."
+    )
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        choices=list(CASES),
+        default=list(CASES),
+        help="Cases to run (default: all)",
+    )
+    parser.add_argument(
+        "--data-dir", help="Keep/reuse the synthetic data here (default: temporary)"
+    )
+    parser.add_argument(
+        "--roads-mb", type=float, default=50, help="Total road input size (default: 50)"
+    )
+    parser.add_argument("--files", type=int, default=4, help="Road input files (default: 4)")
+    parser.add_argument(
+        "--overlap",
+        type=int,
+        default=synthetic_data.DEFAULT_OVERLAP,
+        help=f"Ways shared by consecutive road files (default: {synthetic_data.DEFAULT_OVERLAP})",
+    )
+    parser.add_argument(
+        "--provinces", type=int, default=6, help="Boundary files (default: 6)"
+    )
+    parser.add_argument(
+        "--vertices",
+        type=int,
+        default=20000,
+        help="Vertices of each province outline (default: 20000)",
+    )
+    parser.add_argument(
+        "--islands", type=int, default=200, help="Island parts per province (default: 200)"
+    )
+    parser.add_argument(
+        "--invalid",
+        type=float,
+        default=0.02,
+        help="Share of island parts that self-intersect in fix_geojson's input (default: 0.02)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=synthetic_data.DEFAULT_SEED, help="Generator seed"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per case, median taken (default: 3)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes for the dissolve and verify_split cases (default: 1)",
+    )
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare with saved results")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="Allowed slowdown / memory growth before failing (default: 0.15)",
+    )
+    geojson_io.add_arguments(parser)
+    args = parser.parse_args()
+    geojson_io.configure(args)
+
+    params = {
+        "roads_mb": args.roads_mb,
+        "files": args.files,
+        "overlap": args.overlap,
+        "provinces": args.provinces,
+        "vertices": args.vertices,
+        "islands": args.islands,
+        "invalid": args.invalid,
+        "seed": args.seed,
+    }
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+
+    with contextlib.ExitStack() as stack:
+        if args.data_dir:
+            data = Path(args.data_dir)
+            data.mkdir(parents=True, exist_ok=True)
+        else:
+            data = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        manifest = prepare_data(data, params)
+        for name, dataset in manifest["datasets"].items():
+            print(f"   {name}: {dataset['bytes'] / 1e6:.1f} MB")
+        print(f"JSON backend: {geojson_io.backend_name()}\n")
+        cases = run_cases(args.cases, data, manifest, args.repeat, args.workers)
+
+    results = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "json_backend": geojson_io.backend_name(),
+        "dataset": params,
+        "cases": cases,
+    }
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\n💾 Saved to: {args.save_baseline}")
+    if baseline is not None and compare(results, baseline, args.tolerance):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark split_geojson._split_by_line engines on the bundled boundary files.
+
+"previous" is the union + split path written with indent=2 (the old
+behaviour); "clip" is the half-plane clip engine with compact output.
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import tempfile
+import timeit
+
+from split_geojson import (
+    LineString,
+    _split_by_line,
+    get_bounds,
+    load_geojson,
+)
+
+_ENGINES = {
+    "previous": {"engine": "union", "indent": 2},
+    "clip": {"engine": "clip"},
+    "clip+p6": {"engine": "clip", "precision": 6},
+}
+
+
+def _run(data, output_prefix, options):
+    min_lon, min_lat, max_lon, max_lat = get_bounds(data["geometry"])
+    center_lon = (min_lon + max_lon) / 2
+    line = LineString([(center_lon, min_lat - 1.0), (center_lon, max_lat + 1.0)])
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _split_by_line(
+            data, output_prefix, line, center_lon, ("left", "right"), **options
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark _split_by_line engines.")
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="GeoJSON files (default: boundaries-provinsi-pulau-jawa/*.geojson)",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats (default: 5)")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob("boundaries-provinsi-pulau-jawa/*.geojson"))
+    totals = {name: [0.0, 0] for name in _ENGINES}
+    with tempfile.TemporaryDirectory() as tmp:
+        for file_path in files:
+            data = load_geojson(file_path)
+            print(f"📄 {file_path}")
+            baseline = None
+            for name, options in _ENGINES.items():
+                prefix = os.path.join(tmp, name)
+                elapsed = min(timeit.repeat(
+                    lambda: _run(data, prefix, options), number=1, repeat=args.repeat
+                ))
+                size = sum(os.path.getsize(f) for f in _run(data, prefix, options))
+                baseline = baseline or elapsed
+                totals[name][0] += elapsed
+                totals[name][1] += size
+                print(
+                    f"   {name:<9} {elapsed * 1000:8.2f} ms  {size / 1024:8.1f} KB  "
+                    f"x{baseline / elapsed:5.2f}"
+                )
+
+    print("\nTotal")
+    base_time = totals["previous"][0]
+    for name, (elapsed, size) in totals.items():
+        print(
+            f"   {name:<9} {elapsed * 1000:8.2f} ms  {size / 1024:8.1f} KB  "
+            f"x{base_time / elapsed:5.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Run the boundary workflow in one process, passing geometries in memory.
+
+The standalone chain split_geojson.py -> merge_geojson.py -> fix_geojson.py
+-> reformat_geojson.py writes, re-reads and re-parses a file at every hop.
+Here the same steps are stages over a list of in-memory parts (Shapely
+geometry + the source Feature's properties/metadata), and only ``write``
+and ``checkpoint`` stages touch the disk. Each stage is given as
+``NAME[:ARG][,KEY=VALUE...]``:
+
+    read:PATH            a GeoJSON file, or every *.geojson in a directory
+    split:longitude      halve every part west/east (also: latitude)
+    split:recursive,max_vertices=5000[,max_area_km2=..,max_road_km=..]
+                         [,road_density=..][,max_depth=..]
+    merge                concatenate all parts into one MultiPolygon
+    dissolve[,coverage=auto][,grid_size=1e-6]
+                         union all parts into one valid outline
+    fix                  repair every part (fix_geojson.py)
+    reformat             reduce every part to a bare MultiPolygon
+    checkpoint:PATH      write the current parts and carry on
+    write:PATH           write the current parts (final sink)
+
+Several parts are written as ``<stem>_<part name><suffix>``. The default
+boundary chain becomes:
+
+    boundary_pipeline.py read:data merge fix reformat write:merged_final.geojson
+"""
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+    import shapely
+except ImportError as exc:
+    raise SystemExit(
+        "Shapely is required. Install it with: pip install shapely"
+    ) from exc
+
+import geojson_io
+import instrumentation
+from fix_geojson import _multipolygon_coordinates, _polygon_parts, repair_parts
+from merge_geojson import _extract_geometry, _load_json, dissolve_geometries
+from split_geojson import (
+    DEFAULT_MAX_DEPTH,
+    DEFAULT_ROAD_DENSITY,
+    _polygonal,
+    _write_part,
+    recursive_tiles,
+    split_in_half,
+)
+
+
+class Part(NamedTuple):
+    """One geometry flowing through the pipeline."""
+
+    name: str
+    geom: Any
+    # Source Feature without its geometry; None once reduced to a bare geometry.
+    data: Optional[Dict[str, Any]] = None
+    part_properties: Optional[Dict[str, Any]] = None
+
+
+class Stage(NamedTuple):
+    name: str
+    arg: Optional[str]
+    options: Dict[str, str]
+
+    def __str__(self) -> str:
+        text = self.name + (f":{self.arg}" if self.arg else "")
+        return text + "".join(f",{k}={v}" for k, v in self.options.items())
+
+
+# Options each stage (or split method) accepts; anything else is rejected.
+_STAGE_OPTIONS: Dict[str, Tuple[str, ...]] = {
+    "split:recursive": (
+        "max_vertices", "max_area_km2", "max_road_km", "road_density", "max_depth"
+    ),
+    "dissolve": ("coverage", "grid_size"),
+}
+_CHOICE_OPTIONS = {"coverage": ("auto", "yes", "no")}
+# Numeric stage options, checked when the stage is parsed.
+_NUMERIC_OPTIONS = {
+    "max_vertices": float,
+    "max_area_km2": float,
+    "max_road_km": float,
+    "road_density": float,
+    "max_depth": int,
+    "grid_size": float,
+}
+
+
+def parse_stage(text: str) -> Stage:
+    head, *pairs = text.split(",")
+    name, _, arg = head.partition(":")
+    if name not in STAGES:
+        raise ValueError(f"Unknown stage {name!r} (choose from {', '.join(STAGES)})")
+    allowed = _STAGE_OPTIONS.get(f"{name}:{arg}", _STAGE_OPTIONS.get(name, ()))
+    options = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise ValueError(f"Expected KEY=VALUE in stage {text!r}, got {pair!r}")
+        key, value = key.strip(), value.strip()
+        if key not in allowed:
+            accepted = f"accepted: {', '.join(allowed)}" if allowed else "it takes no options"
+            raise ValueError(f"Unknown option {key!r} in stage {text!r} ({accepted})")
+        choices = _CHOICE_OPTIONS.get(key)
+        if choices is not None and value not in choices:
+            raise ValueError(
+                f"Option {key} in stage {text!r} must be one of {', '.join(choices)}, "
+                f"got {value!r}"
+            )
+        convert = _NUMERIC_OPTIONS.get(key)
+        if convert is not None and value:
+            try:
+                convert(value)
+            except ValueError:
+                kind = "an integer" if convert is int else "a number"
+                raise ValueError(
+                    f"Option {key} in stage {text!r} must be {kind}, got {value!r}"
+                ) from None
+        options[key] = value
+    return Stage(name, arg or None, options)
+
+
+def _polygons(geom: Any) -> np.ndarray:
+    return _polygon_parts(np.array([geom]))
+
+
+def _read(stage: Stage, parts: List[Part], config: argparse.Namespace) -> List[Part]:
+    if not stage.arg:
+        raise ValueError("read needs a path: read:PATH")
+    path = Path(stage.arg)
+    files = sorted(path.glob("*.geojson")) if path.is_dir() else [path]
+    if not files:
+        raise FileNotFoundError(f"No .geojson files found in {path}")
+    loaded = []
+    for file_path in files:
+        doc = _load_json(file_path)
+        geom_type, coords = _extract_geometry(doc)
+        geom = shapely.from_geojson(
+            geojson_io.dumps({"type": geom_type, "coordinates": coords}, compact=True)
+        )
+        data = None
+        if isinstance(doc.get("geometry"), dict):
+            data = {k: v for k, v in doc.items() if k != "geometry"}
+            data.setdefault("properties", {})
+        loaded.append(Part(file_path.stem, geom, data))
+    return parts + loaded
+
+
+def _split(stage: Stage, parts: List[Part], config: argparse.Namespace) -> List[Part]:
+    method = stage.arg or "longitude"
+    out = []
+    for part in parts:
+        data = part.data if part.data is not None else {"properties": {}}
+        if method in ("longitude", "latitude"):
+            sides = ("left", "right") if method == "longitude" else ("south", "north")
+            halves = split_in_half(part.geom, vertical=method == "longitude")
+            if method == "latitude":
+                # split_geojson.py numbers the north half first.
+                sides, halves = sides[::-1], halves[::-1]
+            for idx, (side, half) in enumerate(zip(sides, halves), 1):
+                if half is None:
+                    raise ValueError(f"No geometry created for side: {side}")
+                out.append(Part(f"{part.name}_{side}", half, data, {"part": idx, "side": side}))
+        elif method == "recursive":
+            budgets = {
+                key: float(stage.options[key])
+                for key in ("max_vertices", "max_area_km2", "max_road_km")
+                if key in stage.options
+            }
+            if not budgets:
+                raise ValueError("split:recursive needs max_vertices, max_area_km2 or max_road_km")
+            if "max_vertices" in budgets:
+                budgets["max_vertices"] = int(budgets["max_vertices"])
+            geom = part.geom if part.geom.is_valid else shapely.make_valid(part.geom)
+            leaves = recursive_tiles(
+                _polygonal(geom),
+                road_density=float(stage.options.get("road_density", DEFAULT_ROAD_DENSITY)),
+                max_depth=int(stage.options.get("max_depth", DEFAULT_MAX_DEPTH)),
+                **budgets,
+            )
+            for idx, (path, piece) in enumerate(leaves, 1):
+                tile = path or "root"
+                out.append(Part(f"{part.name}_tile_{tile}", piece, data, {"part": idx, "tile": tile}))
+        else:
+            raise ValueError(f"Unknown split method {method!r} (longitude, latitude, recursive)")
+    return out
+
+
+def _merge(stage: Stage, parts: List[Part], config: argparse.Namespace) -> List[Part]:
+    polygons = _polygon_parts(np.array([part.geom for part in parts]))
+    return [Part("merged", shapely.multipolygons(polygons))]
+
+
+def _dissolve(stage: Stage, parts: List[Part], config: argparse.Namespace) -> List[Part]:
+    geoms = np.array([part.geom for part in parts])
+    invalid = ~shapely.is_valid(geoms)
+    geoms[invalid] = shapely.make_valid(geoms[invalid])
+    grid_size = stage.options.get("grid_size")
+    union = dissolve_geometries(
+        geoms,
+        workers=config.workers,
+        coverage=stage.options.get("coverage", "auto"),
+        grid_size=float(grid_size) if grid_size else None,
+    )
+    return [Part("dissolved", shapely.multipolygons(_polygons(union)))]
+
+
+def _fix(stage: Stage, parts: List[Part], config: argparse.Namespace) -> List[Part]:
+    out = []
+    for part in parts:
+        polygons = _polygons(part.geom)
+        if not shapely.is_valid(part.geom):
+            polygons = repair_parts(polygons)
+        out.append(part._replace(geom=shapely.multipolygons(polygons)))
+    return out
+
+
+def _reformat(stage: Stage, parts: List[Part], config: argparse.Namespace) -> List[Part]:
+    return [
+        Part(part.name, shapely.multipolygons(_polygons(part.geom))) for part in parts
+    ]
+
+
+def _part_path(path: Path, part: Part, count: int) -> Path:
+    if count == 1:
+        return path
+    return path.with_name(f"{path.stem}_{part.name}{path.suffix or '.geojson'}")
+
+
+def _write(stage: Stage, parts: List[Part], config: argparse.Namespace) -> List[Part]:
+    if not stage.arg:
+        raise ValueError(f"{stage.name} needs a path: {stage.name}:PATH")
+    path = Path(stage.arg)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for part in parts:
+        output_file = _part_path(path, part, len(parts))
+        if part.data is not None:
+            _write_part(
+                part.data,
+                output_file,
+                part.geom,
+                part.part_properties or {},
+                precision=config.precision,
+                indent=config.indent,
+            )
+        else:
+            polygons = _polygons(part.geom)
+            if config.precision is not None:
+                polygons = shapely.transform(
+                    polygons, lambda xy: np.round(xy, config.precision)
+                )
+            geojson_io.dump(
+                {"type": "MultiPolygon", "coordinates": _multipolygon_coordinates(polygons)},
+                output_file,
+                indent=config.indent,
+            )
+        print(f"   💾 {output_file}")
+    return parts
+
+
+STAGES: Dict[str, Callable[[Stage, List[Part], argparse.Namespace], List[Part]]] = {
+    "read": _read,
+    "split": _split,
+    "merge": _merge,
+    "dissolve": _dissolve,
+    "fix": _fix,
+    "reformat": _reformat,
+    "checkpoint": _write,
+    "write": _write,
+}
+
+
+def run_pipeline(
+    stages: List[Stage], config: argparse.Namespace
+) -> Tuple[List[Part], List[Tuple[str, float]]]:
+    """Run ``stages`` in order; return the final parts and per-stage seconds."""
+    parts: List[Part] = []
+    timings = []
+    for stage in stages:
+        print(f"▶️  {stage}")
+        start = time.perf_counter()
+        with instrumentation.stage(str(stage)):
+            parts = STAGES[stage.name](stage, parts, config)
+        elapsed = time.perf_counter() - start
+        timings.append((str(stage), elapsed))
+        vertices = int(shapely.get_num_coordinates(np.array([p.geom for p in parts])).sum()) \
+            if parts else 0
+        print(f"   {len(parts)} part(s), {vertices} vertices in {elapsed:.3f}s")
+    return parts, timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run read/split/merge/fix/reformat stages in memory.",
+        epilog="Stages: " + ", ".join(STAGES) + " (see the module docstring for arguments)",
+    )
+    parser.add_argument("stages", nargs="+", help="NAME[:ARG][,KEY=VALUE...] in order")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes for the dissolve stage (default: 1; 0 = all CPUs)",
+    )
+    parser.add_argument(
+        "--precision",
+        type=int,
+        help="Round written coordinates to N decimals (default: full precision)",
+    )
+    parser.add_argument(
+        "--indent",
+        type=int,
+        help="Pretty-print written JSON with this indent (default: compact)",
+    )
+    geojson_io.add_arguments(parser)
+    args = parser.parse_args()
+    geojson_io.configure(args)
+    args.workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+
+    try:
+        stages = [parse_stage(text) for text in args.stages]
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        exit(1)
+    if stages[0].name != "read":
+        print("❌ The first stage must be read:PATH")
+        exit(1)
+    if stages[-1].name not in ("write", "checkpoint"):
+        print("⚠️  Last stage is not write:PATH; nothing is saved at the end")
+
+    start = time.perf_counter()
+    try:
+        _, timings = run_pipeline(stages, args)
+    except (ValueError, FileNotFoundError) as exc:
+        print(f"❌ {exc}")
+        exit(1)
+    total = time.perf_counter() - start
+    print("⏱️  Stage timings:")
+    for label, elapsed in timings:
+        print(f"   {label:<40} {elapsed:8.3f}s  {elapsed / max(total, 1e-9):6.1%}")
+    print(f"   {'total':<40} {total:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Zero-copy reader for files written by export_columnar.py.
+
+Every array is a NumPy view straight over the memory-mapped file, so opening
+even the full Java road network only parses the small JSON header.
+"""
+import argparse
+import json
+import mmap
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError as exc:
+    raise SystemExit(
+        "NumPy is required. Install it with: pip install numpy"
+    ) from exc
+
+import geojson_io
+import instrumentation
+from export_columnar import FORMAT_VERSION, MAGIC
+
+
+class ColumnarRoads:
+    """Memory-mapped view of a columnar road export.
+
+    Geometry arrays (``coords``, ``feature_part_offsets``,
+    ``part_ring_offsets``, ``ring_coord_offsets``, ``geometry_types``) and
+    column ``codes`` are read-only views into the mapping; nothing is copied
+    until a single feature is decoded with ``feature()``.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Not a columnar road file: {self.path}")
+        pos = len(MAGIC)
+        header_offset = int.from_bytes(self._mmap[pos:pos + 8], "little")
+        header_length = int.from_bytes(self._mmap[pos + 8:pos + 16], "little")
+        self.header: Dict[str, Any] = json.loads(
+            self._mmap[header_offset:header_offset + header_length]
+        )
+        if self.header.get("version") != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"Unsupported columnar format version in {self.path}")
+
+        self.feature_count: int = self.header["feature_count"]
+        self.geometry_types = self._section("geometry_types")
+        self.feature_part_offsets = self._section("feature_part_offsets")
+        self.part_ring_offsets = self._section("part_ring_offsets")
+        self.ring_coord_offsets = self._section("ring_coord_offsets")
+        self.coords = self._section("coords").reshape(-1, 2)
+        self.columns: List[str] = list(self.header["columns"])
+        self._dictionaries: Dict[str, List[Optional[str]]] = {}
+
+    def _section(self, name: str) -> np.ndarray:
+        meta = self.header["sections"][name]
+        return np.frombuffer(
+            self._mmap, dtype=meta["dtype"], count=meta["count"], offset=meta["offset"]
+        )
+
+    def __len__(self) -> int:
+        return self.feature_count
+
+    def __enter__(self) -> "ColumnarRoads":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for name in (
+            "geometry_types",
+            "feature_part_offsets",
+            "part_ring_offsets",
+            "ring_coord_offsets",
+            "coords",
+        ):
+            self.__dict__.pop(name, None)
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Caller still holds views; the mapping is released with them.
+            pass
+
+    def codes(self, column: str) -> np.ndarray:
+        """uint32 dictionary codes for ``column`` (0 = missing)."""
+        prefix = self.header["columns"][column]["prefix"]
+        return self._section(f"{prefix}.codes")
+
+    def _blob(self, name: str, idx: int) -> bytes:
+        offsets = self._section(f"{name}.offsets")
+        data_offset = self.header["sections"][f"{name}.data"]["offset"]
+        start = data_offset + int(offsets[idx])
+        end = data_offset + int(offsets[idx + 1])
+        return self._mmap[start:end]
+
+    def dictionary(self, column: str) -> List[Optional[str]]:
+        """Decoded values of ``column``; index with ``codes(column)``."""
+        values = self._dictionaries.get(column)
+        if values is None:
+            prefix = self.header["columns"][column]["prefix"]
+            offsets = self._section(f"{prefix}.dict.offsets")
+            data = self._section(f"{prefix}.dict.data").tobytes()
+            values = [None] + [
+                data[offsets[i]:offsets[i + 1]].decode("utf-8")
+                for i in range(len(offsets) - 1)
+            ]
+            self._dictionaries[column] = values
+        return values
+
+    def feature_coords(self, idx: int) -> np.ndarray:
+        """All (x, y) vertices of feature ``idx`` as an (n, 2) view."""
+        first_part = self.feature_part_offsets[idx]
+        last_part = self.feature_part_offsets[idx + 1]
+        start = self.ring_coord_offsets[self.part_ring_offsets[first_part]]
+        end = self.ring_coord_offsets[self.part_ring_offsets[last_part]]
+        return self.coords[start:end]
+
+    def geometry(self, idx: int) -> Optional[Dict]:
+        geom_type = self.header["geometry_types"][str(int(self.geometry_types[idx]))]
+        if geom_type is None:
+            return None
+        parts = []
+        for part in range(
+            self.feature_part_offsets[idx], self.feature_part_offsets[idx + 1]
+        ):
+            rings = []
+            for ring in range(
+                self.part_ring_offsets[part], self.part_ring_offsets[part + 1]
+            ):
+                start = self.ring_coord_offsets[ring]
+                end = self.ring_coord_offsets[ring + 1]
+                rings.append(self.coords[start:end].tolist())
+            parts.append(rings)
+
+        if geom_type == "Point":
+            coordinates = parts[0][0][0]
+        elif geom_type == "LineString":
+            coordinates = parts[0][0]
+        elif geom_type == "Polygon":
+            coordinates = parts[0]
+        elif geom_type == "MultiPoint":
+            coordinates = [rings[0][0] for rings in parts]
+        elif geom_type == "MultiLineString":
+            coordinates = [rings[0] for rings in parts]
+        else:
+            coordinates = parts
+        return {"type": geom_type, "coordinates": coordinates}
+
+    def properties(self, idx: int) -> Dict[str, Any]:
+        extra = self._blob("extra_properties", idx)
+        properties = geojson_io.loads(extra) if extra else {}
+        for column in self.columns:
+            code = int(self.codes(column)[idx])
+            if code:
+                properties[column] = self.dictionary(column)[code]
+        return properties
+
+    def feature(self, idx: int) -> Dict[str, Any]:
+        if not 0 <= idx < self.feature_count:
+            raise IndexError(idx)
+        feature: Dict[str, Any] = {
+            "type": "Feature",
+            "properties": self.properties(idx),
+            "geometry": self.geometry(idx),
+        }
+        feature_id = self._blob("feature_id", idx)
+        if feature_id:
+            feature["id"] = geojson_io.loads(feature_id)
+        return feature
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Open a columnar road export and print a summary."
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="final-pulau-jawa/final_pulau_jawa.col",
+        help="Columnar file (default: final-pulau-jawa/final_pulau_jawa.col)",
+    )
+    parser.add_argument(
+        "--feature",
+        type=int,
+        action="append",
+        default=[],
+        help="Print feature N as GeoJSON (repeatable)",
+    )
+    geojson_io.add_arguments(parser)
+    args = parser.parse_args()
+    geojson_io.configure(args)
+
+    start = time.perf_counter()
+    with instrumentation.stage("open"):
+        roads = ColumnarRoads(Path(args.input))
+    elapsed = time.perf_counter() - start
+
+    print(f"📄 {roads.path}")
+    print(f"   Opened in {elapsed * 1000:.1f} ms")
+    print(f"   Features: {roads.feature_count}")
+    print(f"   Coordinates: {len(roads.coords)} ({roads.coords.dtype})")
+    if len(roads.coords):
+        lo = roads.coords.min(axis=0)
+        hi = roads.coords.max(axis=0)
+        print(f"   Bounds: lon({lo[0]:.4f} - {hi[0]:.4f}), lat({lo[1]:.4f} - {hi[1]:.4f})")
+    for column in roads.columns:
+        print(f"   Column {column}: {roads.header['columns'][column]['cardinality']} distinct")
+    for idx in args.feature:
+        print(geojson_io.dumps(roads.feature(idx)).decode("utf-8"))
+
+
+if __name__ == "__main__":
+    main()
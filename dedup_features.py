@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Drop repeated features from a merged road file.
+
+Regions are queried tile by tile (see split_geojson.py), so a way that
+crosses a split line comes back in several files under results-from-osm/.
+Each feature is reduced to one 64-bit integer key:
+
+* the OSM id (``id`` or ``properties["@id"]``, e.g. "way/123") packed with
+  its element type, or
+* failing that, an 8-byte BLAKE2b hash of the serialized geometry.
+
+Only the first feature with a given key is kept. Keys live in an in-memory
+``set`` until it holds ``max_memory_keys``; then they are moved to an
+on-disk SQLite table (integer primary key) and later batches are checked
+against both, so memory stays bounded however large the input is.
+
+merge_osm_results.py runs this while it merges (``--dedup``); this script
+de-duplicates an existing file.
+"""
+import argparse
+import hashlib
+import itertools
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import geojson_io
+import instrumentation
+
+DEFAULT_MEMORY_KEYS = 5_000_000
+DEFAULT_BATCH_SIZE = 20000
+# SQLite caps bound parameters per statement (999 on older builds).
+_SQL_BATCH = 900
+
+# Key layout: top byte = namespace, low 56 bits = id or hash.
+_ID_BITS = 56
+_ID_MASK = (1 << _ID_BITS) - 1
+_OSM_TYPES = {"node": 1, "way": 2, "relation": 3}
+_NUMERIC_ID = 4
+_OTHER_ID = 0x7E
+_GEOMETRY = 0x7F
+NO_KEY = 0
+
+
+def _hash56(data: bytes) -> int:
+    digest = hashlib.blake2b(data, digest_size=8).digest()
+    return int.from_bytes(digest, "little") & _ID_MASK
+
+
+def feature_key(feature: Dict) -> int:
+    """64-bit dedup key of a feature, or ``NO_KEY`` (never a duplicate)."""
+    value = feature.get("id")
+    if value is None:
+        value = (feature.get("properties") or {}).get("@id")
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= _ID_MASK:
+        return (_NUMERIC_ID << _ID_BITS) | value
+    if isinstance(value, str) and value:
+        kind, _, num = value.partition("/")
+        code = _OSM_TYPES.get(kind)
+        if code and num.isdigit() and int(num) <= _ID_MASK:
+            return (code << _ID_BITS) | int(num)
+        return (_OTHER_ID << _ID_BITS) | _hash56(value.encode("utf-8"))
+    geometry = feature.get("geometry")
+    if not geometry:
+        return NO_KEY
+    return (_GEOMETRY << _ID_BITS) | _hash56(geojson_io.dumps(geometry, compact=True))
+
+
+class _SeenKeys:
+    """Integer set that moves to an on-disk SQLite table when it gets large."""
+
+    def __init__(self, max_memory_keys: int, spill_dir: Optional[Path] = None) -> None:
+        self.max_memory_keys = max_memory_keys
+        self.spill_dir = spill_dir
+        self._memory: set = set()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_path: Optional[Path] = None
+        self.disk_keys = 0
+
+    def _spill(self) -> None:
+        if self._db is None:
+            fd, name = tempfile.mkstemp(
+                prefix=".dedup-", suffix=".sqlite", dir=self.spill_dir
+            )
+            os.close(fd)
+            self._db_path = Path(name)
+            self._db = sqlite3.connect(name)
+            self._db.execute("PRAGMA journal_mode = OFF")
+            self._db.execute("PRAGMA synchronous = OFF")
+            self._db.execute("CREATE TABLE seen (k INTEGER PRIMARY KEY)")
+        # Keys are already unique across memory and disk.
+        self._db.executemany("INSERT INTO seen VALUES (?)", ((k,) for k in self._memory))
+        self._db.commit()
+        self.disk_keys += len(self._memory)
+        self._memory.clear()
+
+    def _on_disk(self, keys: Sequence[int]) -> set:
+        found = set()
+        for start in range(0, len(keys), _SQL_BATCH):
+            chunk = keys[start:start + _SQL_BATCH]
+            rows = self._db.execute(
+                f"SELECT k FROM seen WHERE k IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update(k for (k,) in rows)
+        return found
+
+    def add(self, keys: Sequence[int]) -> List[bool]:
+        """Record ``keys``; True where a key is seen for the first time."""
+        first = [True] * len(keys)
+        fresh: Dict[int, int] = {}
+        memory = self._memory
+        for i, key in enumerate(keys):
+            if key == NO_KEY:
+                continue
+            if key in memory or key in fresh:
+                first[i] = False
+            else:
+                fresh[key] = i
+        if self._db is not None and fresh:
+            for key in self._on_disk(list(fresh)):
+                first[fresh.pop(key)] = False
+        memory.update(fresh)
+        if len(memory) >= self.max_memory_keys:
+            self._spill()
+        return first
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db_path.unlink(missing_ok=True)
+            self._db = None
+        self._memory.clear()
+
+
+class FeatureDeduplicator:
+    """Keeps the first feature per key; picklable (state is not carried)."""
+
+    def __init__(
+        self,
+        max_memory_keys: int = DEFAULT_MEMORY_KEYS,
+        spill_dir: Optional[Path] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        self.max_memory_keys = max_memory_keys
+        self.spill_dir = spill_dir
+        self.batch_size = batch_size
+        self._seen = _SeenKeys(max_memory_keys, spill_dir)
+        self.reset_stats()
+
+    def __getstate__(self) -> Dict:
+        # Workers only compute keys; the seen set stays with the parent.
+        return {
+            "max_memory_keys": self.max_memory_keys,
+            "spill_dir": self.spill_dir,
+            "batch_size": self.batch_size,
+        }
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__init__(**state)
+
+    def reset_stats(self) -> None:
+        self.stats = {"kept": 0, "duplicates": 0}
+
+    def describe(self) -> Dict:
+        """Settings that change the output (stored in the merge manifest)."""
+        return {"key": "osm-id/geometry-blake2b"}
+
+    def __repr__(self) -> str:
+        return f"OSM id, else geometry hash (max {self.max_memory_keys} keys in memory)"
+
+    def key(self, feature: Dict) -> int:
+        return feature_key(feature)
+
+    def first_seen(self, keys: Sequence[int]) -> List[bool]:
+        """Mark first occurrences among ``keys`` and remember them."""
+        first = self._seen.add(keys)
+        kept = sum(first)
+        self.stats["kept"] += kept
+        self.stats["duplicates"] += len(first) - kept
+        return first
+
+    def apply(self, features: List[Dict]) -> List[Dict]:
+        first = self.first_seen([feature_key(f) for f in features])
+        return list(itertools.compress(features, first))
+
+    def iter_apply(self, features: Iterator[Dict]) -> Iterator[Dict]:
+        """De-duplicate a feature stream, ``batch_size`` features at a time."""
+        features = iter(features)
+        while True:
+            batch = list(itertools.islice(features, self.batch_size))
+            if not batch:
+                return
+            yield from self.apply(batch)
+
+    def close(self) -> None:
+        self._seen.close()
+
+    def summary(self) -> str:
+        text = f"{self.stats['kept']} kept, {self.stats['duplicates']} duplicates dropped"
+        if self._seen.disk_keys:
+            text += f" ({self._seen.disk_keys} keys spilled to disk)"
+        return text
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--dedup-memory-keys",
+        type=int,
+        default=DEFAULT_MEMORY_KEYS,
+        help=(
+            "Keys held in memory (~70 bytes each) before spilling to an on-disk "
+            f"set (default: {DEFAULT_MEMORY_KEYS})"
+        ),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Drop repeated features (same OSM id, else same geometry)."
+    )
+    parser.add_argument(
+        "--input",
+        default="final-pulau-jawa/final_pulau_jawa.geojson",
+        help="Input GeoJSON/GeoJSONSeq (default: final-pulau-jawa/final_pulau_jawa.geojson)",
+    )
+    parser.add_argument("--output", required=True, help="De-duplicated output file")
+    parser.add_argument(
+        "--format",
+        choices=["geojson", "geojsonseq", "ndjson"],
+        default="geojson",
+        help="Output format (default: geojson)",
+    )
+    add_arguments(parser)
+    geojson_io.add_arguments(parser)
+    args = parser.parse_args()
+    geojson_io.configure(args)
+
+    from merge_osm_results import OUTPUT_FORMATS, _FeatureWriter, iter_file_features
+
+    input_file = Path(args.input)
+    output_file = Path(args.output)
+    if not input_file.exists():
+        print(f"❌ Input file not found: {input_file}")
+        exit(1)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    dedup = FeatureDeduplicator(args.dedup_memory_keys, spill_dir=output_file.parent)
+    fmt = OUTPUT_FORMATS[args.format]
+    print(f"🔎 De-duplicating: {input_file} ({dedup})")
+    start = time.perf_counter()
+    try:
+        with instrumentation.stage("dedup") as dedup_stage:
+            with output_file.open("wb") as out:
+                writer = _FeatureWriter(out, fmt)
+                writer.write(fmt.header)
+                total, _ = writer.write_features(dedup.iter_apply(iter_file_features(input_file)))
+                writer.write(fmt.footer)
+            dedup_stage.features = total
+    finally:
+        dedup.close()
+    elapsed = time.perf_counter() - start
+    print(f"   {total} features in {elapsed:.1f}s ({dedup.summary()})")
+    print(f"💾 Saved to: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
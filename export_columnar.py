@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Export merged road features to a compact, memory-mappable columnar file.
+
+Layout (all integers little-endian, every section 8-byte aligned):
+
+    magic              8 bytes  b"JAWACOL1"
+    header_offset      uint64
+    header_length      uint64
+    sections...        raw arrays, see header["sections"]
+    header             UTF-8 JSON
+
+Geometry is stored GeoArrow-style as nested offsets into one packed
+coordinate array: feature -> parts -> rings -> coords (x, y pairs). Selected
+string properties become dictionary-encoded uint32 columns (code 0 =
+missing); everything else is kept per feature as a JSON blob so nothing is
+lost. Feature ids (unique, so not worth a dictionary) are a JSON blob too.
+Read it back with ``columnar_reader.ColumnarRoads``.
+"""
+import argparse
+import itertools
+import json
+import math
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import geojson_io
+import instrumentation
+from merge_osm_results import iter_file_features
+
+MAGIC = b"JAWACOL1"
+FORMAT_VERSION = 1
+GEOMETRY_TYPES = {
+    None: 0,
+    "Point": 1,
+    "LineString": 2,
+    "Polygon": 3,
+    "MultiPoint": 4,
+    "MultiLineString": 5,
+    "MultiPolygon": 6,
+}
+DEFAULT_COLUMNS = ["highway", "name", "ref", "oneway", "maxspeed", "surface"]
+
+_TYPECODE_DTYPES = {"B": "<u1", "I": "<u4", "Q": "<u8", "f": "<f4", "d": "<f8"}
+_SPILL_FLUSH_SIZE = 1 << 18
+_ALIGN = 8
+
+
+class _Spill:
+    """Append-only typed array buffered in memory and spilled to a temp file."""
+
+    def __init__(self, tmp_dir: Path, name: str, typecode: str) -> None:
+        self.path = tmp_dir / f"{name}.bin"
+        self.typecode = typecode
+        self.count = 0
+        self._f = self.path.open("wb")
+        self._pending = array(typecode)
+
+    def append(self, value) -> None:
+        self._pending.append(value)
+        if len(self._pending) >= _SPILL_FLUSH_SIZE:
+            self.flush()
+
+    def extend(self, values: Iterable) -> None:
+        self._pending.extend(values)
+        if len(self._pending) >= _SPILL_FLUSH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        self.count += len(self._pending)
+        if sys.byteorder != "little":
+            self._pending.byteswap()
+        self._pending.tofile(self._f)
+        self._pending = array(self.typecode)
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        self.flush()
+        self._f.close()
+
+
+class _BlobSpill:
+    """Variable-length byte records: uint64 offsets (n + 1) plus data."""
+
+    def __init__(self, tmp_dir: Path, name: str) -> None:
+        self.offsets = _Spill(tmp_dir, f"{name}.offsets", "Q")
+        self.data_path = tmp_dir / f"{name}.data.bin"
+        self._data = self.data_path.open("wb")
+        self._size = 0
+        self.offsets.append(0)
+
+    def append(self, data: bytes) -> None:
+        self._data.write(data)
+        self._size += len(data)
+        self.offsets.append(self._size)
+
+    def close(self) -> None:
+        self.offsets.close()
+        self._data.close()
+
+
+class _StringDictionary:
+    """Dictionary-encode one property column; code 0 is reserved for null."""
+
+    def __init__(self, tmp_dir: Path, name: str) -> None:
+        self.codes = _Spill(tmp_dir, f"{name}.codes", "I")
+        self._tmp_dir = tmp_dir
+        self._name = name
+        self._lookup: Dict[str, int] = {}
+        self._values: List[str] = []
+
+    def append(self, value: Optional[str]) -> None:
+        if value is None:
+            self.codes.append(0)
+            return
+        code = self._lookup.get(value)
+        if code is None:
+            self._values.append(value)
+            code = self._lookup[value] = len(self._values)
+        self.codes.append(code)
+
+    def write_values(self) -> _BlobSpill:
+        blob = _BlobSpill(self._tmp_dir, f"{self._name}.dict")
+        for value in self._values:
+            blob.append(value.encode("utf-8"))
+        blob.close()
+        return blob
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+def _positions(ring: List) -> List:
+    """Positions of ``ring`` that have at least x and y."""
+    return [c for c in ring if len(c) >= 2]
+
+
+def _geometry_parts(geometry: Optional[Dict]) -> Tuple[int, List]:
+    """Normalize a geometry to (type code, parts -> rings -> coords).
+
+    Positions with fewer than two ordinates are dropped; a geometry left
+    without any position is stored as null (type 0).
+    """
+    if not geometry:
+        return 0, []
+    geom_type = geometry.get("type")
+    coords = geometry.get("coordinates")
+    if geom_type not in GEOMETRY_TYPES or coords is None:
+        return -1, []
+    if geom_type == "Point":
+        parts = [[[coords]]] if len(coords) >= 2 else []
+    elif geom_type == "LineString":
+        parts = [[_positions(coords)]]
+    elif geom_type == "Polygon":
+        parts = [[_positions(ring) for ring in coords]]
+    elif geom_type == "MultiPoint":
+        parts = [[[point]] for point in coords if len(point) >= 2]
+    elif geom_type == "MultiLineString":
+        parts = [[_positions(line)] for line in coords]
+    else:
+        parts = [[_positions(ring) for ring in rings] for rings in coords]
+    if not any(ring for rings in parts for ring in rings):
+        return 0, []
+    return GEOMETRY_TYPES[geom_type], parts
+
+
+def _copy_file(src: Path, dst, chunk_size: int = 1 << 24) -> int:
+    size = 0
+    with src.open("rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return size
+            dst.write(chunk)
+            size += len(chunk)
+
+
+def export_columnar(
+    input_file: Path,
+    output_file: Path,
+    columns: Optional[List[str]] = None,
+    float32: bool = False,
+) -> None:
+    columns = list(DEFAULT_COLUMNS if columns is None else columns)
+    coord_typecode = "f" if float32 else "d"
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    print(f"Exporting: {input_file}")
+    print(f"Output file: {output_file}")
+    print(f"Columns: {', '.join(columns) or '(none)'}")
+    start_all = time.time()
+
+    with tempfile.TemporaryDirectory(
+        prefix=".columnar-", dir=output_file.parent
+    ) as tmp:
+        tmp_dir = Path(tmp)
+        geometry_types = _Spill(tmp_dir, "geometry_types", "B")
+        feature_parts = _Spill(tmp_dir, "feature_part_offsets", "Q")
+        part_rings = _Spill(tmp_dir, "part_ring_offsets", "Q")
+        ring_coords = _Spill(tmp_dir, "ring_coord_offsets", "Q")
+        coords_spill = _Spill(tmp_dir, "coords", coord_typecode)
+        feature_ids = _BlobSpill(tmp_dir, "feature_id")
+        dictionaries = {
+            name: _StringDictionary(tmp_dir, f"column{idx}")
+            for idx, name in enumerate(columns)
+        }
+        extra = _BlobSpill(tmp_dir, "extra_properties")
+        for spill in (feature_parts, part_rings, ring_coords):
+            spill.append(0)
+
+        column_set = set(columns)
+        dumps = geojson_io.get_backend().dumps
+        n_features = n_parts = n_rings = n_coords = 0
+        unsupported = 0
+        for feature in iter_file_features(input_file):
+            type_code, parts = _geometry_parts(feature.get("geometry"))
+            if type_code < 0:
+                unsupported += 1
+                type_code, parts = 0, []
+            geometry_types.append(type_code)
+            for rings in parts:
+                for ring in rings:
+                    # Only x/y are stored; Z/M ordinates are dropped.
+                    coords_spill.extend(
+                        itertools.chain.from_iterable(c[:2] for c in ring)
+                    )
+                    n_coords += len(ring)
+                    ring_coords.append(n_coords)
+                n_rings += len(rings)
+                part_rings.append(n_rings)
+            n_parts += len(parts)
+            feature_parts.append(n_parts)
+
+            properties = feature.get("properties") or {}
+            feature_ids.append(
+                dumps(feature["id"]) if "id" in feature else b""
+            )
+            for name, dictionary in dictionaries.items():
+                value = properties.get(name)
+                dictionary.append(value if isinstance(value, str) else None)
+            # Non-string column values (null, numbers, ...) stay in the JSON
+            # blob so the round trip is lossless.
+            rest = {
+                k: v
+                for k, v in properties.items()
+                if k not in column_set or not isinstance(v, str)
+            }
+            extra.append(dumps(rest) if rest else b"")
+            n_features += 1
+        print(f"   Parsed {n_features} features, {n_coords} coordinates")
+        if unsupported:
+            print(f"   ⚠️  {unsupported} features with unsupported geometry stored as null")
+
+        sections: Dict[str, Tuple[Path, str]] = {}
+
+        def add_spill(name: str, spill: _Spill) -> None:
+            spill.close()
+            sections[name] = (spill.path, _TYPECODE_DTYPES[spill.typecode])
+
+        def add_blob(name: str, blob: _BlobSpill) -> None:
+            blob.close()
+            add_spill(f"{name}.offsets", blob.offsets)
+            sections[f"{name}.data"] = (blob.data_path, "<u1")
+
+        def add_dictionary(prefix: str, dictionary: _StringDictionary) -> Dict:
+            add_spill(f"{prefix}.codes", dictionary.codes)
+            add_blob(f"{prefix}.dict", dictionary.write_values())
+            return {"prefix": prefix, "cardinality": len(dictionary)}
+
+        add_spill("geometry_types", geometry_types)
+        add_spill("feature_part_offsets", feature_parts)
+        add_spill("part_ring_offsets", part_rings)
+        add_spill("ring_coord_offsets", ring_coords)
+        add_spill("coords", coords_spill)
+        add_blob("feature_id", feature_ids)
+        column_meta = {
+            name: add_dictionary(f"columns.{name}", dictionary)
+            for name, dictionary in dictionaries.items()
+        }
+        add_blob("extra_properties", extra)
+
+        header: Dict[str, Any] = {
+            "version": FORMAT_VERSION,
+            "feature_count": n_features,
+            "coord_dtype": _TYPECODE_DTYPES[coord_typecode],
+            "geometry_types": {str(code): name for name, code in GEOMETRY_TYPES.items()},
+            "columns": column_meta,
+            "sections": {},
+        }
+        tmp_output = output_file.with_name(output_file.name + ".tmp")
+        with tmp_output.open("wb") as f:
+            f.write(MAGIC)
+            f.write(bytes(16))
+            pos = len(MAGIC) + 16
+            for name, (path, dtype) in sections.items():
+                pad = -pos % _ALIGN
+                f.write(bytes(pad))
+                pos += pad
+                size = _copy_file(path, f)
+                itemsize = int(dtype[2:])
+                header["sections"][name] = {
+                    "offset": pos,
+                    "dtype": dtype,
+                    "count": size // itemsize,
+                }
+                pos += size
+            header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+            f.write(header_bytes)
+            f.seek(len(MAGIC))
+            f.write(pos.to_bytes(8, "little"))
+            f.write(len(header_bytes).to_bytes(8, "little"))
+        tmp_output.replace(output_file)
+
+    elapsed_all = time.time() - start_all
+    size = output_file.stat().st_size
+    print(
+        f"Done. {n_features} features, {size / 1e6:.1f} MB written. "
+        f"Elapsed: {elapsed_all:.1f}s"
+    )
+
+
+def check_round_trip(input_file: Path, output_file: Path) -> int:
+    """Compare every feature of ``output_file`` against ``input_file``.
+
+    Returns the number of mismatching features. Geometries are compared
+    after the same normalization the export applies (x/y only, positions
+    without two ordinates dropped, empty geometries as null) and at the
+    precision of the stored coordinate dtype.
+    """
+    from columnar_reader import ColumnarRoads
+
+    roads = ColumnarRoads(output_file)
+    rel_tol = 1e-6 if roads.coords.dtype.itemsize == 4 else 0.0
+    mismatches = 0
+    n_features = 0
+    for idx, feature in enumerate(iter_file_features(input_file)):
+        n_features += 1
+        if idx >= roads.feature_count:
+            continue
+        type_code, parts = _geometry_parts(feature.get("geometry"))
+        if type_code < 0:
+            type_code, parts = 0, []
+        expected = [
+            [float(v) for v in c[:2]]
+            for rings in parts
+            for ring in rings
+            for c in ring
+        ]
+        problem = None
+        try:
+            restored = roads.feature(idx)
+        except (IndexError, ValueError) as e:
+            problem = f"unreadable ({e!r})"
+        else:
+            geometry = restored["geometry"]
+            stored_type = geometry["type"] if geometry else None
+            actual = roads.feature_coords(idx).tolist()
+            if GEOMETRY_TYPES[stored_type] != type_code:
+                problem = f"geometry type {stored_type}"
+            elif len(actual) != len(expected) or not all(
+                math.isclose(a, e, rel_tol=rel_tol)
+                for pa, pe in zip(actual, expected)
+                for a, e in zip(pa, pe)
+            ):
+                problem = "coordinates differ"
+            elif restored["properties"] != (feature.get("properties") or {}):
+                problem = "properties differ"
+            elif restored.get("id") != feature.get("id"):
+                problem = "id differs"
+        if problem:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"   ❌ Feature {idx}: {problem}")
+    if n_features != roads.feature_count:
+        print(f"   ❌ Feature count: {roads.feature_count} stored, {n_features} in input")
+        mismatches += abs(n_features - roads.feature_count)
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export merged road GeoJSON to a memory-mappable columnar file."
+    )
+    parser.add_argument(
+        "--input",
+        default="final-pulau-jawa/final_pulau_jawa.geojson",
+        help="Merged GeoJSON/GeoJSONSeq file (default: final-pulau-jawa/final_pulau_jawa.geojson)",
+    )
+    parser.add_argument(
+        "--output",
+        default="final-pulau-jawa/final_pulau_jawa.col",
+        help="Output columnar file (default: final-pulau-jawa/final_pulau_jawa.col)",
+    )
+    parser.add_argument(
+        "--columns",
+        default=",".join(DEFAULT_COLUMNS),
+        help=f"Comma-separated dictionary-encoded properties (default: {','.join(DEFAULT_COLUMNS)})",
+    )
+    parser.add_argument(
+        "--float32",
+        action="store_true",
+        help="Store coordinates as float32 instead of float64 (~1 m precision)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Read the output back and compare every feature against the input",
+    )
+    geojson_io.add_arguments(parser)
+    args = parser.parse_args()
+    geojson_io.configure(args)
+
+    input_file = Path(args.input)
+    output_file = Path(args.output)
+    if not input_file.exists():
+        print(f"❌ Input file not found: {input_file}")
+        exit(1)
+    columns = [c.strip() for c in args.columns.split(",") if c.strip()]
+
+    with instrumentation.stage("export"):
+        export_columnar(input_file, output_file, columns=columns, float32=args.float32)
+
+    if args.check:
+        print("Checking round trip...")
+        mismatches = check_round_trip(input_file, output_file)
+        if mismatches:
+            print(f"❌ {mismatches} features do not round-trip")
+            exit(1)
+        print("✅ All features round-trip")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,769 @@
+#!/usr/bin/env python3
+"""
+Render the merged roads into a Mapbox Vector Tile pyramid in an MBTiles file.
+
+Features are read through spatial_index.py's packed R-tree (built on the
+fly if missing or stale), so every job only touches the records under its
+own tiles. The pyramid is cut into jobs:
+
+* each tile at ``--job-zoom`` (default 10) is one job rendering itself and
+  all its descendants down to ``--max-zoom``;
+* each tile above it (``--min-zoom`` .. job zoom - 1) is a job of its own.
+
+Jobs fan out over a process pool, so the run scales with cores. Inside a
+job, features are projected to web mercator once, then per zoom simplified
+(``--tolerance`` in tile units), indexed in an STRtree and clipped to each
+tile plus ``--buffer``. Roads below their class' zoom (OpenMapTiles-style:
+motorways from z5, residential from z12, paths from z14) are skipped
+before their geometry is parsed. Tiles are encoded as MVT v2 (layers
+``roads`` and, with ``--provinces``, ``provinces``), gzipped and written
+by the parent into one SQLite MBTiles archive.
+"""
+import argparse
+import gzip
+import math
+import os
+import sqlite3
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+    import shapely
+except ImportError as exc:
+    raise SystemExit(
+        "Shapely is required. Install it with: pip install shapely"
+    ) from exc
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+import geojson_io
+import instrumentation
+from spatial_index import PackedRTree, build_index, index_path_for
+from tag_provinces import ProvinceTagger
+
+DEFAULT_MIN_ZOOM = 5
+DEFAULT_MAX_ZOOM = 14
+DEFAULT_JOB_ZOOM = 10
+DEFAULT_EXTENT = 4096
+DEFAULT_BUFFER = 64
+# Tile units; 8/4096 is half a pixel on a 256 px tile.
+DEFAULT_TOLERANCE = 8.0
+DEFAULT_PROPERTIES = ("highway", "name", "ref", "oneway", "surface", "province")
+DEFAULT_CLASS_ZOOM = 12
+
+EARTH_RADIUS_M = 6_378_137.0
+ORIGIN = math.pi * EARTH_RADIUS_M
+MAX_LATITUDE = 85.0511287798
+
+HIGHWAY_MIN_ZOOM = {
+    "motorway": 5,
+    "trunk": 5,
+    "primary": 7,
+    "motorway_link": 9,
+    "trunk_link": 9,
+    "secondary": 9,
+    "primary_link": 10,
+    "tertiary": 10,
+    "secondary_link": 11,
+    "tertiary_link": 11,
+    "unclassified": 11,
+    "residential": 12,
+    "road": 12,
+    "living_street": 13,
+    "pedestrian": 13,
+    "service": 13,
+    "track": 13,
+    "bridleway": 14,
+    "cycleway": 14,
+    "footway": 14,
+    "path": 14,
+    "steps": 14,
+}
+
+_POINT, _LINESTRING, _POLYGON = 1, 2, 3
+_FAMILY = {
+    int(shapely.GeometryType.POINT): _POINT,
+    int(shapely.GeometryType.MULTIPOINT): _POINT,
+    int(shapely.GeometryType.LINESTRING): _LINESTRING,
+    int(shapely.GeometryType.MULTILINESTRING): _LINESTRING,
+    int(shapely.GeometryType.POLYGON): _POLYGON,
+    int(shapely.GeometryType.MULTIPOLYGON): _POLYGON,
+}
+
+if msgspec is not None:
+
+    # Geometry is skipped unparsed; shapely reads it from the same bytes.
+    class _RecordHead(msgspec.Struct):
+        id: Any = None
+        properties: Optional[Dict[str, Any]] = None
+
+    _HEAD_DECODER = msgspec.json.Decoder(_RecordHead)
+
+
+# --- Web mercator tile math ---------------------------------------------
+
+
+def _lonlat_to_tile(lon: float, lat: float, zoom: int) -> Tuple[int, int]:
+    n = 2 ** zoom
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tiles_in_bounds(
+    bounds: Tuple[float, float, float, float], zoom: int
+) -> List[Tuple[int, int]]:
+    """(x, y) of every tile at ``zoom`` covering a lon/lat bbox."""
+    x0, y0 = _lonlat_to_tile(bounds[0], bounds[3], zoom)
+    x1, y1 = _lonlat_to_tile(bounds[2], bounds[1], zoom)
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def tile_bounds(zoom: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """Mercator (xmin, ymin, xmax, ymax) of a tile."""
+    size = 2 * ORIGIN / 2 ** zoom
+    xmin = -ORIGIN + x * size
+    ymax = ORIGIN - y * size
+    return xmin, ymax - size, xmin + size, ymax
+
+
+def tile_lonlat_bounds(zoom: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    xmin, ymin, xmax, ymax = tile_bounds(zoom, x, y)
+
+    def lat(my: float) -> float:
+        return math.degrees(math.atan(math.sinh(my / EARTH_RADIUS_M)))
+
+    return (
+        math.degrees(xmin / EARTH_RADIUS_M),
+        lat(ymin),
+        math.degrees(xmax / EARTH_RADIUS_M),
+        lat(ymax),
+    )
+
+
+def _project(xy: np.ndarray) -> np.ndarray:
+    lat = np.clip(xy[:, 1], -MAX_LATITUDE, MAX_LATITUDE)
+    return np.column_stack([
+        np.radians(xy[:, 0]) * EARTH_RADIUS_M,
+        np.arcsinh(np.tan(np.radians(lat))) * EARTH_RADIUS_M,
+    ])
+
+
+def _unproject(xy: np.ndarray) -> np.ndarray:
+    return np.column_stack([
+        np.degrees(xy[:, 0] / EARTH_RADIUS_M),
+        np.degrees(np.arctan(np.sinh(xy[:, 1] / EARTH_RADIUS_M))),
+    ])
+
+
+def to_mercator(geoms: np.ndarray) -> np.ndarray:
+    return shapely.transform(geoms, _project)
+
+
+# --- MVT (protobuf) encoding ---------------------------------------------
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _packed(values: List[int]) -> bytes:
+    if all(v < 0x80 for v in values):
+        return bytes(values)
+    return b"".join(map(_varint, values))
+
+
+def _field(number: int, payload: bytes) -> bytes:
+    """Length-delimited field (wire type 2)."""
+    return _varint(number << 3 | 2) + _varint(len(payload)) + payload
+
+
+def _varint_field(number: int, value: int) -> bytes:
+    return _varint(number << 3) + _varint(value)
+
+
+def _encode_value(value: Any) -> bytes:
+    if isinstance(value, bool):
+        return _varint_field(7, int(value))
+    if isinstance(value, int) and -(1 << 63) <= value < (1 << 64):
+        if value >= 0:
+            return _varint_field(5, value)
+        return _varint_field(6, (value << 1) ^ (value >> 63))
+    if isinstance(value, float):
+        return _varint(3 << 3 | 1) + struct.pack("<d", value)
+    if not isinstance(value, str):
+        value = geojson_io.dumps(value).decode("utf-8")
+    return _field(1, value.encode("utf-8"))
+
+
+def _zigzag(values: np.ndarray) -> List[int]:
+    values = values.astype(np.int64).ravel()
+    return ((values << 1) ^ (values >> 63)).tolist()
+
+
+def _command(command: int, count: int) -> int:
+    return (command & 0x7) | (count << 3)
+
+
+class _Layer:
+    """One MVT layer under construction."""
+
+    def __init__(self, name: str, extent: int) -> None:
+        self.name = name
+        self.extent = extent
+        self.features: List[bytes] = []
+        self._keys: Dict[str, int] = {}
+        self._values: Dict[Tuple[str, Any], int] = {}
+        self._encoded_values: List[bytes] = []
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def _tags(self, properties: Dict[str, Any]) -> List[int]:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            key_idx = self._keys.setdefault(key, len(self._keys))
+            # Keyed by type too, so 1, 1.0 and True stay distinct values.
+            hashable = value if isinstance(value, (str, int, float)) else repr(value)
+            value_key = (type(value).__name__, hashable)
+            value_idx = self._values.get(value_key)
+            if value_idx is None:
+                value_idx = self._values[value_key] = len(self._values)
+                self._encoded_values.append(_encode_value(value))
+            tags += (key_idx, value_idx)
+        return tags
+
+    def add(
+        self,
+        geom_type: int,
+        commands: List[int],
+        properties: Dict[str, Any],
+        feature_id: Optional[int] = None,
+    ) -> None:
+        body = b""
+        if feature_id is not None:
+            body += _varint_field(1, feature_id)
+        tags = self._tags(properties)
+        if tags:
+            body += _field(2, _packed(tags))
+        body += _varint_field(3, geom_type) + _field(4, _packed(commands))
+        self.features.append(_field(2, body))
+
+    def encode(self) -> bytes:
+        parts = [_varint_field(15, 2), _field(1, self.name.encode("utf-8"))]
+        parts += self.features
+        parts += [_field(3, key.encode("utf-8")) for key in self._keys]
+        parts += [_field(4, value) for value in self._encoded_values]
+        parts.append(_varint_field(5, self.extent))
+        return b"".join(parts)
+
+
+def _drop_repeats(points: np.ndarray) -> np.ndarray:
+    if len(points) < 2:
+        return points
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = (points[1:] != points[:-1]).any(axis=1)
+    return points[keep]
+
+
+def _ring_area2(ring: np.ndarray) -> int:
+    """Twice the surveyor's-formula area in tile coordinates (y down)."""
+    x, y = ring[:, 0], ring[:, 1]
+    return int((x * np.roll(y, -1) - np.roll(x, -1) * y).sum())
+
+
+def encode_geometry(geom, family: int) -> List[int]:
+    """MVT command stream of a geometry already in integer tile coordinates."""
+    commands: List[int] = []
+    cursor = np.zeros((1, 2), dtype=np.int64)
+    parts = [
+        part for part in shapely.get_parts(geom)
+        if _FAMILY.get(int(shapely.get_type_id(part))) == family
+    ]
+
+    if family == _POINT:
+        points = np.vstack([shapely.get_coordinates(p) for p in parts]).astype(np.int64) \
+            if parts else np.empty((0, 2), dtype=np.int64)
+        if len(points):
+            deltas = np.diff(np.vstack([cursor, points]), axis=0)
+            commands = [_command(1, len(points))] + _zigzag(deltas)
+        return commands
+
+    paths: List[Tuple[np.ndarray, bool]] = []
+    if family == _LINESTRING:
+        for part in parts:
+            line = _drop_repeats(shapely.get_coordinates(part).astype(np.int64))
+            if len(line) >= 2:
+                paths.append((line, False))
+    else:
+        for part in parts:
+            for i, ring in enumerate(shapely.get_rings(part)):
+                points = _drop_repeats(shapely.get_coordinates(ring).astype(np.int64))
+                if len(points) > 1 and (points[0] == points[-1]).all():
+                    points = points[:-1]
+                area2 = _ring_area2(points) if len(points) >= 3 else 0
+                if not area2:
+                    if i == 0:
+                        break
+                    continue
+                # Exterior rings have positive area, holes negative.
+                if (area2 > 0) != (i == 0):
+                    points = points[::-1]
+                paths.append((points, True))
+
+    for points, closed in paths:
+        deltas = np.diff(np.vstack([cursor, points]), axis=0)
+        params = _zigzag(deltas)
+        commands += [_command(1, 1), params[0], params[1], _command(2, len(points) - 1)]
+        commands += params[2:]
+        if closed:
+            commands.append(_command(7, 1))
+        cursor = points[-1:]
+    return commands
+
+
+# --- Rendering -----------------------------------------------------------
+
+
+class _TileConfig(NamedTuple):
+    data_file: Path
+    index_file: Path
+    min_zoom: int
+    max_zoom: int
+    extent: int
+    buffer: int
+    tolerance: float
+    properties: Tuple[str, ...]
+    class_zooms: bool
+    provinces_dir: Optional[Path]
+
+
+class _Source:
+    """Projected features of one layer, with a per-zoom simplified cache."""
+
+    def __init__(
+        self,
+        geoms: np.ndarray,
+        properties: List[Dict[str, Any]],
+        ids: List[Optional[int]],
+        min_zooms: np.ndarray,
+    ) -> None:
+        self.geoms = geoms
+        self.properties = properties
+        self.ids = ids
+        self.min_zooms = min_zooms
+        self.families = np.array(
+            [_FAMILY.get(t, 0) for t in shapely.get_type_id(geoms).tolist()], dtype=np.int8
+        )
+        self._zooms: Dict[int, Tuple[np.ndarray, np.ndarray, Any]] = {}
+
+    def at_zoom(self, zoom: int, tolerance_m: float):
+        """(positions, simplified geometries, STRtree) visible at ``zoom``."""
+        cached = self._zooms.get(zoom)
+        if cached is None:
+            positions = np.flatnonzero(self.min_zooms <= zoom)
+            geoms = self.geoms[positions].copy()
+            polygonal = self.families[positions] == _POLYGON
+            if tolerance_m > 0 and len(geoms):
+                geoms[~polygonal] = shapely.simplify(
+                    geoms[~polygonal], tolerance_m, preserve_topology=False
+                )
+                geoms[polygonal] = shapely.simplify(
+                    geoms[polygonal], tolerance_m, preserve_topology=True
+                )
+            cached = self._zooms[zoom] = (positions, geoms, shapely.STRtree(geoms))
+        return cached
+
+
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(config: _TileConfig, backend: str) -> None:
+    geojson_io.set_backend(backend)
+    _WORKER.clear()
+    _WORKER["config"] = config
+    _WORKER["tree"] = PackedRTree(config.index_file)
+    _WORKER["provinces"] = None
+    if config.provinces_dir is not None:
+        _WORKER["provinces"] = _province_source(config.provinces_dir)
+
+
+def _province_source(boundary_dir: Path) -> _Source:
+    tagger = ProvinceTagger(boundary_dir)
+    properties = [{"name": p.name, "code": p.code} for p in tagger.provinces]
+    count = len(tagger.geoms)
+    return _Source(
+        to_mercator(tagger.geoms), properties, [None] * count, np.zeros(count, dtype=np.int64)
+    )
+
+
+def _osm_number(value: Any) -> Optional[int]:
+    if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+        return value
+    if isinstance(value, str):
+        tail = value.rsplit("/", 1)[-1]
+        if tail.isdigit():
+            return int(tail)
+    return None
+
+
+def _decode_head(record: bytes) -> Tuple[Any, Dict[str, Any]]:
+    if msgspec is not None:
+        head = _HEAD_DECODER.decode(record)
+        return head.id, head.properties or {}
+    doc = geojson_io.loads(record)
+    return doc.get("id"), doc.get("properties") or {}
+
+
+def _road_source(
+    bounds: Tuple[float, float, float, float], last_zoom: int, config: _TileConfig
+) -> Optional[_Source]:
+    tree: PackedRTree = _WORKER["tree"]
+    positions = tree.search(*bounds)
+    if not len(positions):
+        return None
+    records, properties, ids, min_zooms = [], [], [], []
+    with config.data_file.open("rb") as f:
+        for pos in positions.tolist():
+            f.seek(int(tree.offsets[pos]))
+            record = f.read(int(tree.lengths[pos]))
+            try:
+                feature_id, props = _decode_head(record)
+            except ValueError:
+                continue
+            min_zoom = config.min_zoom
+            if config.class_zooms:
+                min_zoom = HIGHWAY_MIN_ZOOM.get(props.get("highway"), DEFAULT_CLASS_ZOOM)
+            if min_zoom > last_zoom:
+                continue
+            records.append(record)
+            properties.append({k: props[k] for k in config.properties if k in props})
+            number = _osm_number(feature_id if feature_id is not None else props.get("@id"))
+            ids.append(number)
+            min_zooms.append(min_zoom)
+    if not records:
+        return None
+    geoms = shapely.from_geojson(records, on_invalid="ignore")
+    present = np.flatnonzero(np.not_equal(geoms, None))
+    if not len(present):
+        return None
+    return _Source(
+        to_mercator(geoms[present]),
+        [properties[i] for i in present.tolist()],
+        [ids[i] for i in present.tolist()],
+        np.asarray(min_zooms, dtype=np.int64)[present],
+    )
+
+
+def _render_layer(
+    layer: _Layer, source: _Source, zoom: int, x: int, y: int, config: _TileConfig
+) -> None:
+    xmin, ymin, xmax, ymax = tile_bounds(zoom, x, y)
+    scale = config.extent / (xmax - xmin)
+    pad = config.buffer / scale
+    positions, geoms, tree = source.at_zoom(zoom, config.tolerance / scale)
+    hits = np.sort(tree.query(shapely.box(xmin - pad, ymin - pad, xmax + pad, ymax + pad)))
+    if not len(hits):
+        return
+    clipped = shapely.clip_by_rect(geoms[hits], xmin - pad, ymin - pad, xmax + pad, ymax + pad)
+    keep = ~shapely.is_empty(clipped)
+    hits, clipped = hits[keep], clipped[keep]
+    origin = np.array([xmin, ymax])
+    flip = np.array([scale, -scale])
+    local = shapely.transform(clipped, lambda xy: np.rint((xy - origin) * flip))
+    for hit, geom in zip(hits.tolist(), local):
+        pos = int(positions[hit])
+        family = int(source.families[pos])
+        commands = encode_geometry(geom, family)
+        if commands:
+            layer.add(family, commands, source.properties[pos], source.ids[pos])
+
+
+def _render_job(zoom: int, x: int, y: int, last_zoom: int) -> List[Tuple[int, int, int, bytes]]:
+    """Encode tile (zoom, x, y) and its descendants down to ``last_zoom``."""
+    config: _TileConfig = _WORKER["config"]
+    provinces: Optional[_Source] = _WORKER["provinces"]
+    lon0, lat0, lon1, lat1 = tile_lonlat_bounds(zoom, x, y)
+    # Buffer the read window by the clip buffer of the deepest zoom.
+    pad = (lon1 - lon0) * config.buffer / config.extent
+    roads = _road_source((lon0 - pad, lat0 - pad, lon1 + pad, lat1 + pad), last_zoom, config)
+    tiles = []
+    for z in range(zoom, last_zoom + 1):
+        span = 2 ** (z - zoom)
+        for tx in range(x * span, (x + 1) * span):
+            for ty in range(y * span, (y + 1) * span):
+                layers = []
+                if roads is not None:
+                    layer = _Layer("roads", config.extent)
+                    _render_layer(layer, roads, z, tx, ty, config)
+                    layers.append(layer)
+                if provinces is not None:
+                    layer = _Layer("provinces", config.extent)
+                    _render_layer(layer, provinces, z, tx, ty, config)
+                    layers.append(layer)
+                data = b"".join(_field(3, layer.encode()) for layer in layers if len(layer))
+                if data:
+                    tiles.append((z, tx, ty, gzip.compress(data, mtime=0)))
+    return tiles
+
+
+# --- MBTiles -------------------------------------------------------------
+
+
+def _open_mbtiles(path: Path) -> sqlite3.Connection:
+    path.unlink(missing_ok=True)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode = OFF")
+    db.execute("PRAGMA synchronous = OFF")
+    db.executescript(
+        """
+        CREATE TABLE metadata (name TEXT, value TEXT);
+        CREATE TABLE tiles (
+            zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB
+        );
+        """
+    )
+    return db
+
+
+def _write_metadata(
+    db: sqlite3.Connection,
+    name: str,
+    bounds: Tuple[float, float, float, float],
+    config: _TileConfig,
+) -> None:
+    layers = [{
+        "id": "roads",
+        "fields": {key: "String" for key in config.properties},
+        "minzoom": config.min_zoom,
+        "maxzoom": config.max_zoom,
+    }]
+    if config.provinces_dir is not None:
+        layers.append({
+            "id": "provinces",
+            "fields": {"name": "String", "code": "String"},
+            "minzoom": config.min_zoom,
+            "maxzoom": config.max_zoom,
+        })
+    center_zoom = min(max(config.min_zoom, 8), config.max_zoom)
+    metadata = {
+        "name": name,
+        "format": "pbf",
+        "type": "overlay",
+        "version": "1",
+        "description": "Jalan Pulau Jawa (OpenStreetMap)",
+        "attribution": "© OpenStreetMap contributors",
+        "bounds": ",".join(f"{v:.6f}" for v in bounds),
+        "center": f"{(bounds[0] + bounds[2]) / 2:.6f},{(bounds[1] + bounds[3]) / 2:.6f},{center_zoom}",
+        "minzoom": str(config.min_zoom),
+        "maxzoom": str(config.max_zoom),
+        "json": geojson_io.dumps({"vector_layers": layers}).decode("utf-8"),
+    }
+    db.executemany("INSERT INTO metadata VALUES (?, ?)", metadata.items())
+
+
+def _jobs(
+    tree: PackedRTree, bounds: Tuple[float, float, float, float], job_zoom: int, config: _TileConfig
+) -> List[Tuple[int, int, int, int]]:
+    """(zoom, x, y, last zoom) per job, biggest (lowest zoom) first."""
+    jobs = []
+    for zoom in range(config.min_zoom, job_zoom + 1):
+        last = config.max_zoom if zoom == job_zoom else zoom
+        for x, y in tiles_in_bounds(bounds, zoom):
+            if config.provinces_dir is None and not len(
+                tree.search(*tile_lonlat_bounds(zoom, x, y))
+            ):
+                continue
+            jobs.append((zoom, x, y, last))
+    return jobs
+
+
+def export_mbtiles(
+    data_file: Path,
+    output_file: Path,
+    config: _TileConfig,
+    job_zoom: int = DEFAULT_JOB_ZOOM,
+    workers: int = 1,
+) -> Dict[int, int]:
+    """Render the tile pyramid; return the tile count per zoom."""
+    index_file = config.index_file
+    with instrumentation.stage("index"):
+        if not index_file.exists() or PackedRTree(index_file).is_stale(data_file):
+            build_index(data_file, index_file)
+        tree = PackedRTree(index_file)
+    bounds = tuple(tree.header["bbox"])
+    if config.provinces_dir is not None:
+        provinces = _province_source(config.provinces_dir)
+        lon0, lat0, lon1, lat1 = shapely.total_bounds(
+            shapely.transform(provinces.geoms, _unproject)
+        ).tolist()
+        bounds = (
+            min(bounds[0], lon0), min(bounds[1], lat0), max(bounds[2], lon1), max(bounds[3], lat1)
+        )
+    job_zoom = min(max(job_zoom, config.min_zoom), config.max_zoom)
+    jobs = _jobs(tree, bounds, job_zoom, config)
+    print(f"🧱 Tiles z{config.min_zoom}-z{config.max_zoom} from {data_file}")
+    print(f"   {len(jobs)} jobs (one per tile above z{job_zoom}, subtrees from z{job_zoom})")
+    if workers > 1:
+        print(f"   Workers: {workers}")
+
+    start = time.perf_counter()
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = output_file.with_name(output_file.name + ".tmp")
+    db = _open_mbtiles(tmp_file)
+    counts: Dict[int, int] = {}
+    total_bytes = 0
+
+    def store(tiles: List[Tuple[int, int, int, bytes]]) -> None:
+        nonlocal total_bytes
+        # MBTiles rows are TMS: y counts from the south.
+        db.executemany(
+            "INSERT INTO tiles VALUES (?, ?, ?, ?)",
+            [(z, x, (1 << z) - 1 - y, data) for z, x, y, data in tiles],
+        )
+        for z, _, _, data in tiles:
+            counts[z] = counts.get(z, 0) + 1
+            total_bytes += len(data)
+
+    backend = geojson_io.backend_name()
+    try:
+        with instrumentation.stage("render"):
+            if workers > 1:
+                with ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_worker, initargs=(config, backend)
+                ) as pool:
+                    futures = [pool.submit(_render_job, *job) for job in jobs]
+                    for done, future in enumerate(as_completed(futures), 1):
+                        store(future.result())
+                        if done % 100 == 0:
+                            print(f"   {done}/{len(jobs)} jobs, {sum(counts.values())} tiles")
+            else:
+                _init_worker(config, backend)
+                for done, job in enumerate(jobs, 1):
+                    store(_render_job(*job))
+                    if done % 100 == 0:
+                        print(f"   {done}/{len(jobs)} jobs, {sum(counts.values())} tiles")
+        db.execute(
+            "CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row)"
+        )
+        _write_metadata(db, output_file.stem, bounds, config)
+        db.commit()
+    finally:
+        db.close()
+    tmp_file.replace(output_file)
+
+    elapsed = time.perf_counter() - start
+    tiles = sum(counts.values())
+    for zoom in sorted(counts):
+        print(f"   z{zoom}: {counts[zoom]} tiles")
+    print(
+        f"Done. {tiles} tiles, {total_bytes / 1e6:.1f} MB in {elapsed:.1f}s "
+        f"({tiles / max(elapsed, 1e-9):.0f} tiles/s)"
+    )
+    print(f"💾 Saved to: {output_file}")
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Render merged roads into vector tiles (MVT) in an MBTiles file."
+    )
+    parser.add_argument(
+        "--input",
+        default="final-pulau-jawa/final_pulau_jawa.geojson",
+        help="Merged road file (default: final-pulau-jawa/final_pulau_jawa.geojson)",
+    )
+    parser.add_argument(
+        "--output",
+        default="final-pulau-jawa/final_pulau_jawa.mbtiles",
+        help="MBTiles file (default: final-pulau-jawa/final_pulau_jawa.mbtiles)",
+    )
+    parser.add_argument("--index", help="Spatial index (default: <input>.rtree, built if missing)")
+    parser.add_argument("--min-zoom", type=int, default=DEFAULT_MIN_ZOOM)
+    parser.add_argument("--max-zoom", type=int, default=DEFAULT_MAX_ZOOM)
+    parser.add_argument(
+        "--job-zoom",
+        type=int,
+        default=DEFAULT_JOB_ZOOM,
+        help=f"Zoom whose tiles become per-subtree jobs (default: {DEFAULT_JOB_ZOOM})",
+    )
+    parser.add_argument("--extent", type=int, default=DEFAULT_EXTENT, help="Tile extent")
+    parser.add_argument(
+        "--buffer",
+        type=int,
+        default=DEFAULT_BUFFER,
+        help=f"Clip buffer in tile units (default: {DEFAULT_BUFFER})",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Simplification tolerance in tile units, 0 = off (default: {DEFAULT_TOLERANCE:g})",
+    )
+    parser.add_argument(
+        "--properties",
+        default=",".join(DEFAULT_PROPERTIES),
+        help=f"Comma-separated properties to keep (default: {','.join(DEFAULT_PROPERTIES)})",
+    )
+    parser.add_argument(
+        "--all-classes",
+        action="store_true",
+        help="Show every road from --min-zoom instead of per-highway-class zooms",
+    )
+    parser.add_argument(
+        "--provinces",
+        nargs="?",
+        const="boundaries-provinsi-pulau-jawa",
+        help="Add a provinces layer from DIR (default DIR: boundaries-provinsi-pulau-jawa)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Render jobs in N processes (default: 1; 0 = all CPUs)",
+    )
+    geojson_io.add_arguments(parser)
+    args = parser.parse_args()
+    geojson_io.configure(args)
+
+    data_file = Path(args.input)
+    if not data_file.exists():
+        print(f"❌ Input file not found: {data_file}")
+        exit(1)
+    if not 0 <= args.min_zoom <= args.max_zoom <= 24:
+        print("❌ Need 0 <= --min-zoom <= --max-zoom <= 24")
+        exit(1)
+    config = _TileConfig(
+        data_file=data_file,
+        index_file=Path(args.index) if args.index else index_path_for(data_file),
+        min_zoom=args.min_zoom,
+        max_zoom=args.max_zoom,
+        extent=args.extent,
+        buffer=args.buffer,
+        tolerance=args.tolerance,
+        properties=tuple(p for p in args.properties.split(",") if p),
+        class_zooms=not args.all_classes,
+        provinces_dir=Path(args.provinces) if args.provinces else None,
+    )
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    export_mbtiles(data_file, Path(args.output), config, args.job_zoom, workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Random access to a merged road file through its offset index.
+
+merge_osm_results.py writes one feature per line and, with ``--index``,
+a ``<output>.idx`` sidecar: little-endian uint64 byte offsets, one per
+feature plus an end sentinel. ``FeatureReader`` memory-maps both files,
+so opening the full Java network costs two ``mmap`` calls. Feature #N is
+decoded only when asked for, and slices, random samples and byte-balanced
+partitions for parallel consumers come straight from the offsets.
+
+Outputs written without ``--index`` can get one afterwards with
+``--build-index`` (one sequential scan, no JSON parsing).
+"""
+import argparse
+import bisect
+import collections
+import itertools
+import mmap
+import random
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import geojson_io
+import instrumentation
+
+_RS = b"\x1e"
+
+
+def index_path_for(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+def build_index(path: Path, index_path: Optional[Path] = None) -> int:
+    """Write the offset sidecar for an existing output; return the feature count."""
+    index_path = index_path or index_path_for(path)
+    offsets = array("Q")
+    # Same offsets as merge_osm_results --index: records start at their RS
+    # prefix, and the sentinel follows the last record's "\n" unless that
+    # newline belongs to a FeatureCollection footer.
+    has_header = False
+    end = pos = 0
+    with path.open("rb") as f:
+        for line in f:
+            record = line.rstrip(b",\r\n")
+            if record.startswith((b'{"', _RS + b"{")) or record in (b"{}", _RS + b"{}"):
+                offsets.append(pos)
+                end = pos + (len(record) if has_header else len(line))
+            elif not offsets:
+                has_header = True
+            pos += len(line)
+    count = len(offsets)
+    offsets.append(end)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    tmp = index_path.with_name(index_path.name + ".tmp")
+    with tmp.open("wb") as f:
+        offsets.tofile(f)
+    tmp.replace(index_path)
+    return count
+
+
+class FeatureReader:
+    """Memory-mapped, lazily decoded view of a merged output.
+
+    ``reader[n]`` and ``reader[a:b]`` return decoded features, ``record(n)``
+    the raw JSON bytes. Instances hold open mappings; use as a context
+    manager or call ``close()``.
+    """
+
+    def __init__(self, path: Path, index_path: Optional[Path] = None) -> None:
+        self.path = Path(path)
+        self.index_path = Path(index_path) if index_path else index_path_for(self.path)
+        if not self.index_path.exists():
+            raise FileNotFoundError(
+                f"No offset index {self.index_path}; merge with --index or run "
+                f"feature_reader.py --build-index {self.path}"
+            )
+        self._data = self._map(self.path)
+        self._index = self._map(self.index_path)
+        self._view = memoryview(self._index if self._index is not None else b"")
+        if sys.byteorder == "little":
+            offsets = self._view.cast("Q")
+        else:
+            swapped = array("Q", self._view)
+            swapped.byteswap()
+            offsets = memoryview(swapped)
+        self._offsets = offsets
+        size = len(self._data) if self._data is not None else 0
+        if not offsets or offsets[-1] > size or (
+            len(offsets) > 1 and self._data[offsets[0]:offsets[0] + 1] not in (b"{", _RS)
+        ):
+            self.close()
+            raise ValueError(
+                f"Offset index {self.index_path} does not match {self.path}; rebuild it "
+                "with --build-index"
+            )
+
+    @staticmethod
+    def _map(path: Path) -> Optional[mmap.mmap]:
+        with path.open("rb") as f:
+            if not path.stat().st_size:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __enter__(self) -> "FeatureReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._offsets.release()
+        self._view.release()
+        self._offsets = memoryview(array("Q"))
+        for name in ("_data", "_index"):
+            mapped = getattr(self, name, None)
+            if mapped is not None:
+                try:
+                    mapped.close()
+                except BufferError:
+                    # Caller still holds views; the mapping is released with them.
+                    pass
+            setattr(self, name, None)
+
+    def _span(self, idx: int) -> Tuple[int, int]:
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        return self._offsets[idx], self._offsets[idx + 1]
+
+    @staticmethod
+    def _strip(raw: bytes) -> bytes:
+        # Drop the RS prefix (geojsonseq) and the ",\n"/"\n" record trailer.
+        raw = raw.rstrip(b",\r\n \t")
+        return raw[1:] if raw.startswith(_RS) else raw
+
+    def record(self, idx: int) -> bytes:
+        """Raw JSON text of feature ``idx``."""
+        start, end = self._span(idx)
+        return self._strip(self._data[start:end])
+
+    def feature(self, idx: int) -> Dict[str, Any]:
+        return geojson_io.loads(self.record(idx))
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return list(self.iter_features(start, stop))
+            return [self.feature(idx) for idx in range(start, stop, step)]
+        return self.feature(key)
+
+    def iter_records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[bytes]:
+        """Raw JSON of features ``start``..``stop``, read front to back."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        offsets, data, strip = self._offsets, self._data, self._strip
+        for i in range(start, stop):
+            yield strip(data[offsets[i]:offsets[i + 1]])
+
+    def iter_features(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        loads = geojson_io.get_backend().loads
+        for record in self.iter_records(start, stop):
+            yield loads(record)
+
+    def sample(self, k: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """``k`` distinct features picked uniformly at random, in file order."""
+        picks = sorted(random.Random(seed).sample(range(len(self)), min(k, len(self))))
+        return [self.feature(idx) for idx in picks]
+
+    def partitions(self, parts: int) -> List[Tuple[int, int]]:
+        """Split into up to ``parts`` (start, stop) feature ranges of similar byte size."""
+        n = len(self)
+        if not n:
+            return []
+        parts = max(1, min(parts, n))
+        first, last = self._offsets[0], self._offsets[n]
+        bounds = [0]
+        for p in range(1, parts):
+            target = first + (last - first) * p // parts
+            cut = bisect.bisect_left(self._offsets, target, bounds[-1] + 1, n)
+            if bounds[-1] < cut < n:
+                bounds.append(cut)
+        bounds.append(n)
+        return list(zip(bounds, bounds[1:]))
+
+
+def _run_partition(
+    path: Path,
+    index_path: Optional[Path],
+    func: Callable[[Iterator[Dict[str, Any]]], Any],
+    start: int,
+    stop: int,
+) -> Any:
+    with FeatureReader(path, index_path) as reader:
+        return func(reader.iter_features(start, stop))
+
+
+def map_partitions(
+    path: Path,
+    func: Callable[[Iterator[Dict[str, Any]]], Any],
+    workers: int = 1,
+    parts: Optional[int] = None,
+    index_path: Optional[Path] = None,
+) -> List[Any]:
+    """Run ``func(features)`` over byte-balanced partitions; results in file order.
+
+    ``func`` must be picklable (a module-level function). Each worker maps
+    the file itself, so partitions share the page cache instead of being
+    copied between processes.
+    """
+    with FeatureReader(path, index_path) as reader:
+        ranges = reader.partitions(parts or workers)
+    if workers <= 1:
+        return [_run_partition(path, index_path, func, start, stop) for start, stop in ranges]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_run_partition, path, index_path, func, start, stop)
+            for start, stop in ranges
+        ]
+        return [future.result() for future in futures]
+
+
+class _PropertyCounter:
+    """Picklable partition function: count values of one property."""
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+    def __call__(self, features: Iterator[Dict[str, Any]]) -> collections.Counter:
+        return collections.Counter(
+            (feature.get("properties") or {}).get(self.key) for feature in features
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Random access to a merged road file through its offset index."
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="final-pulau-jawa/final_pulau_jawa.geojson",
+        help="Merged output (default: final-pulau-jawa/final_pulau_jawa.geojson)",
+    )
+    parser.add_argument(
+        "--build-index",
+        action="store_true",
+        help="(Re)write <input>.idx by scanning the file",
+    )
+    parser.add_argument(
+        "--feature",
+        type=int,
+        action="append",
+        default=[],
+        help="Print feature N as GeoJSON (repeatable, negative counts from the end)",
+    )
+    parser.add_argument("--sample", type=int, default=0, help="Print K random features")
+    parser.add_argument("--seed", type=int, help="Random seed for --sample")
+    parser.add_argument(
+        "--count-by",
+        metavar="PROPERTY",
+        help="Count features per value of PROPERTY over parallel partitions",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes for --count-by (default: 1)",
+    )
+    geojson_io.add_arguments(parser)
+    args = parser.parse_args()
+    geojson_io.configure(args)
+
+    path = Path(args.input)
+    if not path.exists():
+        print(f"❌ Input file not found: {path}")
+        exit(1)
+    if args.build_index:
+        start = time.perf_counter()
+        with instrumentation.stage("build_index") as index_stage:
+            count = build_index(path)
+            index_stage.features = count
+        print(
+            f"💾 Saved to: {index_path_for(path)} ({count} features, "
+            f"{time.perf_counter() - start:.1f}s)"
+        )
+
+    start = time.perf_counter()
+    with FeatureReader(path) as reader:
+        elapsed = time.perf_counter() - start
+        print(f"📄 {reader.path}")
+        print(f"   Opened in {elapsed * 1000:.1f} ms")
+        print(f"   Features: {len(reader)}")
+        for idx in args.feature:
+            print(reader.record(idx).decode("utf-8"))
+        for feature in reader.sample(args.sample, args.seed) if args.sample else []:
+            print(geojson_io.dumps(feature).decode("utf-8"))
+
+    if args.count_by:
+        start = time.perf_counter()
+        with instrumentation.stage("count_by"):
+            counts = sum(
+                map_partitions(path, _PropertyCounter(args.count_by), workers=args.workers),
+                collections.Counter(),
+            )
+        print(
+            f"   {args.count_by} over {max(1, args.workers)} workers "
+            f"in {time.perf_counter() - start:.1f}s:"
+        )
+        for value, count in itertools.islice(counts.most_common(), 20):
+            print(f"     {value}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Parallel statistics over large road outputs for verify_split.py.
+
+Merged outputs (merge_osm_results.py, every ``--format``) keep one feature
+per line, so a file can be cut into byte ranges that worker processes read
+on their own: each aligns to the next line, decodes its records in batches
+and returns a ``FeatureStats``. The partial aggregates are merged at the
+end, so no process ever holds more than one batch.
+
+Per batch, ``properties.highway`` is read with a partial msgspec decode
+(the coordinates are skipped, not built) and geometries are parsed straight
+from the record bytes by ``shapely.from_geojson``; counts, bounds, validity
+and haversine lengths are then all vectorized.
+
+Pretty-printed documents cannot be cut by line; they are streamed through
+``merge_osm_results.iter_file_features`` in one process instead.
+"""
+import collections
+import math
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    import shapely
+except ImportError as exc:
+    raise SystemExit(
+        "Shapely is required. Install it with: pip install shapely"
+    ) from exc
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+import geojson_io
+from merge_osm_results import OUTPUT_FORMATS, iter_file_features
+from road_graph import haversine_m
+
+DEFAULT_BATCH_SIZE = 20000
+# Partitions per worker, so one slow range does not hold up the rest.
+_PARTS_PER_WORKER = 4
+_PEEK_SIZE = 1 << 16
+_RS = b"\x1e"
+_TYPE_RE = re.compile(rb'"type"\s*:\s*"(\w+)"')
+_COLLECTION_HEADER = OUTPUT_FORMATS["geojson"].header
+
+_TYPE_NAMES = {
+    int(shapely.GeometryType.POINT): "Point",
+    int(shapely.GeometryType.LINESTRING): "LineString",
+    int(shapely.GeometryType.LINEARRING): "LinearRing",
+    int(shapely.GeometryType.POLYGON): "Polygon",
+    int(shapely.GeometryType.MULTIPOINT): "MultiPoint",
+    int(shapely.GeometryType.MULTILINESTRING): "MultiLineString",
+    int(shapely.GeometryType.MULTIPOLYGON): "MultiPolygon",
+    int(shapely.GeometryType.GEOMETRYCOLLECTION): "GeometryCollection",
+}
+_POLYGONAL = [int(shapely.GeometryType.POLYGON), int(shapely.GeometryType.MULTIPOLYGON)]
+
+if msgspec is not None:
+
+    class _Properties(msgspec.Struct):
+        highway: Any = None
+
+    # Everything else in a record (geometry included) is skipped unparsed.
+    class _Record(msgspec.Struct):
+        type: Optional[str] = None
+        properties: Optional[_Properties] = None
+        features: Optional[List[msgspec.Raw]] = None
+
+    _RECORD_DECODER = msgspec.json.Decoder(_Record)
+
+
+def _decode(record: bytes) -> Tuple[Optional[str], Any, Optional[List[bytes]]]:
+    """(type, highway, member features) of one record; raises ValueError."""
+    if msgspec is not None:
+        doc = _RECORD_DECODER.decode(record)
+        highway = doc.properties.highway if doc.properties is not None else None
+        features = [bytes(raw) for raw in doc.features] if doc.features is not None else None
+        return doc.type, highway, features
+    doc = geojson_io.loads(record)
+    if not isinstance(doc, dict):
+        raise ValueError("record is not a JSON object")
+    features = doc.get("features")
+    if isinstance(features, list):
+        features = [geojson_io.dumps(f) for f in features]
+    else:
+        features = None
+    return doc.get("type"), (doc.get("properties") or {}).get("highway"), features
+
+
+def _line_record(line: bytes) -> Optional[bytes]:
+    record = line.rstrip(b",\r\n \t")
+    if record.startswith(_RS):
+        record = record[1:]
+    if record.startswith(b'{"') or record == b"{}":
+        return record
+    return None
+
+
+class FeatureStats:
+    """Mergeable aggregate of one file or one partition of it."""
+
+    def __init__(self) -> None:
+        self.features = 0
+        self.errors = 0
+        self.null_geometries = 0
+        self.invalid = 0
+        self.vertices = 0
+        self.types: collections.Counter = collections.Counter()
+        self.highways: collections.Counter = collections.Counter()
+        self.length_m: collections.Counter = collections.Counter()
+        self.bounds = [math.inf, math.inf, -math.inf, -math.inf]
+
+    def merge(self, other: "FeatureStats") -> "FeatureStats":
+        for name in ("features", "errors", "null_geometries", "invalid", "vertices"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.types.update(other.types)
+        self.highways.update(other.highways)
+        self.length_m.update(other.length_m)
+        self.merge_bounds(*other.bounds)
+        return self
+
+    def add_records(self, records: List[bytes]) -> None:
+        """Aggregate a batch of serialized Features (or whole collections)."""
+        good: List[bytes] = []
+        highways: List[Any] = []
+        for record in records:
+            try:
+                doc_type, highway, members = _decode(record)
+            except ValueError:
+                self.errors += 1
+                continue
+            if members is not None and doc_type == "FeatureCollection":
+                for start in range(0, len(members), DEFAULT_BATCH_SIZE):
+                    self.add_records(members[start:start + DEFAULT_BATCH_SIZE])
+                continue
+            good.append(record)
+            highways.append(highway if isinstance(highway, str) else None)
+        if not good:
+            return
+        self.features += len(good)
+        self.highways.update(highways)
+
+        geoms = shapely.from_geojson(good, on_invalid="ignore")
+        present = np.not_equal(geoms, None)
+        self.null_geometries += int(len(geoms) - present.sum())
+        geoms = geoms[present]
+        highways = [h for h, keep in zip(highways, present.tolist()) if keep]
+        if not len(geoms):
+            return
+
+        type_ids, type_counts = np.unique(shapely.get_type_id(geoms), return_counts=True)
+        for type_id, count in zip(type_ids.tolist(), type_counts.tolist()):
+            self.types[_TYPE_NAMES.get(type_id, str(type_id))] += count
+        self.vertices += int(shapely.get_num_coordinates(geoms).sum())
+        self.invalid += int((~shapely.is_valid(geoms)).sum())
+        nonempty = geoms[~shapely.is_empty(geoms)]
+        if len(nonempty):
+            xmin, ymin, xmax, ymax = shapely.total_bounds(nonempty).tolist()
+            self.merge_bounds(xmin, ymin, xmax, ymax)
+
+        # Polygons count with their outline length.
+        lines = geoms.copy()
+        polygonal = np.isin(shapely.get_type_id(geoms), _POLYGONAL)
+        lines[polygonal] = shapely.boundary(geoms[polygonal])
+        parts, owner = shapely.get_parts(lines, return_index=True)
+        coords, part_of = shapely.get_coordinates(parts, return_index=True)
+        same = part_of[1:] == part_of[:-1]
+        start, end = coords[:-1][same], coords[1:][same]
+        segment = haversine_m(start[:, 0], start[:, 1], end[:, 0], end[:, 1])
+        per_feature = np.bincount(
+            owner[part_of[1:][same]], weights=segment, minlength=len(geoms)
+        )
+        for highway, length in zip(highways, per_feature.tolist()):
+            self.length_m[highway] += length
+
+    def merge_bounds(self, xmin: float, ymin: float, xmax: float, ymax: float) -> None:
+        self.bounds = [
+            min(self.bounds[0], xmin),
+            min(self.bounds[1], ymin),
+            max(self.bounds[2], xmax),
+            max(self.bounds[3], ymax),
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "features": self.features,
+            "errors": self.errors,
+            "null_geometries": self.null_geometries,
+            "invalid": self.invalid,
+            "vertices": self.vertices,
+            "types": dict(self.types),
+            "highways": {str(k): v for k, v in self.highways.items()},
+            "length_m": {str(k): v for k, v in self.length_m.items()},
+            "bounds": self.bounds if self.bounds[0] <= self.bounds[2] else None,
+        }
+
+
+def is_line_delimited(path: Path) -> bool:
+    """True if every feature sits on its own line (merge outputs, GeoJSONSeq)."""
+    with Path(path).open("rb") as f:
+        head = f.read(len(_COLLECTION_HEADER))
+        if head == _COLLECTION_HEADER:
+            # json.dump(indent=2) starts the same way; its features span lines.
+            following = f.readline(_PEEK_SIZE)
+            return _line_record(following) is not None or not following.strip()
+        f.seek(0)
+        first = f.readline(_PEEK_SIZE).lstrip(b" \t")
+    return first.startswith((_RS, b'{"')) or first.rstrip() == b"{}"
+
+
+def peek_type(path: Path) -> Optional[str]:
+    """First ``"type"`` value in the file; the top-level one in practice."""
+    with Path(path).open("rb") as f:
+        match = _TYPE_RE.search(f.read(_PEEK_SIZE))
+    return match.group(1).decode("ascii") if match else None
+
+
+def _partition_stats(path: Path, start: int, end: int, batch_size: int) -> FeatureStats:
+    """Stats of the lines that begin in ``[start, end)`` (runs in a worker)."""
+    stats = FeatureStats()
+    batch: List[bytes] = []
+    with Path(path).open("rb") as f:
+        if start:
+            # The line straddling ``start`` belongs to the previous range.
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            record = _line_record(line)
+            if record is None:
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                stats.add_records(batch)
+                batch = []
+    stats.add_records(batch)
+    return stats
+
+
+def _stream_stats(path: Path, batch_size: int) -> FeatureStats:
+    stats = FeatureStats()
+    batch: List[bytes] = []
+    dumps = geojson_io.get_backend().dumps
+    for feature in iter_file_features(path):
+        batch.append(dumps(feature))
+        if len(batch) >= batch_size:
+            stats.add_records(batch)
+            batch = []
+    stats.add_records(batch)
+    return stats
+
+
+def compute_stats(
+    path: Path, workers: int = 1, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Tuple[FeatureStats, float]:
+    """Aggregate stats of ``path``; returns (stats, elapsed seconds)."""
+    start_time = time.perf_counter()
+    path = Path(path)
+    if not is_line_delimited(path):
+        return _stream_stats(path, batch_size), time.perf_counter() - start_time
+    size = os.path.getsize(path)
+    parts = max(1, workers * _PARTS_PER_WORKER) if workers > 1 else 1
+    bounds = [size * i // parts for i in range(parts + 1)]
+    ranges = list(zip(bounds, bounds[1:]))
+    stats = FeatureStats()
+    if workers <= 1:
+        for lo, hi in ranges:
+            stats.merge(_partition_stats(path, lo, hi, batch_size))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_partition_stats, path, lo, hi, batch_size) for lo, hi in ranges
+            ]
+            for future in futures:
+                stats.merge(future.result())
+    return stats, time.perf_counter() - start_time
@@ -1,80 +1,388 @@
 #!/usr/bin/env python3
 import argparse
-import json
+import itertools
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 try:
-    from shapely.geometry import shape, mapping
-    from shapely.validation import make_valid
+    import numpy as np
+    import shapely
+    from shapely.geometry import (
+        MultiLineString,
+        MultiPoint,
+        MultiPolygon,
+        mapping,
+    )
 except ImportError:
     print("ERROR: shapely not installed. Install with: pip3 install shapely")
     exit(1)
 
+import geojson_io
+import instrumentation
+
+_POLYGON_TYPE_ID = 3
+_COLLECTION_TYPE_IDS = (4, 5, 6, 7)  # Multi* and GeometryCollection
+
+
+def _polygon_parts(geoms: np.ndarray) -> np.ndarray:
+    """Flatten a geometry array to its non-empty Polygon parts, vectorized.
+
+    get_parts only unpacks one level, so it is repeated until no Multi* or
+    GeometryCollection (e.g. from make_valid) is left.
+    """
+    parts = shapely.get_parts(geoms)
+    while np.isin(shapely.get_type_id(parts), _COLLECTION_TYPE_IDS).any():
+        parts = shapely.get_parts(parts)
+    keep = (shapely.get_type_id(parts) == _POLYGON_TYPE_ID) & ~shapely.is_empty(parts)
+    return parts[keep]
+
+
+def _multipolygon_coordinates(polygons: np.ndarray) -> List:
+    """GeoJSON MultiPolygon coordinates from a Polygon array via to_ragged_array."""
+    _, coords, (ring_offsets, polygon_offsets) = shapely.to_ragged_array(polygons)
+    rings = np.split(coords, ring_offsets[1:-1])
+    return [
+        [ring.tolist() for ring in rings[start:end]]
+        for start, end in zip(polygon_offsets[:-1], polygon_offsets[1:])
+    ]
+
+
+# Geometry type -> (topological dimension, Multi* type used to collect parts)
+_TYPE_FAMILY = {
+    "Point": (0, "MultiPoint"),
+    "MultiPoint": (0, "MultiPoint"),
+    "LineString": (1, "MultiLineString"),
+    "MultiLineString": (1, "MultiLineString"),
+    "Polygon": (2, "MultiPolygon"),
+    "MultiPolygon": (2, "MultiPolygon"),
+}
+_MULTI_CLASSES = {
+    "MultiPoint": MultiPoint,
+    "MultiLineString": MultiLineString,
+    "MultiPolygon": MultiPolygon,
+}
+_DEFAULT_BATCH_SIZE = 10000
 
-def _extract_polygons(geom) -> List:
-    if geom.geom_type == "Polygon":
-        return [geom]
-    if geom.geom_type == "MultiPolygon":
-        return list(geom.geoms)
-    if geom.geom_type == "GeometryCollection":
-        polygons = []
+
+def _single_parts(geom) -> Iterator:
+    """Yield the non-empty single-part geometries inside ``geom``."""
+    if geom.geom_type.startswith("Multi") or geom.geom_type == "GeometryCollection":
         for g in geom.geoms:
-            if g.geom_type in ("Polygon", "MultiPolygon"):
-                polygons.extend(_extract_polygons(g))
-        return polygons
-    return []
+            yield from _single_parts(g)
+    elif not geom.is_empty:
+        yield geom
+
+
+def _restore_type(geom, geom_type: str) -> Tuple[Optional[Any], str]:
+    """Coerce a make_valid result back to the family of ``geom_type``.
+
+    Parts of a lower dimension (e.g. the collapsed point of a degenerate
+    LineString) are dropped. A single-part type only becomes Multi* when the
+    repair genuinely split it. Returns (geometry or None, action); None means
+    nothing of that dimension is left and the caller keeps the original.
+    """
+    family = _TYPE_FAMILY.get(geom_type)
+    if family is None:
+        return geom, "repaired"
+    dimension, multi_type = family
+    parts = [g for g in _single_parts(geom) if _TYPE_FAMILY[g.geom_type][0] == dimension]
+    if not parts:
+        return None, "kept"
+    if geom_type == multi_type:
+        return _MULTI_CLASSES[multi_type](parts), "repaired"
+    if len(parts) == 1:
+        return parts[0], "repaired"
+    if geom_type == "LineString":
+        merged = shapely.line_merge(MultiLineString(parts))
+        if merged.geom_type == "LineString":
+            return merged, "repaired"
+    return _MULTI_CLASSES[multi_type](parts), "promoted"
+
+
+def _positions(positions: Any) -> List:
+    """The entries of ``positions`` that have at least x and y."""
+    if not isinstance(positions, list):
+        return []
+    return [p for p in positions if isinstance(p, list) and len(p) >= 2]
+
+
+def _rebuild_polygon(rings: Any) -> Optional[List]:
+    """Close open rings and drop degenerate ones; None without a shell."""
+    closed = []
+    for ring in rings if isinstance(rings, list) else []:
+        ring = _positions(ring)
+        if ring and ring[0] != ring[-1]:
+            ring.append(ring[0])
+        closed.append(ring)
+    if not closed or len(closed[0]) < 4:
+        return None
+    return [closed[0]] + [ring for ring in closed[1:] if len(ring) >= 4]
+
+
+def _rebuild_coordinates(geom_type: str, coords: Any) -> Optional[Any]:
+    """Best-effort coordinates Shapely can parse, or None."""
+    if geom_type == "Point":
+        return coords if len(_positions([coords])) == 1 else None
+    if geom_type == "MultiPoint":
+        return _positions(coords) or None
+    if geom_type == "LineString":
+        line = _positions(coords)
+        return line if len(line) >= 2 else None
+    if geom_type == "MultiLineString":
+        lines = [_positions(line) for line in coords] if isinstance(coords, list) else []
+        return [line for line in lines if len(line) >= 2] or None
+    if geom_type == "Polygon":
+        return _rebuild_polygon(coords)
+    if geom_type == "MultiPolygon":
+        polygons = [_rebuild_polygon(p) for p in coords] if isinstance(coords, list) else []
+        return [p for p in polygons if p is not None] or None
+    return None
+
+
+def _rebuild(geometry: Dict) -> Tuple[Optional[Any], str]:
+    """Rebuild a geometry Shapely refused to parse, e.g. an unclosed ring.
+
+    Returns (geometry or None, action); None means it cannot be salvaged
+    and the caller keeps the original.
+    """
+    geom_type = geometry.get("type") if isinstance(geometry, dict) else None
+    coords = _rebuild_coordinates(geom_type, geometry.get("coordinates")) if geom_type else None
+    if coords is None:
+        return None, "kept"
+    geom = shapely.from_geojson(
+        geojson_io.dumps({"type": geom_type, "coordinates": coords}, compact=True),
+        on_invalid="ignore",
+    )
+    if geom is None:
+        return None, "kept"
+    if not shapely.is_valid(geom):
+        geom, _ = _restore_type(shapely.make_valid(geom), geom_type)
+        if geom is None:
+            return None, "kept"
+    return geom, "rebuilt"
+
+
+def _feature_id(feature: Dict) -> Any:
+    if "id" in feature:
+        return feature["id"]
+    return (feature.get("properties") or {}).get("@id")
+
+
+def _repair_batch(
+    features: List[Dict], start_index: int
+) -> Tuple[List[bytes], List[Dict]]:
+    """Validate and repair one batch; returns (encoded features, report rows).
+
+    Geometries are parsed, checked and repaired with Shapely's vectorized
+    functions; only the invalid ones are touched again in Python.
+    """
+    geometries = [f.get("geometry") for f in features]
+    texts = np.array(
+        [geojson_io.dumps(g, compact=True) if g else None for g in geometries], dtype=object
+    )
+    geoms = shapely.from_geojson(texts, on_invalid="ignore")
+    has_geometry = np.not_equal(texts, None)
+    parsed = np.not_equal(geoms, None)
+    invalid = np.flatnonzero(parsed & ~shapely.is_valid(geoms))
+    unparseable = np.flatnonzero(has_geometry & ~parsed)
+
+    report: List[Dict] = []
+    if len(invalid):
+        reasons = shapely.is_valid_reason(geoms[invalid])
+        repaired = shapely.make_valid(geoms[invalid])
+        for i, reason, geom in zip(invalid.tolist(), reasons, repaired):
+            geom, action = _restore_type(geom, geometries[i]["type"])
+            if geom is not None:
+                features[i] = dict(features[i], geometry=mapping(geom))
+            report.append({"index": start_index + i, "reason": reason, "action": action})
+    for i in unparseable.tolist():
+        # Shapely refuses e.g. an unclosed ring; rebuild it where possible and
+        # otherwise keep the original so no road data is dropped.
+        geom, action = _rebuild(geometries[i])
+        if geom is not None:
+            features[i] = dict(features[i], geometry=mapping(geom))
+        report.append(
+            {"index": start_index + i, "reason": "Unparseable geometry", "action": action}
+        )
+    for row in report:
+        row["id"] = _feature_id(features[row["index"] - start_index])
+    report.sort(key=lambda row: row["index"])
+
+    dumps = geojson_io.get_backend().dumps
+    records = [dumps(f) for f in features]
+    return records, report
+
+
+def _batches(features: Iterator[Dict], batch_size: int) -> Iterator[Tuple[List[Dict], int]]:
+    start = 0
+    while True:
+        batch = list(itertools.islice(features, batch_size))
+        if not batch:
+            return
+        yield batch, start
+        start += len(batch)
+
+
+def _repaired_batches(
+    features: Iterator[Dict], batch_size: int, workers: int
+) -> Iterator[Tuple[List[bytes], List[Dict]]]:
+    """Run _repair_batch over the stream, in input order.
+
+    At most ``2 * workers`` batches are in flight so memory stays bounded
+    regardless of input size.
+    """
+    batches = _batches(features, batch_size)
+    if workers <= 1:
+        for batch, start in batches:
+            yield _repair_batch(batch, start)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for batch, start in batches:
+            pending.append(pool.submit(_repair_batch, batch, start))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def fix_features(
+    input_file: Path,
+    output_file: Path,
+    report_file: Optional[Path] = None,
+    workers: int = 1,
+    batch_size: int = _DEFAULT_BATCH_SIZE,
+    output_format: str = "geojson",
+) -> Counter:
+    """Validate and repair every feature of a FeatureCollection, streaming.
+
+    Each feature keeps its geometry type (promoted to Multi* only when the
+    repair splits it). Invalid features are listed in ``report_file`` as
+    NDJSON rows ``{"index", "reason", "action", "id"}``. Returns the action
+    counts.
+    """
+    from merge_osm_results import OUTPUT_FORMATS, iter_file_features
+
+    fmt = OUTPUT_FORMATS[output_format]
+    if report_file is None:
+        report_file = output_file.with_name(output_file.name + ".invalid.jsonl")
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    print(f"🔍 Validating features: {input_file}")
+    print(f"   Workers: {workers}, batch size: {batch_size}")
+    start_time = time.perf_counter()
+    total = 0
+    actions: Counter = Counter()
+    with output_file.open("wb") as out, report_file.open("wb") as rep:
+        out.write(fmt.header)
+        for records, report in _repaired_batches(
+            iter_file_features(input_file), batch_size, workers
+        ):
+            for record in records:
+                if total:
+                    out.write(fmt.separator)
+                out.write(fmt.prefix)
+                out.write(record)
+                out.write(fmt.suffix)
+                total += 1
+            for row in report:
+                rep.write(geojson_io.dumps(row) + b"\n")
+                actions[row["action"]] += 1
+        out.write(fmt.footer)
+
+    elapsed = time.perf_counter() - start_time
+    invalid = sum(actions.values())
+    print(f"   Checked {total} features in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} features/s)")
+    if invalid:
+        details = ", ".join(f"{n} {action}" for action, n in sorted(actions.items()))
+        print(f"⚠️  {invalid} invalid features ({details})")
+        print(f"📝 Report: {report_file}")
+    else:
+        print("✅ All geometries are valid!")
+    print(f"💾 Saved to: {output_file}")
+    return actions
+
+
+def repair_parts(parts: np.ndarray, part_valid: Optional[np.ndarray] = None) -> np.ndarray:
+    """Valid, non-overlapping Polygon parts from possibly invalid ones.
+
+    Invalid parts are repaired on their own first; the whole set is only
+    run through make_valid again if the parts still overlap each other.
+    """
+    if part_valid is None:
+        part_valid = shapely.is_valid(parts)
+    parts = parts.copy()
+    parts[~part_valid] = shapely.make_valid(parts[~part_valid])
+    parts = _polygon_parts(parts)
+    if not shapely.is_valid(shapely.multipolygons(parts)):
+        # Parts are fine on their own but overlap each other.
+        parts = _polygon_parts(shapely.make_valid(shapely.multipolygons(parts)))
+    return parts
 
 
 def fix_geojson(input_file: Path, output_file: Path) -> None:
-    """Fix self-intersection and other geometry issues in GeoJSON file."""
+    """Fix self-intersection and other geometry issues in GeoJSON file.
 
-    with input_file.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    Every polygon part is validated and repaired as one Shapely array, and
+    the result is written back through to_ragged_array, so even boundaries
+    with thousands of island parts avoid per-polygon Python work.
+    """
+    timer = instrumentation.PhaseTimer()
+    text = input_file.read_bytes()
+    timer.mark("read")
 
-    # Convert to shapely geometry
-    geom = shape(data)
-    
-    # Check if valid
-    if not geom.is_valid:
-        from shapely.validation import explain_validity
-        reason = explain_validity(geom)
+    # Convert to shapely geometry (a bare geometry or a Feature)
+    geom = shapely.from_geojson(text)
+    parts = _polygon_parts(np.array([geom]))
+    timer.mark("parse")
+
+    # Check if valid: the whole geometry once (overlapping parts), then
+    # every part in one vectorized call.
+    part_valid = shapely.is_valid(parts)
+    geom_valid = bool(part_valid.all()) and shapely.is_valid(geom)
+    timer.mark("validate")
+
+    if not geom_valid:
+        reason = shapely.is_valid_reason(geom)
         print(f"⚠️  Invalid geometry detected: {reason}")
+        print(f"   {int((~part_valid).sum())} of {len(parts)} polygon parts invalid")
         print("🔧 Fixing geometry...")
-        
-        # Fix using make_valid (shapely 2.0+) or buffer(0) trick
-        try:
-            geom = make_valid(geom)
-        except:
-            # Fallback to buffer(0) trick for older shapely versions
-            geom = geom.buffer(0)
-        
-        if geom.is_valid:
+
+        parts = repair_parts(parts, part_valid)
+        timer.mark("repair")
+
+        fixed = shapely.multipolygons(parts)
+        if shapely.is_valid(fixed):
             print("✅ Geometry fixed successfully!")
         else:
-            reason = explain_validity(geom)
-            print(f"❌ Could not fix geometry: {reason}")
+            print(f"❌ Could not fix geometry: {shapely.is_valid_reason(fixed)}")
             return
+        timer.mark("validate")
     else:
         print("✅ Geometry is already valid!")
-    
+
     # Normalize to MultiPolygon like sample.geojson
-    polygons = _extract_polygons(geom)
-    if not polygons:
+    if not len(parts):
         print("❌ No polygon geometry found after fixing")
         return
 
     # Convert back to GeoJSON MultiPolygon
-    multi_coords = [mapping(p)["coordinates"] for p in polygons]
     fixed_data = {
         "type": "MultiPolygon",
-        "coordinates": multi_coords,
+        "coordinates": _multipolygon_coordinates(parts),
     }
+    timer.mark("convert")
 
-    with output_file.open("w", encoding="utf-8") as f:
-        json.dump(fixed_data, f, ensure_ascii=False)
-    
-    print(f"💾 Saved to: {output_file}")
+    geojson_io.dump(fixed_data, output_file)
+    timer.mark("write")
+
+    print(f"💾 Saved to: {output_file} ({len(parts)} polygons)")
+    timer.report()
 
 
 def main() -> None:
@@ -91,7 +399,36 @@ def main() -> None:
         default="merged_fixed.geojson",
         help="Output fixed GeoJSON file (default: merged_fixed.geojson)",
     )
+    parser.add_argument(
+        "--features",
+        action="store_true",
+        help="Treat input as a FeatureCollection/GeoJSONSeq and repair it feature by feature (streaming)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for --features (default: 1, 0 = all CPUs)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=_DEFAULT_BATCH_SIZE,
+        help=f"Features per vectorized batch for --features (default: {_DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--report",
+        help="Invalid-feature report for --features (default: <output>.invalid.jsonl)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["geojson", "geojsonseq", "ndjson"],
+        default="geojson",
+        help="Output format for --features (default: geojson)",
+    )
+    geojson_io.add_arguments(parser)
     args = parser.parse_args()
+    geojson_io.configure(args)
     
     input_file = Path(args.input)
     output_file = Path(args.output)
@@ -100,7 +437,18 @@ def main() -> None:
         print(f"❌ Input file not found: {input_file}")
         exit(1)
     
-    fix_geojson(input_file, output_file)
+    if args.features:
+        with instrumentation.stage("fix_features"):
+            fix_features(
+                input_file,
+                output_file,
+                report_file=Path(args.report) if args.report else None,
+                workers=args.workers or os.cpu_count() or 1,
+                batch_size=args.batch_size,
+                output_format=args.format,
+            )
+    else:
+        fix_geojson(input_file, output_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,341 @@
+"""
+Shared JSON I/O for the pipeline scripts, with pluggable backends.
+
+Backends, picked in this order unless ``--json-backend`` or the
+``JAWA_JSON_BACKEND`` environment variable says otherwise:
+
+    orjson   fastest parse and serialize (pip install orjson)
+    msgspec  fast parse and serialize, lazy ``scan()`` (pip install msgspec)
+    stdlib   the ``json`` module, always available
+
+``dumps()`` always returns UTF-8 bytes with non-ASCII kept as-is. The
+backend is only used for parsing and for ``dumps(compact=True)``; plain and
+indented output is written in the ``json.dumps(..., ensure_ascii=False)``
+layout byte for byte, so existing outputs do not change. ``--compact-json``
+(or ``JAWA_JSON_COMPACT=1``) opts in to compact output written by the
+selected backend.
+
+``load()`` can read through a memory map (``--mmap`` or ``JAWA_JSON_MMAP=1``)
+so orjson/msgspec parse straight from the page cache without first copying
+the file into a Python ``bytes`` object.
+"""
+import argparse
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+BACKENDS = ("orjson", "msgspec", "stdlib")
+ENV_BACKEND = "JAWA_JSON_BACKEND"
+ENV_MMAP = "JAWA_JSON_MMAP"
+ENV_COMPACT = "JAWA_JSON_COMPACT"
+
+Buffer = Union[bytes, bytearray, memoryview, str]
+
+
+def available_backends() -> List[str]:
+    available = {"orjson": orjson, "msgspec": msgspec, "stdlib": json}
+    return [name for name in BACKENDS if available[name] is not None]
+
+
+class _Backend:
+    """loads/dumps pair for one JSON library."""
+
+    def __init__(
+        self,
+        name: str,
+        loads: Callable[[Buffer], Any],
+        dumps: Callable[[Any], bytes],
+        dumps_indent: Callable[[Any, int], bytes],
+        compact_dumps: Optional[Callable[[Any], bytes]] = None,
+    ) -> None:
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+        self.dumps_indent = dumps_indent
+        self.compact_dumps = compact_dumps or dumps
+
+
+def _stdlib_loads(data: Buffer) -> Any:
+    if isinstance(data, (memoryview, mmap.mmap)):
+        data = bytes(data)
+    return json.loads(data)
+
+
+def _stdlib_backend() -> _Backend:
+    return _Backend(
+        "stdlib",
+        _stdlib_loads,
+        lambda obj: json.dumps(obj, ensure_ascii=False).encode("utf-8"),
+        lambda obj, indent: json.dumps(obj, ensure_ascii=False, indent=indent).encode("utf-8"),
+        lambda obj: json.dumps(
+            obj, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8"),
+    )
+
+
+_STDLIB = _stdlib_backend()
+
+
+def _compact_stdlib_backend() -> _Backend:
+    return _Backend(
+        "stdlib",
+        _STDLIB.loads,
+        _STDLIB.compact_dumps,
+        _STDLIB.dumps_indent,
+        _STDLIB.compact_dumps,
+    )
+
+
+def _orjson_backend(compact_output: bool) -> _Backend:
+    if not compact_output:
+        return _Backend(
+            "orjson", orjson.loads, _STDLIB.dumps, _STDLIB.dumps_indent, orjson.dumps
+        )
+
+    def dumps_indent(obj: Any, indent: int) -> bytes:
+        if indent == 2:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        return _STDLIB.dumps_indent(obj, indent)
+
+    return _Backend("orjson", orjson.loads, orjson.dumps, dumps_indent)
+
+
+def _msgspec_backend(compact_output: bool) -> _Backend:
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+    if not compact_output:
+        return _Backend(
+            "msgspec", decoder.decode, _STDLIB.dumps, _STDLIB.dumps_indent, encoder.encode
+        )
+    return _Backend(
+        "msgspec",
+        decoder.decode,
+        encoder.encode,
+        lambda obj, indent: msgspec.json.format(encoder.encode(obj), indent=indent),
+    )
+
+
+_FACTORIES = {
+    "orjson": _orjson_backend,
+    "msgspec": _msgspec_backend,
+    "stdlib": lambda compact_output: (
+        _compact_stdlib_backend() if compact_output else _STDLIB
+    ),
+}
+_backend: Optional[_Backend] = None
+_use_mmap = os.environ.get(ENV_MMAP, "") not in ("", "0")
+_compact_output = os.environ.get(ENV_COMPACT, "") not in ("", "0")
+
+
+def set_backend(name: Optional[str] = None) -> str:
+    """Select a backend by name; ``None``/``"auto"`` picks the fastest installed.
+
+    The choice is exported through ``JAWA_JSON_BACKEND`` so worker processes
+    use the same backend. Returns the backend name.
+    """
+    global _backend
+    if name in (None, "auto"):
+        name = available_backends()[0]
+    if name not in _FACTORIES:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    if name not in available_backends():
+        raise ValueError(f"JSON backend {name} is not installed (pip install {name})")
+    _backend = _FACTORIES[name](_compact_output)
+    os.environ[ENV_BACKEND] = name
+    return name
+
+
+def set_mmap(enabled: bool) -> None:
+    global _use_mmap
+    _use_mmap = enabled
+    os.environ[ENV_MMAP] = "1" if enabled else "0"
+
+
+def set_compact_output(enabled: bool) -> None:
+    """Write plain ``dumps()`` output compactly with the selected backend.
+
+    Exported through ``JAWA_JSON_COMPACT`` like the backend choice.
+    """
+    global _compact_output
+    _compact_output = enabled
+    os.environ[ENV_COMPACT] = "1" if enabled else "0"
+    if _backend is not None:
+        set_backend(_backend.name)
+
+
+def get_backend() -> _Backend:
+    if _backend is None:
+        set_backend(os.environ.get(ENV_BACKEND) or None)
+    return _backend
+
+
+def backend_name() -> str:
+    return get_backend().name
+
+
+def output_style() -> str:
+    """Identify the byte layout of ``dumps()`` output.
+
+    ``"default"`` is the ``json.dumps`` layout shared by every backend;
+    compact output is tagged with the backend that writes it.
+    """
+    if not _compact_output:
+        return "default"
+    return f"compact-{backend_name()}"
+
+
+def loads(data: Buffer) -> Any:
+    return get_backend().loads(data)
+
+
+def dumps(obj: Any, indent: Optional[int] = None, compact: bool = False) -> bytes:
+    """Serialize ``obj`` to UTF-8 JSON bytes.
+
+    ``compact`` drops the spaces after separators and uses the fast backend;
+    ``indent`` pretty-prints. Without either, output is compact only when
+    ``set_compact_output(True)`` / ``--compact-json`` is in effect.
+    """
+    backend = get_backend()
+    if indent is not None:
+        return backend.dumps_indent(obj, indent)
+    if compact:
+        return backend.compact_dumps(obj)
+    return backend.dumps(obj)
+
+
+def read_bytes(path: Path, use_mmap: Optional[bool] = None):
+    """Return the file contents as ``bytes`` or, with mmap, an ``mmap``."""
+    if use_mmap is None:
+        use_mmap = _use_mmap
+    with open(path, "rb") as f:
+        if use_mmap and os.fstat(f.fileno()).st_size:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return f.read()
+
+
+def load(path: Path, use_mmap: Optional[bool] = None) -> Any:
+    data = read_bytes(path, use_mmap)
+    if not isinstance(data, mmap.mmap):
+        return loads(data)
+    try:
+        if backend_name() == "stdlib":
+            return loads(data[:])
+        view = memoryview(data)
+        try:
+            return loads(view)
+        finally:
+            view.release()
+    finally:
+        data.close()
+
+
+def dump(
+    obj: Any, path: Path, indent: Optional[int] = None, compact: bool = False
+) -> int:
+    """Write ``obj`` as JSON to ``path``; return the number of bytes written."""
+    data = dumps(obj, indent=indent, compact=compact)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+if msgspec is not None:
+
+    class _ScanGeometry(msgspec.Struct):
+        type: Optional[str] = None
+        coordinates: List[msgspec.Raw] = []
+        geometries: List[msgspec.Raw] = []
+
+    # Fields absent from the document stay UNSET and are left out of scan().
+    class _ScanDocument(msgspec.Struct):
+        type: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+        properties: Union[Dict[str, Any], None, msgspec.UnsetType] = msgspec.UNSET
+        metadata: Any = msgspec.UNSET
+        geometry: Union[_ScanGeometry, None, msgspec.UnsetType] = msgspec.UNSET
+        coordinates: Union[List[msgspec.Raw], msgspec.UnsetType] = msgspec.UNSET
+        features: Union[List[msgspec.Raw], msgspec.UnsetType] = msgspec.UNSET
+
+    _SCAN_DECODER = msgspec.json.Decoder(_ScanDocument)
+
+
+def _scan_to_dict(doc: "_ScanDocument") -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    for field in doc.__struct_fields__:
+        value = getattr(doc, field)
+        if value is msgspec.UNSET:
+            continue
+        if isinstance(value, _ScanGeometry):
+            value = {k: getattr(value, k) for k in value.__struct_fields__}
+        result[field] = value
+    return result
+
+
+def scan(path: Path, use_mmap: Optional[bool] = None) -> Dict[str, Any]:
+    """Read-only outline of a GeoJSON document for quick inspection.
+
+    Returns ``type``, ``properties``, ``metadata``, ``geometry`` (``type`` and
+    ``coordinates``) and ``features``. With msgspec installed, coordinate
+    parts and features are left as unparsed ``msgspec.Raw`` slices, so only
+    their count is cheap; without it this is a plain ``load()``. Only use
+    ``len()`` on ``coordinates``/``features``.
+    """
+    if msgspec is None:
+        return load(path, use_mmap)
+    data = read_bytes(path, use_mmap)
+    try:
+        return _scan_to_dict(_SCAN_DECODER.decode(data))
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the JSON I/O options and the instrumentation options."""
+    parser.add_argument(
+        "--json-backend",
+        choices=["auto", *BACKENDS],
+        default=os.environ.get(ENV_BACKEND) or "auto",
+        help="JSON library for parsing/serializing (default: auto = fastest installed)",
+    )
+    parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        default=_compact_output,
+        help="Write compact JSON with the selected backend instead of the json.dumps layout",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        default=_use_mmap,
+        help="Read input JSON files through a memory map",
+    )
+    import instrumentation
+
+    instrumentation.add_arguments(parser)
+
+
+def configure(args: argparse.Namespace) -> str:
+    """Apply the options added by ``add_arguments``; return the backend name."""
+    set_compact_output(args.compact_json)
+    try:
+        name = set_backend(args.json_backend)
+    except ValueError as exc:
+        raise SystemExit(f"❌ {exc}") from exc
+    set_mmap(args.mmap)
+    import instrumentation
+
+    instrumentation.configure(args)
+    return name
+
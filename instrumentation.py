@@ -0,0 +1,403 @@
+"""
+Shared profiling and metrics for the pipeline scripts.
+
+Every script that takes the ``geojson_io`` options (and spatial_sort.py,
+split_helper.py --batch) also gets:
+
+    --profile           print a per-stage table and the top cProfile entries
+                        on exit (saved as ``.pstats`` next to --metrics-out)
+    --metrics-out PATH  write a JSON report to PATH and a Prometheus
+                        textfile-collector file next to it (``.prom``)
+    --trace-memory      run tracemalloc: traced peak per stage and the top
+                        allocation sites in the report
+
+Scripts mark their phases with ``stage(name)`` (a context manager) or
+``PhaseTimer.mark(name)``. For each phase the recorder keeps wall and CPU
+time (children included once they are reaped), the peak RSS high-water mark,
+bytes read and written (``/proc/self/io``, Linux), the feature count and
+rate, and the time spent inside the JSON backend's parse vs. serialize
+calls. The whole run is recorded as stage ``total``.
+
+Nothing is recorded unless one of the options is given: ``stage()`` is then
+a no-op and the JSON backend is not wrapped. Parse/serialize counters only
+see the main process; worker processes use their own, unwrapped backend.
+"""
+import argparse
+import atexit
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import geojson_io
+
+_TOP_ALLOCATIONS = 15
+_TOP_FUNCTIONS = 25
+_PROM_PREFIX = "jawa"
+# Stage fields exported to Prometheus: (field, metric suffix, help).
+_PROM_FIELDS = [
+    ("wall_s", "stage_wall_seconds", "Wall-clock time per stage."),
+    ("cpu_s", "stage_cpu_seconds", "User + system CPU time per stage, children included."),
+    ("peak_rss_bytes", "stage_peak_rss_bytes", "Process peak RSS at the end of the stage."),
+    ("read_bytes", "stage_read_bytes", "Bytes read by the process during the stage."),
+    ("written_bytes", "stage_written_bytes", "Bytes written by the process during the stage."),
+    ("features", "stage_features", "Features processed in the stage."),
+    ("features_per_s", "stage_features_per_second", "Feature throughput of the stage."),
+    ("parse_s", "stage_parse_seconds", "Time inside JSON parse calls."),
+    ("serialize_s", "stage_serialize_seconds", "Time inside JSON serialize calls."),
+    ("traced_peak_bytes", "stage_traced_peak_bytes", "tracemalloc peak during the stage."),
+]
+
+
+def _io_counters() -> Optional[Dict[str, int]]:
+    try:
+        with open("/proc/self/io", "rb") as f:
+            fields = dict(line.split(b":", 1) for line in f.read().splitlines())
+    except OSError:
+        return None
+    return {"read": int(fields[b"rchar"]), "written": int(fields[b"wchar"])}
+
+
+def _peak_rss() -> int:
+    scale = 1 if sys.platform == "darwin" else 1024
+    return scale * max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+
+
+def _cpu_time() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+class _JsonCounters:
+    """Time and bytes spent in the JSON backend, accumulated."""
+
+    def __init__(self) -> None:
+        self.parse_s = 0.0
+        self.parse_calls = 0
+        self.parse_bytes = 0
+        self.serialize_s = 0.0
+        self.serialize_calls = 0
+        self.serialize_bytes = 0
+
+    def snapshot(self) -> Dict[str, float]:
+        return dict(vars(self))
+
+    def parse(self, func: Callable) -> Callable:
+        def timed(data, *args, **kwargs):
+            start = time.perf_counter()
+            result = func(data, *args, **kwargs)
+            self.parse_s += time.perf_counter() - start
+            self.parse_calls += 1
+            self.parse_bytes += len(data)
+            return result
+
+        return timed
+
+    def serialize(self, func: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            self.serialize_s += time.perf_counter() - start
+            self.serialize_calls += 1
+            self.serialize_bytes += len(result)
+            return result
+
+        return timed
+
+
+class _Snapshot:
+    def __init__(self, json: _JsonCounters) -> None:
+        self.wall = time.perf_counter()
+        self.cpu = _cpu_time()
+        self.io = _io_counters()
+        self.json = json.snapshot()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+
+class Recorder:
+    """Collects stage records for one script run."""
+
+    def __init__(
+        self,
+        script: str,
+        metrics_out: Optional[Path] = None,
+        profile: bool = False,
+        trace_memory: bool = False,
+    ) -> None:
+        self.script = script
+        self.metrics_out = metrics_out
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.started_at = time.time()
+        self.stages: List[Dict[str, Any]] = []
+        self.json = _JsonCounters()
+        self._stack: List[str] = []
+        self._profiler: Optional[cProfile.Profile] = None
+        self._start = _Snapshot(self.json)
+
+    def begin(self) -> None:
+        if self.trace_memory:
+            tracemalloc.start()
+        backend = geojson_io.get_backend()
+        backend.loads = self.json.parse(backend.loads)
+        for name in ("dumps", "dumps_indent", "compact_dumps"):
+            setattr(backend, name, self.json.serialize(getattr(backend, name)))
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._start = _Snapshot(self.json)
+
+    def _record(self, name: str, start: _Snapshot, features: Optional[int]) -> Dict[str, Any]:
+        wall = time.perf_counter() - start.wall
+        record: Dict[str, Any] = {
+            "stage": name,
+            "wall_s": wall,
+            "cpu_s": _cpu_time() - start.cpu,
+            "peak_rss_bytes": _peak_rss(),
+        }
+        end_io = _io_counters()
+        if start.io is not None and end_io is not None:
+            record["read_bytes"] = end_io["read"] - start.io["read"]
+            record["written_bytes"] = end_io["written"] - start.io["written"]
+        if features is not None:
+            record["features"] = features
+            record["features_per_s"] = features / wall if wall > 0 else 0.0
+        json_now = self.json.snapshot()
+        for key, value in json_now.items():
+            record[key] = value - start.json[key]
+        if tracemalloc.is_tracing():
+            record["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        return record
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator["_StageHandle"]:
+        self._stack.append(name)
+        handle = _StageHandle()
+        start = _Snapshot(self.json)
+        try:
+            yield handle
+        finally:
+            self.stages.append(self._record("/".join(self._stack), start, handle.features))
+            self._stack.pop()
+
+    def add(self, name: str, start: _Snapshot, features: Optional[int] = None) -> None:
+        self.stages.append(self._record(name, start, features))
+
+    def report(self) -> Dict[str, Any]:
+        total = self._record("total", self._start, None)
+        report: Dict[str, Any] = {
+            "script": self.script,
+            "argv": sys.argv[1:],
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started_at)),
+            "json_backend": geojson_io.backend_name(),
+            "total": total,
+            "stages": self.stages,
+        }
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            report["tracemalloc_top"] = [
+                {"site": str(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:_TOP_ALLOCATIONS]
+            ]
+            tracemalloc.stop()
+        return report
+
+    def finish(self) -> None:
+        profile_path = None
+        if self._profiler is not None:
+            self._profiler.disable()
+            if self.metrics_out is not None:
+                profile_path = self.metrics_out.with_suffix(".pstats")
+                self.metrics_out.parent.mkdir(parents=True, exist_ok=True)
+                self._profiler.dump_stats(profile_path)
+        report = self.report()
+        if profile_path is not None:
+            report["profile"] = str(profile_path)
+        if self.metrics_out is not None:
+            self.metrics_out.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self.metrics_out, geojson_io.dumps(report, indent=2) + b"\n")
+            _atomic_write(
+                self.metrics_out.with_suffix(".prom"), prometheus_text(report).encode("utf-8")
+            )
+        if self.profile:
+            print_report(report)
+            out = io.StringIO()
+            stats = pstats.Stats(self._profiler, stream=out)
+            stats.sort_stats("cumulative").print_stats(_TOP_FUNCTIONS)
+            print(out.getvalue().rstrip())
+            if profile_path is not None:
+                print(f"📈 Profile: {profile_path}")
+        if self.metrics_out is not None:
+            print(f"📊 Metrics: {self.metrics_out} (+ {self.metrics_out.with_suffix('.prom').name})")
+
+
+class _StageHandle:
+    """Yielded by ``stage()``; set ``features`` to get a rate."""
+
+    def __init__(self) -> None:
+        self.features: Optional[int] = None
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    # The textfile collector may read at any time; never expose a partial file.
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _prom_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _combined(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One record per stage name: repeats (per file, per phase) are summed."""
+    combined: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        into = combined.get(record["stage"])
+        if into is None:
+            combined[record["stage"]] = dict(record)
+            continue
+        for key, value in record.items():
+            if key == "stage" or key == "features_per_s":
+                continue
+            if key.startswith("peak") or key.startswith("traced_peak"):
+                into[key] = max(into.get(key, 0), value)
+            else:
+                into[key] = into.get(key, 0) + value
+        if "features" in into:
+            wall = into["wall_s"]
+            into["features_per_s"] = into["features"] / wall if wall > 0 else 0.0
+    return list(combined.values())
+
+
+def _prom_value(value: float) -> str:
+    return str(value) if isinstance(value, int) else f"{value:.9g}"
+
+
+def prometheus_text(report: Dict[str, Any]) -> str:
+    """Prometheus exposition text (textfile collector) of a report."""
+    script = _prom_label(report["script"])
+    records = [report["total"], *_combined(report["stages"])]
+    lines = []
+    for field, suffix, help_text in _PROM_FIELDS:
+        samples = [r for r in records if r.get(field) is not None]
+        if not samples:
+            continue
+        name = f"{_PROM_PREFIX}_{suffix}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for record in samples:
+            stage = _prom_label(record["stage"])
+            lines.append(f'{name}{{script="{script}",stage="{stage}"}} {_prom_value(record[field])}')
+    name = f"{_PROM_PREFIX}_last_run_timestamp_seconds"
+    lines.append(f"# HELP {name} Unix time the run finished.")
+    lines.append(f"# TYPE {name} gauge")
+    lines.append(f'{name}{{script="{script}"}} {time.time():.0f}')
+    return "\n".join(lines) + "\n"
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("⏱️  Stages:")
+    print(
+        f"   {'stage':<28} {'wall':>8} {'cpu':>8} {'peak RSS':>10} {'read':>9} "
+        f"{'written':>9} {'feat/s':>9} {'parse':>7} {'dump':>7}"
+    )
+    for record in [*report["stages"], report["total"]]:
+        rate = record.get("features_per_s")
+        print(
+            f"   {record['stage'][:28]:<28} {record['wall_s']:7.2f}s {record['cpu_s']:7.2f}s "
+            f"{record['peak_rss_bytes'] / 1e6:8.1f}MB "
+            f"{record.get('read_bytes', 0) / 1e6:7.1f}MB "
+            f"{record.get('written_bytes', 0) / 1e6:7.1f}MB "
+            f"{'' if rate is None else f'{rate:.0f}':>9} "
+            f"{record['parse_s']:6.2f}s {record['serialize_s']:6.2f}s"
+        )
+
+
+_recorder: Optional[Recorder] = None
+
+
+def enabled() -> bool:
+    return _recorder is not None
+
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[_StageHandle]:
+    """Record a phase of the run; a no-op unless instrumentation is on."""
+    if _recorder is None:
+        yield _StageHandle()
+        return
+    with _recorder.stage(name) as handle:
+        yield handle
+
+
+class PhaseTimer:
+    """Accumulate wall-clock time per named phase (and record each phase)."""
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self._last = time.perf_counter()
+        self._snapshot = _Snapshot(_recorder.json) if _recorder is not None else None
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.phases[name] = self.phases.get(name, 0.0) + now - self._last
+        self._last = now
+        if _recorder is not None:
+            _recorder.add(name, self._snapshot)
+            self._snapshot = _Snapshot(_recorder.json)
+
+    def report(self) -> None:
+        total = sum(self.phases.values())
+        print("⏱️  Timings: " + ", ".join(
+            f"{name} {elapsed:.3f}s" for name, elapsed in self.phases.items()
+        ) + f" (total {total:.3f}s)")
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-stage wall/CPU/RSS/IO and a cProfile summary on exit",
+    )
+    group.add_argument(
+        "--metrics-out",
+        metavar="PATH",
+        help="Write stage metrics as JSON to PATH and as a Prometheus textfile (.prom)",
+    )
+    group.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Trace Python allocations (tracemalloc; slow): per-stage peak, top sites",
+    )
+
+
+def configure(args: argparse.Namespace, script: Optional[str] = None) -> Optional[Recorder]:
+    """Start recording if any instrumentation option was given."""
+    global _recorder
+    if not (args.profile or args.metrics_out or args.trace_memory):
+        return None
+    if _recorder is not None:
+        return _recorder
+    _recorder = Recorder(
+        script or Path(sys.argv[0]).stem,
+        metrics_out=Path(args.metrics_out) if args.metrics_out else None,
+        profile=args.profile,
+        trace_memory=args.trace_memory,
+    )
+    _recorder.begin()
+    atexit.register(_recorder.finish)
+    return _recorder
@@ -1,13 +1,16 @@
 #!/usr/bin/env python3
 import argparse
-import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+import geojson_io
+import instrumentation
 
 
 def _load_json(path: Path) -> Dict[str, Any]:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return geojson_io.load(path)
 
 
 def _extract_geometry(doc: Dict[str, Any]) -> Tuple[str, List]:
@@ -48,8 +51,147 @@ def merge_geojson(input_dir: Path, output_file: Path) -> None:
         "coordinates": merged_coords,
     }
 
-    with output_file.open("w", encoding="utf-8") as f:
-        json.dump(merged, f, ensure_ascii=False)
+    geojson_io.dump(merged, output_file)
+
+
+def _load_polygon(file_path: Path) -> Any:
+    """One input as a valid shapely geometry (repaired per file if needed)."""
+    import shapely
+
+    doc = _load_json(file_path)
+    geom_type, coords = _extract_geometry(doc)
+    geom = shapely.from_geojson(geojson_io.dumps({
+        "type": "MultiPolygon",
+        "coordinates": _to_multipolygon_coords(geom_type, coords),
+    }, compact=True))
+    if not shapely.is_valid(geom):
+        geom = shapely.make_valid(geom)
+    return geom
+
+
+def _union_pair(a: Any, b: Any, coverage: bool, grid_size: Optional[float]) -> Any:
+    """Union two partial results; coverage_union when they are edge-matched."""
+    import shapely
+
+    if coverage:
+        # Badly noded inputs either raise or come back invalid; either way
+        # the overlay union below still gives a valid result.
+        try:
+            merged = shapely.coverage_union(a, b)
+            if shapely.is_valid(merged):
+                return merged
+        except shapely.errors.GEOSException:
+            pass
+    return shapely.union(a, b, grid_size=grid_size)
+
+
+def _tree_union(
+    pool: Any, geoms: Any, coverage: str, grid_size: Optional[float]
+) -> Tuple[Any, bool, int]:
+    """(union, used coverage_union, levels) of valid geometries, reduced in ``pool``."""
+    import numpy as np
+    import shapely
+
+    bounds = shapely.bounds(geoms)
+    geoms = geoms[np.argsort((bounds[:, 0] + bounds[:, 2]) / 2, kind="stable")]
+    use_coverage = coverage == "yes" or (
+        coverage == "auto" and len(geoms) > 1 and bool(shapely.coverage_is_valid(geoms))
+    )
+    levels = 0
+    while len(geoms) > 1:
+        pairs = len(geoms) // 2
+        merged = list(pool.map(
+            _union_pair,
+            geoms[0:2 * pairs:2],
+            geoms[1:2 * pairs:2],
+            [use_coverage] * pairs,
+            [grid_size] * pairs,
+        ))
+        if len(geoms) % 2:
+            merged.append(geoms[-1])
+        geoms = np.array(merged)
+        levels += 1
+    return geoms[0], use_coverage, levels
+
+
+def dissolve_geometries(
+    geoms: Any,
+    workers: int = 1,
+    coverage: str = "auto",
+    grid_size: Optional[float] = None,
+) -> Any:
+    """In-memory form of ``dissolve_geojson`` for an array of valid geometries."""
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else _Serial() as pool:
+        return _tree_union(pool, geoms, coverage, grid_size)[0]
+
+
+def dissolve_geojson(
+    input_dir: Path,
+    output_file: Path,
+    workers: int = 1,
+    coverage: str = "auto",
+    grid_size: Optional[float] = None,
+) -> None:
+    """Union every input into one valid MultiPolygon (shared borders removed).
+
+    Inputs are loaded and repaired in parallel, ordered west to east so
+    neighbours meet early, then reduced pairwise level by level: each level
+    halves the number of geometries and its unions run in the pool.
+    ``coverage`` picks ``shapely.coverage_union`` ("yes"), the overlay
+    union ("no"), or the former only if ``coverage_is_valid`` holds
+    ("auto"). The result needs no fix_geojson pass.
+    """
+    try:
+        import numpy as np
+        import shapely
+    except ImportError as exc:
+        raise SystemExit(
+            "Shapely is required. Install it with: pip install shapely"
+        ) from exc
+    from fix_geojson import _multipolygon_coordinates, _polygon_parts
+
+    files = sorted(input_dir.glob("*.geojson"))
+    if not files:
+        raise FileNotFoundError(f"No .geojson files found in {input_dir}")
+    print(f"🧩 Dissolving {len(files)} files from: {input_dir}")
+    if workers > 1:
+        print(f"   Workers: {workers}")
+    timer = instrumentation.PhaseTimer()
+
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else _Serial() as pool:
+        geoms = np.array(list(pool.map(_load_polygon, files)))
+        timer.mark("load")
+
+        union, use_coverage, levels = _tree_union(pool, geoms, coverage, grid_size)
+        print(f"   Union: {'coverage_union' if use_coverage else 'overlay union'}")
+        timer.mark(f"union ({levels} levels)")
+
+    parts = _polygon_parts(np.array([union]))
+    if not shapely.is_valid(shapely.multipolygons(parts)):
+        raise ValueError("Dissolved outline is not valid")
+    timer.mark("validate")
+
+    geojson_io.dump(
+        {"type": "MultiPolygon", "coordinates": _multipolygon_coordinates(parts)},
+        output_file,
+    )
+    timer.mark("write")
+    print(f"💾 Saved to: {output_file} ({len(parts)} polygons)")
+    timer.report()
+
+
+class _Serial:
+    """In-process stand-in for ProcessPoolExecutor (``map`` and ``with``)."""
+
+    def __enter__(self) -> "_Serial":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    @staticmethod
+    def map(func, *iterables):
+        return map(func, *iterables)
 
 
 def main() -> None:
@@ -66,12 +208,47 @@ def main() -> None:
         default="merged.geojson",
         help="Output GeoJSON file (default: merged.geojson)",
     )
+    parser.add_argument(
+        "--dissolve",
+        action="store_true",
+        help=(
+            "Union the inputs into one valid outline (needs shapely) instead of "
+            "concatenating their polygons; no fix_geojson.py pass needed"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes for --dissolve (default: 1; 0 = all CPUs)",
+    )
+    parser.add_argument(
+        "--coverage",
+        choices=["auto", "yes", "no"],
+        default="auto",
+        help=(
+            "--dissolve: use coverage_union for edge-matched inputs (auto = only if "
+            "coverage_is_valid, default)"
+        ),
+    )
+    parser.add_argument(
+        "--grid-size",
+        type=float,
+        help="--dissolve: snap the overlay union to this grid (degrees), closing slivers",
+    )
+    geojson_io.add_arguments(parser)
     args = parser.parse_args()
+    geojson_io.configure(args)
 
     input_dir = Path(args.input_dir)
     output_file = Path(args.output)
 
-    merge_geojson(input_dir, output_file)
+    if args.dissolve:
+        workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+        dissolve_geojson(input_dir, output_file, workers, args.coverage, args.grid_size)
+    else:
+        with instrumentation.stage("merge"):
+            merge_geojson(input_dir, output_file)
 
 
 if __name__ == "__main__":
@@ -1,14 +1,45 @@
 #!/usr/bin/env python3
 import argparse
+import contextlib
+import hashlib
+import itertools
 import json
+import os
+import sys
+import tempfile
 import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import dedup_features
+import geojson_io
+import instrumentation
+import stage_options
+
+_STREAM_CHUNK_SIZE = 1 << 20
+_COPY_BUFFER_SIZE = 1 << 24
+_INDEX_FLUSH_SIZE = 1 << 16
+_MANIFEST_VERSION = 1
+_RS = "\x1e"
+_SEQ_SUFFIXES = (".geojsons", ".geojsonl", ".geojsonseq", ".ndjson")
+_WHITESPACE = " \t\n\r"
+_DECODER = json.JSONDecoder()
 
 
 def _load_json(path: Path) -> Dict:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return geojson_io.load(path)
 
 
 def _iter_features(doc: Dict) -> Iterable[Dict]:
@@ -32,51 +63,836 @@ def _iter_features(doc: Dict) -> Iterable[Dict]:
     raise ValueError("Unsupported GeoJSON structure")
 
 
-def merge_geojson(input_dir: Path, output_file: Path) -> None:
-    files = sorted(input_dir.glob("*.geojson"))
+class _StreamBuffer:
+    """Sliding text window over a file for incremental ``raw_decode`` calls."""
+
+    def __init__(
+        self, f, chunk_size: int = _STREAM_CHUNK_SIZE, whitespace: str = _WHITESPACE
+    ) -> None:
+        self._f = f
+        self._chunk_size = chunk_size
+        self._whitespace = whitespace
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        # Grow reads with the pending window so a feature larger than one
+        # chunk is re-scanned a logarithmic number of times, not linear.
+        chunk = self._f.read(max(self._chunk_size, len(self.buf)))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character ('' at end of file)."""
+        whitespace = self._whitespace
+        while True:
+            buf = self.buf
+            pos = self.pos
+            while pos < len(buf) and buf[pos] in whitespace:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r}, found {found or 'EOF'!r}")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """Decode one JSON value starting at the next non-whitespace char."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A scalar ending exactly at the window edge may be truncated.
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_array(stream: _StreamBuffer) -> Iterator[Any]:
+    stream.expect("[")
+    if stream.peek() == "]":
+        stream.pos += 1
+        return
+    while True:
+        yield stream.decode()
+        sep = stream.peek()
+        stream.pos += 1
+        if sep == "]":
+            return
+        if sep != ",":
+            raise ValueError(f"Expected ',' or ']' in array, found {sep or 'EOF'!r}")
+
+
+def stream_features(path: Path) -> Iterator[Dict]:
+    """Yield features from ``path`` without loading the whole document.
+
+    Top-level members other than ``features`` are decoded normally; the
+    ``features`` array is parsed one element at a time. Documents without a
+    ``features`` array (single Feature or bare geometry) fall back to
+    ``_iter_features`` on the collected members.
+    """
+    with path.open("r", encoding="utf-8") as f:
+        stream = _StreamBuffer(f)
+        stream.expect("{")
+        members: Dict[str, Any] = {}
+        has_features = False
+        if stream.peek() == "}":
+            stream.pos += 1
+        else:
+            while True:
+                key = stream.decode()
+                if not isinstance(key, str):
+                    raise ValueError("Invalid GeoJSON: object key is not a string")
+                stream.expect(":")
+                if key == "features" and stream.peek() == "[":
+                    has_features = True
+                    for feature in _iter_array(stream):
+                        if isinstance(feature, dict):
+                            yield feature
+                else:
+                    members[key] = stream.decode()
+                sep = stream.peek()
+                stream.pos += 1
+                if sep == "}":
+                    break
+                if sep != ",":
+                    raise ValueError(
+                        f"Expected ',' or '}}' in object, found {sep or 'EOF'!r}"
+                    )
+        if stream.peek():
+            raise ValueError("Extra data after top-level GeoJSON object")
+
+    if has_features:
+        if members.get("type") != "FeatureCollection":
+            raise ValueError("Unsupported GeoJSON structure")
+        return
+    yield from _iter_features(members)
+
+
+def stream_seq_features(path: Path) -> Iterator[Dict]:
+    """Yield features from a GeoJSON Text Sequence (RFC 8142) or NDJSON file.
+
+    Records may be prefixed with the RS (0x1E) separator or simply be
+    newline-delimited; each record goes through ``_iter_features`` so it can
+    be a Feature, a bare geometry or even a small FeatureCollection.
+    """
+    with path.open("r", encoding="utf-8") as f:
+        stream = _StreamBuffer(f, whitespace=_WHITESPACE + _RS)
+        while stream.peek():
+            record = stream.decode()
+            if not isinstance(record, dict):
+                raise ValueError("Unsupported GeoJSON structure")
+            yield from _iter_features(record)
+
+
+def _is_seq_file(file_path: Path) -> bool:
+    return file_path.suffix in _SEQ_SUFFIXES
+
+
+def _file_features(file_path: Path, stream: bool) -> Iterator[Dict]:
+    if _is_seq_file(file_path):
+        return stream_seq_features(file_path)
+    if stream:
+        return stream_features(file_path)
+    return _iter_features(_load_json(file_path))
+
+
+def iter_file_features(path: Path) -> Iterator[Dict]:
+    """Stream the features of any supported input or merged output file."""
+    return _file_features(path, stream=True)
+
+
+class _OutputFormat(NamedTuple):
+    header: bytes
+    footer: bytes
+    separator: bytes
+    prefix: bytes
+    suffix: bytes
+
+
+OUTPUT_FORMATS: Dict[str, _OutputFormat] = {
+    "geojson": _OutputFormat(
+        header=b'{\n  "type": "FeatureCollection",\n  "features": [\n',
+        footer=b"\n  ]\n}\n",
+        separator=b",\n",
+        prefix=b"",
+        suffix=b"",
+    ),
+    # RFC 8142 GeoJSON Text Sequence: RS + feature + LF per record.
+    "geojsonseq": _OutputFormat(
+        header=b"", footer=b"", separator=b"", prefix=_RS.encode(), suffix=b"\n"
+    ),
+    "ndjson": _OutputFormat(
+        header=b"", footer=b"", separator=b"", prefix=b"", suffix=b"\n"
+    ),
+}
+
+
+class _OffsetIndexWriter:
+    """Append-only sidecar of little-endian uint64 feature byte offsets."""
+
+    def __init__(self, path: Path) -> None:
+        self._f = path.open("wb")
+        self._pending = array("Q")
+
+    def append(self, offset: int) -> None:
+        self._pending.append(offset)
+        if len(self._pending) >= _INDEX_FLUSH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        if sys.byteorder != "little":
+            self._pending.byteswap()
+        self._pending.tofile(self._f)
+        self._pending = array("Q")
+
+    def close(self) -> None:
+        self._flush()
+        self._f.close()
+
+
+class _FeatureWriter:
+    """Write feature records to a binary file in one of ``OUTPUT_FORMATS``.
+
+    A *segment* is the run of records taken from one input file, excluding
+    the separator that precedes it, so segments can be spooled, cached and
+    copied between outputs without re-serializing.
+    """
+
+    def __init__(
+        self, f, fmt: _OutputFormat, index: Optional[_OffsetIndexWriter] = None
+    ) -> None:
+        self._f = f
+        self._fmt = fmt
+        self._index = index
+        self.pos = 0
+        self.first = True
+
+    def write(self, data: bytes) -> None:
+        self._f.write(data)
+        self.pos += len(data)
+
+    def _start_record(self) -> None:
+        if not self.first:
+            self.write(self._fmt.separator)
+        self.first = False
+
+    def write_record(self, record: bytes) -> int:
+        """Append one already-serialized feature; return its offset."""
+        self._start_record()
+        offset = self.pos
+        if self._index is not None:
+            self._index.append(offset)
+        self.write(self._fmt.prefix + record + self._fmt.suffix)
+        return offset
+
+    def write_features(
+        self,
+        features: Iterable[Dict],
+        on_record: Optional[Callable[[Dict, bytes], None]] = None,
+    ) -> Tuple[int, int]:
+        """Serialize ``features``; return (count, segment offset).
+
+        ``on_record`` sees each feature with its JSON bytes, so copies can be
+        written elsewhere without serializing twice.
+        """
+        prefix, suffix = self._fmt.prefix, self._fmt.suffix
+        dumps = geojson_io.get_backend().dumps
+        count = 0
+        offset = self.pos
+        for feature in features:
+            self._start_record()
+            if not count:
+                offset = self.pos
+            if self._index is not None:
+                self._index.append(self.pos)
+            record = dumps(feature)
+            self.write(prefix + record + suffix)
+            if on_record is not None:
+                on_record(feature, record)
+            count += 1
+        return count, offset
+
+    def copy_segment(self, src, offset: int = 0, length: Optional[int] = None) -> int:
+        """Bulk-copy a serialized segment from ``src``; return its offset."""
+        self._start_record()
+        seg_offset = self.pos
+        src.seek(offset)
+        remaining = -1 if length is None else length
+        line_start = seg_offset
+        while remaining:
+            chunk = src.read(
+                _COPY_BUFFER_SIZE if remaining < 0 else min(remaining, _COPY_BUFFER_SIZE)
+            )
+            if not chunk:
+                if remaining > 0:
+                    raise ValueError("Cached segment extends past end of previous output")
+                break
+            if self._index is not None:
+                # Every record starts on a fresh line, so record offsets are
+                # recovered from the newlines without parsing any JSON.
+                base = self.pos
+                nl = chunk.find(b"\n")
+                while nl != -1:
+                    self._index.append(line_start)
+                    line_start = base + nl + 1
+                    nl = chunk.find(b"\n", nl + 1)
+            self.write(chunk)
+            if remaining > 0:
+                remaining -= len(chunk)
+        if self._index is not None and line_start < self.pos:
+            self._index.append(line_start)
+        return seg_offset
+
+
+class ProvinceOutputs:
+    """Per-province copies of an output, written while it is produced.
+
+    Features tagged by ``tag_provinces.ProvinceTagger`` go to
+    ``<output stem>_<province slug><suffix>``; files are opened on first use.
+    """
+
+    def __init__(self, output_file: Path, fmt: _OutputFormat, tagger: Any) -> None:
+        self._output_file = output_file
+        self._fmt = fmt
+        self._tagger = tagger
+        self._files: Dict[str, Any] = {}
+        self._writers: Dict[str, _FeatureWriter] = {}
+
+    def path_for(self, slug: str) -> Path:
+        out = self._output_file
+        return out.with_name(f"{out.stem}_{slug}{out.suffix}")
+
+    def writer(self, slug: str) -> _FeatureWriter:
+        writer = self._writers.get(slug)
+        if writer is None:
+            f = self._files[slug] = self.path_for(slug).open("wb")
+            writer = self._writers[slug] = _FeatureWriter(f, self._fmt)
+            writer.write(self._fmt.header)
+        return writer
+
+    def write(self, feature: Dict, record: bytes) -> None:
+        self.writer(self._tagger.slug_for(feature)).write_record(record)
+
+    def copy_from(self, spools: Dict[str, Path]) -> None:
+        """Append per-province spool files written by ``_spool_file``."""
+        for slug, spool_path in spools.items():
+            with spool_path.open("rb") as spool:
+                self.writer(slug).copy_segment(spool)
+            spool_path.unlink()
+
+    def close(self) -> None:
+        for slug, writer in self._writers.items():
+            writer.write(self._fmt.footer)
+            self._files[slug].close()
+
+    def paths(self) -> Dict[str, Path]:
+        return {slug: self.path_for(slug) for slug in self._writers}
+
+
+def iter_feature_records(path: Path) -> Iterator[Tuple[int, bytes]]:
+    """Yield (byte offset, JSON text) of each feature in a merged output.
+
+    Relies on the layout ``merge_geojson`` writes in every format: one
+    feature per line, optionally RS-prefixed or ``,``-terminated. No JSON is
+    parsed here; callers decode only the records they need.
+    """
+    with path.open("rb") as f:
+        offset = 0
+        for line in f:
+            record = line.rstrip(b",\r\n")
+            start = offset
+            offset += len(line)
+            if record.startswith(b"\x1e"):
+                record = record[1:]
+                start += 1
+            if record.startswith(b'{"') or record == b"{}":
+                yield start, record
+
+
+def _spool_records(spool) -> Iterator[bytes]:
+    """Feature JSON of each record in a spool, one per line."""
+    for line in spool:
+        record = line.rstrip(b",\r\n")
+        yield record[1:] if record.startswith(b"\x1e") else record
+
+
+def _source_features(
+    file_path: Path,
+    stream: bool,
+    reducer: Optional[Any],
+    tagger: Optional[Any] = None,
+    dedup: Optional[Any] = None,
+) -> Iterator[Dict]:
+    features = _file_features(file_path, stream)
+    if reducer is not None:
+        features = reducer.iter_apply(features)
+    # Before tagging, so dropped duplicates are never tagged.
+    if dedup is not None:
+        features = dedup.iter_apply(features)
+    if tagger is not None:
+        features = tagger.iter_apply(features)
+    return features
+
+
+class _Spool(NamedTuple):
+    features: int
+    elapsed: float
+    stats: Dict[str, Dict]
+    province_spools: Dict[str, Path]
+    keys: Optional[array]
+    slugs: Optional[List[str]]
+
+
+def _spool_file(
+    file_path: Path,
+    spool_path: Path,
+    stream: bool,
+    output_format: str,
+    reducer: Optional[Any] = None,
+    tagger: Optional[Any] = None,
+    split_provinces: bool = False,
+    dedup: Optional[Any] = None,
+) -> _Spool:
+    """Serialize one input's features to ``spool_path`` (runs in a worker).
+
+    With ``split_provinces`` each province also gets its own spool next to
+    ``spool_path``; their paths are returned by province slug. With
+    ``dedup`` nothing is dropped here: every record's dedup key (and
+    province slug) is returned so the parent can filter in input order.
+    """
+    start_file = time.time()
+    fmt = OUTPUT_FORMATS[output_format]
+    stages = {"reducer": reducer, "tagger": tagger}
+    for stage in stages.values():
+        if stage is not None:
+            # The pickled copy may carry the parent's running totals.
+            stage.reset_stats()
+    province_spools = None
+    keys = slugs = None
+    on_record: Optional[Callable[[Dict, bytes], None]] = None
+    if dedup is not None:
+        keys = array("Q")
+        slugs = [] if tagger is not None else None
+
+        def record_key(feature: Dict, record: bytes) -> None:
+            keys.append(dedup.key(feature))
+            if slugs is not None:
+                slugs.append(tagger.slug_for(feature))
+
+        on_record = record_key
+    elif split_provinces:
+        province_spools = ProvinceOutputs(spool_path, _OutputFormat(b"", b"", *fmt[2:]), tagger)
+        on_record = province_spools.write
+    with spool_path.open("wb") as f:
+        writer = _FeatureWriter(f, fmt)
+        file_features, _ = writer.write_features(
+            _source_features(file_path, stream, reducer, tagger), on_record
+        )
+    spools: Dict[str, Path] = {}
+    if province_spools is not None:
+        province_spools.close()
+        spools = province_spools.paths()
+    stats = {name: stage.stats for name, stage in stages.items() if stage is not None}
+    return _Spool(file_features, time.time() - start_file, stats, spools, keys, slugs)
+
+
+def _list_inputs(input_dir: Path) -> List[Path]:
+    return sorted(
+        path
+        for path in input_dir.iterdir()
+        if path.is_file() and (path.suffix == ".geojson" or _is_seq_file(path))
+    )
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_COPY_BUFFER_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _manifest_path(output_file: Path) -> Path:
+    return output_file.with_name(output_file.name + ".manifest.json")
+
+
+def _load_manifest(
+    manifest_path: Path,
+    output_file: Path,
+    output_format: str,
+    transform: Optional[Dict] = None,
+) -> Dict[str, Dict]:
+    """Return cached per-file entries, or {} if the cache cannot be trusted."""
+    if not manifest_path.exists():
+        return {}
+    try:
+        manifest = _load_json(manifest_path)
+    except (OSError, ValueError) as exc:
+        print(f"   Ignoring unreadable manifest {manifest_path.name}: {exc}")
+        return {}
+    if manifest.get("version") != _MANIFEST_VERSION:
+        print(f"   Ignoring manifest {manifest_path.name}: version mismatch")
+        return {}
+    if manifest.get("format") != output_format:
+        print(f"   Ignoring manifest {manifest_path.name}: output format changed")
+        return {}
+    if manifest.get("transform") != transform:
+        print(f"   Ignoring manifest {manifest_path.name}: precision/simplification changed")
+        return {}
+    if manifest.get("json_style") != geojson_io.output_style():
+        print(f"   Ignoring manifest {manifest_path.name}: JSON output style changed")
+        return {}
+    try:
+        st = output_file.stat()
+    except OSError:
+        return {}
+    output = manifest.get("output", {})
+    if output.get("size") != st.st_size or output.get("mtime_ns") != st.st_mtime_ns:
+        print(f"   Ignoring manifest {manifest_path.name}: output changed since last run")
+        return {}
+    return manifest.get("files", {})
+
+
+def _fingerprint(file_path: Path, entry: Optional[Dict]) -> Tuple[Dict, bool]:
+    """Fingerprint an input and report whether its cached segment is reusable.
+
+    The content hash is only recomputed when size or mtime differ from the
+    manifest, so untouched files cost a single ``stat``.
+    """
+    st = file_path.stat()
+    fingerprint = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+        fingerprint["sha256"] = entry["sha256"]
+        return fingerprint, True
+    fingerprint["sha256"] = _sha256(file_path)
+    reusable = (
+        entry is not None
+        and entry.get("size") == st.st_size
+        and entry.get("sha256") == fingerprint["sha256"]
+    )
+    return fingerprint, reusable
+
+
+def _index_path(output_file: Path) -> Path:
+    return output_file.with_name(output_file.name + ".idx")
+
+
+def _sort_output(
+    sorter: Any,
+    unsorted: Path,
+    output_file: Path,
+    fmt: _OutputFormat,
+    index_path: Optional[Path] = None,
+) -> None:
+    """Rewrite ``unsorted`` into ``output_file`` in ``sorter`` order, then delete it.
+
+    With ``index_path`` the offset sidecar is written to its ``.tmp`` name.
+    """
+    with output_file.open("wb") as f, contextlib.ExitStack() as stack:
+        index = None
+        if index_path is not None:
+            index = _OffsetIndexWriter(index_path.with_name(index_path.name + ".tmp"))
+            stack.callback(index.close)
+        writer = _FeatureWriter(f, fmt, index)
+        writer.write(fmt.header)
+        records = (record for _, record in iter_feature_records(unsorted))
+        for record in sorter.sort_records(records):
+            writer.write_record(record)
+        if index is not None:
+            index.append(writer.pos)
+        writer.write(fmt.footer)
+    unsorted.unlink()
+
+
+def merge_geojson(
+    input_dir: Path,
+    output_file: Path,
+    stream: bool = False,
+    workers: int = 1,
+    incremental: bool = False,
+    output_format: str = "geojson",
+    write_index: bool = False,
+    reducer: Optional[Any] = None,
+    tagger: Optional[Any] = None,
+    split_provinces: bool = False,
+    dedup: Optional[Any] = None,
+    sorter: Optional[Any] = None,
+) -> None:
+    """Merge every input in ``input_dir`` into ``output_file``.
+
+    ``reducer`` (``simplify_geojson.GeometryReducer``) and ``tagger``
+    (``tag_provinces.ProvinceTagger``) are optional stages applied to
+    features on their way to the output. ``split_provinces`` also writes
+    one file per province next to the output. ``dedup``
+    (``dedup_features.FeatureDeduplicator``) keeps only the first copy of
+    features repeated across inputs. ``sorter``
+    (``spatial_sort.HilbertSorter``) reorders the finished output, and any
+    per-province files, along a Hilbert curve.
+    """
+    files = _list_inputs(input_dir)
     if not files:
         raise FileNotFoundError(f"No .geojson files found in {input_dir}")
+    if split_provinces and tagger is None:
+        raise ValueError("split_provinces needs a tagger")
+    if split_provinces and incremental:
+        # Reused segments are copied as bytes and never reach the splitter.
+        raise ValueError("split_provinces cannot be combined with incremental")
+    if dedup is not None and incremental:
+        # Reused segments would have to be re-read to know their keys.
+        raise ValueError("dedup cannot be combined with incremental")
+    if sorter is not None and incremental:
+        # Segments are per input file; a sorted output has none.
+        raise ValueError("sorter cannot be combined with incremental")
+    fmt = OUTPUT_FORMATS[output_format]
 
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
     print(f"Merging {len(files)} files from: {input_dir}")
-    print(f"Output file: {output_file}")
+    print(f"Output file: {output_file} ({output_format})")
+    print(f"JSON backend: {geojson_io.backend_name()}")
+    if workers > 1:
+        print(f"Workers: {workers}")
+    transform: Dict[str, Dict] = {}
+    if reducer is not None:
+        print(f"Geometry reduction: {reducer}")
+        transform["reduce"] = reducer.describe()
+    if tagger is not None:
+        print(f"Province tagging: {tagger}")
+        transform["provinces"] = tagger.describe()
+    if dedup is not None:
+        print(f"De-duplication: {dedup}")
+        transform["dedup"] = dedup.describe()
+    if sorter is not None:
+        print(f"Spatial sort: {sorter}")
+        transform["sort"] = sorter.describe()
     start_all = time.time()
+    input_bytes = sum(file_path.stat().st_size for file_path in files)
+
+    manifest_path = _manifest_path(output_file)
+    fingerprints: Dict[str, Dict] = {}
+    reuse: Dict[str, Dict] = {}
+    if incremental:
+        previous = _load_manifest(
+            manifest_path, output_file, output_format, transform or None
+        )
+        for file_path in files:
+            entry = previous.get(file_path.name)
+            fingerprints[file_path.name], reusable = _fingerprint(file_path, entry)
+            if reusable:
+                reuse[file_path.name] = entry
+        print(
+            f"Incremental: {len(reuse)} unchanged, "
+            f"{len(files) - len(reuse)} to rebuild, "
+            f"{len(set(previous) - set(fingerprints))} removed"
+        )
+
+    # Incremental runs read cached segments from the previous output, so the
+    # new one is built beside it and swapped in at the end.
+    target = output_file.with_name(output_file.name + ".tmp") if incremental else output_file
+    if sorter is not None:
+        # Merged in input order first, then sorted into the real output.
+        target = output_file.with_name(output_file.name + ".unsorted")
+    index_path = _index_path(output_file)
+    segments: Dict[str, Dict] = {}
 
-    with output_file.open("w", encoding="utf-8") as f:
-        f.write("{\n")
-        f.write("  \"type\": \"FeatureCollection\",\n")
-        f.write("  \"features\": [\n")
+    with target.open("wb") as f, contextlib.ExitStack() as stack:
+        merge_stage = stack.enter_context(instrumentation.stage("merge"))
+        index = None
+        if write_index and sorter is None:
+            index = _OffsetIndexWriter(index_path.with_name(index_path.name + ".tmp"))
+            stack.callback(index.close)
+        writer = _FeatureWriter(f, fmt, index)
+        writer.write(fmt.header)
+        provinces = None
+        if split_provinces:
+            provinces = ProvinceOutputs(output_file, fmt, tagger)
+            stack.callback(provinces.close)
+
+        spools: Dict[str, Tuple[Path, Any]] = {}
+        if workers > 1:
+            spool_dir = Path(stack.enter_context(tempfile.TemporaryDirectory(
+                prefix=".merge-spool-", dir=output_file.parent
+            )))
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            for idx, file_path in enumerate(files):
+                if file_path.name in reuse:
+                    continue
+                spool_path = spool_dir / f"{idx:06d}.part"
+                future = pool.submit(
+                    _spool_file,
+                    file_path,
+                    spool_path,
+                    stream,
+                    output_format,
+                    reducer,
+                    tagger,
+                    split_provinces,
+                    dedup,
+                )
+                spools[file_path.name] = (spool_path, future)
+        previous_output = stack.enter_context(output_file.open("rb")) if reuse else None
 
-        first = True
         total_features = 0
+        # Consume in sorted order so output matches the serial merge.
         for file_path in files:
+            name = file_path.name
             start_file = time.time()
-            print(f"-> Loading: {file_path.name}")
-            doc = _load_json(file_path)
-            file_features = 0
-            for feature in _iter_features(doc):
-                if not first:
-                    f.write(",\n")
-                f.write(json.dumps(feature, ensure_ascii=False))
-                first = False
-                file_features += 1
-                total_features += 1
-
-            elapsed = time.time() - start_file
+            offset = writer.pos
+            duplicates = 0
+            entry = reuse.get(name)
+            if entry is not None:
+                print(f"-> Reusing: {name}")
+                file_features = entry["features"]
+                if file_features:
+                    offset = writer.copy_segment(
+                        previous_output, entry["offset"], entry["length"]
+                    )
+                verb = "Copied"
+                elapsed = time.time() - start_file
+            elif name in spools:
+                print(f"-> Loading: {name}")
+                spool_path, future = spools[name]
+                result = future.result()
+                file_features, elapsed = result.features, result.elapsed
+                for stage, stage_name in ((reducer, "reducer"), (tagger, "tagger")):
+                    for key, value in result.stats.get(stage_name, {}).items():
+                        stage.stats[key] += value
+                if provinces is not None:
+                    provinces.copy_from(result.province_spools)
+                if dedup is not None:
+                    first = dedup.first_seen(result.keys)
+                    slugs = result.slugs or itertools.repeat(None)
+                    duplicates = file_features - sum(first)
+                    file_features -= duplicates
+                    if result.slugs is not None:
+                        # Workers tagged the duplicates too; take them back out.
+                        for slug in itertools.compress(
+                            result.slugs, (not keep for keep in first)
+                        ):
+                            tagger.stats[slug] -= 1
+                    with spool_path.open("rb") as spool:
+                        kept = itertools.compress(zip(_spool_records(spool), slugs), first)
+                        for i, (record, slug) in enumerate(kept):
+                            record_offset = writer.write_record(record)
+                            if not i:
+                                offset = record_offset
+                            if provinces is not None:
+                                provinces.writer(slug).write_record(record)
+                elif file_features:
+                    with spool_path.open("rb") as spool:
+                        offset = writer.copy_segment(spool)
+                spool_path.unlink()
+                verb = "Added"
+            else:
+                print(f"-> Loading: {name}")
+                before = dedup.stats["duplicates"] if dedup is not None else 0
+                file_features, offset = writer.write_features(
+                    _source_features(file_path, stream, reducer, tagger, dedup),
+                    provinces.write if provinces is not None else None,
+                )
+                if dedup is not None:
+                    duplicates = dedup.stats["duplicates"] - before
+                verb = "Added"
+                elapsed = time.time() - start_file
+
+            segments[name] = {
+                "offset": offset,
+                "length": writer.pos - offset if file_features else 0,
+                "features": file_features,
+            }
+            total_features += file_features
             print(
-                f"   Added {file_features} features from {file_path.name} "
+                f"   {verb} {file_features} features from {name} "
                 f"in {elapsed:.1f}s"
+                + (f" ({duplicates} duplicates skipped)" if duplicates else "")
             )
 
-        f.write("\n  ]\n")
-        f.write("}\n")
+        if index is not None:
+            # Sentinel: end of the last record, so record N spans
+            # offsets[N]..offsets[N + 1] (minus any separator).
+            index.append(writer.pos)
+        writer.write(fmt.footer)
+        merge_stage.features = total_features
 
+    if sorter is not None:
+        sort_start = time.time()
+        try:
+            with instrumentation.stage("spatial_sort") as sort_stage:
+                _sort_output(
+                    sorter, target, output_file, fmt, index_path if write_index else None
+                )
+                sort_stage.features = sorter.stats["features"]
+            print(f"Spatial sort: {sorter.summary()} in {time.time() - sort_start:.1f}s")
+            if provinces is not None:
+                with instrumentation.stage("spatial_sort_provinces"):
+                    for path in provinces.paths().values():
+                        unsorted = path.with_name(path.name + ".unsorted")
+                        os.replace(path, unsorted)
+                        _sort_output(sorter, unsorted, path, fmt)
+        finally:
+            sorter.close()
+
+    if incremental:
+        os.replace(target, output_file)
+        st = output_file.stat()
+        manifest = {
+            "version": _MANIFEST_VERSION,
+            "format": output_format,
+            "transform": transform or None,
+            "json_style": geojson_io.output_style(),
+            "output": {"size": st.st_size, "mtime_ns": st.st_mtime_ns},
+            "files": {
+                name: {**fingerprints[name], **segment}
+                for name, segment in segments.items()
+            },
+        }
+        manifest_tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+        geojson_io.dump(manifest, manifest_tmp, indent=2)
+        os.replace(manifest_tmp, manifest_path)
+    if write_index:
+        os.replace(index_path.with_name(index_path.name + ".tmp"), index_path)
+        print(f"Offset index: {index_path}")
+
+    if reducer is not None:
+        print(f"Geometry reduction: {reducer.summary()}")
+    if tagger is not None:
+        print(f"Provinces: {tagger.summary()}")
+    if dedup is not None:
+        print(f"De-duplication: {dedup.summary()}")
+    if provinces is not None:
+        for path in provinces.paths().values():
+            print(f"Province output: {path}")
     elapsed_all = time.time() - start_all
+    rate = 1 / elapsed_all if elapsed_all > 0 else 0.0
     print(
         f"Done. Total features: {total_features}. "
         f"Elapsed: {elapsed_all:.1f}s"
     )
+    print(
+        f"Throughput: {input_bytes * rate / 1e6:.1f} MB/s, "
+        f"{total_features * rate:.0f} features/s"
+    )
 
 
 def main() -> None:
@@ -86,19 +902,156 @@ def main() -> None:
     parser.add_argument(
         "--input-dir",
         default="results-from-osm",
-        help="Directory containing .geojson files (default: results-from-osm)",
+        help=(
+            "Directory containing .geojson (or .geojsons/.geojsonl/.geojsonseq/"
+            ".ndjson sequence) files (default: results-from-osm)"
+        ),
     )
     parser.add_argument(
         "--output",
         default="final-pulau-jawa/final_pulau_jawa.geojson",
         help="Output GeoJSON file (default: final-pulau-jawa/final_pulau_jawa.geojson)",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse each input's features array incrementally (bounded memory)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parse/serialize input files in N processes (default: 1; 0 = all CPUs)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(OUTPUT_FORMATS),
+        default="geojson",
+        help=(
+            "Output format: one FeatureCollection (default), RFC 8142 GeoJSON "
+            "Text Sequence, or newline-delimited features"
+        ),
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help=(
+            "Also write <output>.idx, a uint64 byte offset per feature plus end "
+            "sentinel (random access: see feature_reader.py)"
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Reuse unchanged inputs' segments from the previous output via "
+            "<output>.manifest.json"
+        ),
+    )
+    simplify = parser.add_argument_group(
+        "geometry reduction (needs shapely; see simplify_geojson.py)"
+    )
+    stage_options.add_simplify_arguments(simplify)
+    regions = parser.add_argument_group(
+        "province tagging (needs shapely; see tag_provinces.py)"
+    )
+    regions.add_argument(
+        "--provinces",
+        nargs="?",
+        const="boundaries-provinsi-pulau-jawa",
+        help=(
+            "Add province/province_code properties using the boundaries in DIR "
+            "(default DIR: boundaries-provinsi-pulau-jawa)"
+        ),
+    )
+    regions.add_argument(
+        "--province-rule",
+        choices=["anchor", "intersects"],
+        default="anchor",
+        help="anchor = middle vertex, fast (default); intersects = full geometry",
+    )
+    regions.add_argument(
+        "--split-provinces",
+        action="store_true",
+        help="Also write <output stem>_<province><suffix> per province (implies --provinces)",
+    )
+    duplicates = parser.add_argument_group("de-duplication (see dedup_features.py)")
+    duplicates.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Keep only the first feature per OSM id (geometry hash if it has none)",
+    )
+    dedup_features.add_arguments(duplicates)
+    ordering = parser.add_argument_group(
+        "spatial ordering (needs shapely; see spatial_sort.py)"
+    )
+    ordering.add_argument(
+        "--spatial-sort",
+        action="store_true",
+        help=(
+            "Order features along a Hilbert curve of their bbox centres "
+            "(external sort after the merge)"
+        ),
+    )
+    stage_options.add_sort_arguments(ordering)
+    geojson_io.add_arguments(parser)
     args = parser.parse_args()
+    geojson_io.configure(args)
+
+    reducer = None
+    if args.precision is not None or args.simplify_m or args.zoom is not None:
+        from simplify_geojson import reducer_from_args
+
+        reducer = reducer_from_args(args)
+    tagger = None
+    if args.provinces or args.split_provinces:
+        from tag_provinces import DEFAULT_BOUNDARY_DIR, ProvinceTagger
+
+        tagger = ProvinceTagger(
+            Path(args.provinces or DEFAULT_BOUNDARY_DIR), rule=args.province_rule
+        )
+    if args.split_provinces and args.incremental:
+        print("❌ --split-provinces cannot be combined with --incremental")
+        exit(1)
+    if args.dedup and args.incremental:
+        print("❌ --dedup cannot be combined with --incremental")
+        exit(1)
+    if args.spatial_sort and args.incremental:
+        print("❌ --spatial-sort cannot be combined with --incremental")
+        exit(1)
 
     input_dir = Path(args.input_dir)
     output_file = Path(args.output)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    dedup = None
+    if args.dedup:
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        dedup = dedup_features.FeatureDeduplicator(args.dedup_memory_keys, spill_dir=output_file.parent)
+    sorter = None
+    if args.spatial_sort:
+        from spatial_sort import HilbertSorter
+
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        sorter = HilbertSorter(args.sort_memory_mb, spill_dir=output_file.parent)
 
-    merge_geojson(input_dir, output_file)
+    try:
+        merge_geojson(
+            input_dir,
+            output_file,
+            stream=args.stream,
+            workers=workers,
+            incremental=args.incremental,
+            output_format=args.format,
+            write_index=args.index,
+            reducer=reducer,
+            tagger=tagger,
+            split_provinces=args.split_provinces,
+            dedup=dedup,
+            sorter=sorter,
+        )
+    finally:
+        if dedup is not None:
+            dedup.close()
 
 
 if __name__ == "__main__":
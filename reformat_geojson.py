@@ -1,14 +1,15 @@
 #!/usr/bin/env python3
 import argparse
-import json
 from pathlib import Path
 
+import geojson_io
+import instrumentation
+
 
 def reformat_to_simple(input_file: Path, output_file: Path) -> None:
     """Reformat complex GeoJSON to simple MultiPolygon format like sample."""
     
-    with input_file.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = geojson_io.load(input_file)
     
     # Extract coordinates dari berbagai kemungkinan struktur
     if isinstance(data, dict):
@@ -42,8 +43,7 @@ def reformat_to_simple(input_file: Path, output_file: Path) -> None:
         "coordinates": coords
     }
     
-    with output_file.open("w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False)
+    geojson_io.dump(output, output_file)
     
     print(f"✅ Reformatted successfully!")
     print(f"💾 Saved to: {output_file}")
@@ -63,7 +63,9 @@ def main() -> None:
         default="merged_final.geojson",
         help="Output GeoJSON file (default: merged_final.geojson)",
     )
+    geojson_io.add_arguments(parser)
     args = parser.parse_args()
+    geojson_io.configure(args)
     
     input_file = Path(args.input)
     output_file = Path(args.output)
@@ -72,7 +74,8 @@ def main() -> None:
         print(f"❌ Input file not found: {input_file}")
         exit(1)
     
-    reformat_to_simple(input_file, output_file)
+    with instrumentation.stage("reformat"):
+        reformat_to_simple(input_file, output_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Build a routable road graph (CSR adjacency) from merged OSM road features.
+
+``build`` streams the LineStrings of merge_osm_results.py's output once,
+quantizes every vertex to an integer grid (1e-7° by default, OSM's own
+precision) and turns way endpoints and vertices shared by more than one way
+into graph nodes. Each stretch of a way between two nodes becomes an edge;
+edges are stored as directed arcs in compressed sparse row form:
+
+    indptr[n + 1]   arcs of node u are indptr[u]:indptr[u + 1]
+    indices         target node of each arc (int32)
+    length          arc length in meters (float32, haversine)
+    highway         code into ``highway_classes`` (uint8, 0 = missing)
+    oneway          arc comes from a one-way street (bool)
+    feature         index of the source feature in the input (uint32)
+
+plus ``node_lon``/``node_lat`` and per-feature ``osm_id``. Two-way streets
+get an arc in each direction; ``oneway=-1`` ways only get the reverse one.
+
+Graphs are saved either as one ``.npz`` file or, for instant loading, as a
+directory of ``.npy`` files that ``RoadGraph.load`` memory-maps.
+"""
+import argparse
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError as exc:
+    raise SystemExit(
+        "NumPy is required. Install it with: pip install numpy"
+    ) from exc
+
+import geojson_io
+import instrumentation
+from merge_osm_results import iter_file_features
+
+FORMAT_VERSION = 1
+DEFAULT_PRECISION = 7
+# 10**12 * 180 still fits an int64 and float64 carries no more decimals.
+MAX_PRECISION = 12
+EARTH_RADIUS_M = 6_371_008.8
+
+_ONEWAY_FORWARD = {"yes", "true", "1"}
+_ONEWAY_REVERSE = {"-1", "reverse"}
+# OSM tagging rules: these are one-way unless tagged otherwise.
+_IMPLIED_ONEWAY_HIGHWAYS = {"motorway"}
+_IMPLIED_ONEWAY_JUNCTIONS = {"roundabout", "circular"}
+
+_ARRAYS = (
+    "indptr",
+    "indices",
+    "length",
+    "highway",
+    "oneway",
+    "feature",
+    "node_lon",
+    "node_lat",
+    "osm_id",
+    "highway_classes",
+    "meta",
+)
+
+
+def _oneway(properties: Dict) -> int:
+    """1 = forward only, -1 = reverse only, 0 = both directions."""
+    value = str(properties.get("oneway", "")).lower()
+    if value in _ONEWAY_FORWARD:
+        return 1
+    if value in _ONEWAY_REVERSE:
+        return -1
+    if value == "no":
+        return 0
+    if (
+        properties.get("highway") in _IMPLIED_ONEWAY_HIGHWAYS
+        or properties.get("junction") in _IMPLIED_ONEWAY_JUNCTIONS
+    ):
+        return 1
+    return 0
+
+
+def _osm_id(feature: Dict) -> int:
+    """Numeric OSM id from ``id``/``@id`` such as "way/123", or -1."""
+    value = feature.get("id", (feature.get("properties") or {}).get("@id"))
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        tail = value.rsplit("/", 1)[-1]
+        if tail.isdigit():
+            return int(tail)
+    return -1
+
+
+def haversine_m(lon1, lat1, lon2, lat2) -> np.ndarray:
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+class RoadGraph:
+    """CSR road graph; arrays may be plain or memory-mapped (read-only)."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]) -> None:
+        self.indptr = arrays["indptr"]
+        self.indices = arrays["indices"]
+        self.length = arrays["length"]
+        self.highway = arrays["highway"]
+        self.oneway = arrays["oneway"]
+        self.feature = arrays["feature"]
+        self.node_lon = arrays["node_lon"]
+        self.node_lat = arrays["node_lat"]
+        self.osm_id = arrays["osm_id"]
+        self.highway_classes: List[Optional[str]] = [None] + [
+            str(name) for name in arrays["highway_classes"][1:]
+        ]
+        meta = arrays["meta"]
+        if int(meta[0]) != FORMAT_VERSION:
+            raise ValueError("Unsupported road graph format version")
+        self.precision = int(meta[1])
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def num_arcs(self) -> int:
+        return len(self.indices)
+
+    def neighbors(self, node: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(target nodes, lengths in meters) of the arcs leaving ``node``."""
+        start, end = self.indptr[node], self.indptr[node + 1]
+        return self.indices[start:end], self.length[start:end]
+
+    def nearest_node(self, lon: float, lat: float) -> int:
+        return int(np.argmin(haversine_m(lon, lat, self.node_lon, self.node_lat)))
+
+    def to_scipy(self):
+        """The weighted adjacency as a ``scipy.sparse.csr_matrix`` (meters)."""
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError as exc:
+            raise SystemExit(
+                "SciPy is required for to_scipy(). Install it with: pip install scipy"
+            ) from exc
+        return csr_matrix(
+            (self.length, self.indices, self.indptr), shape=(self.num_nodes,) * 2
+        )
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        classes = np.array([""] + self.highway_classes[1:])
+        return {
+            "indptr": self.indptr,
+            "indices": self.indices,
+            "length": self.length,
+            "highway": self.highway,
+            "oneway": self.oneway,
+            "feature": self.feature,
+            "node_lon": self.node_lon,
+            "node_lat": self.node_lat,
+            "osm_id": self.osm_id,
+            "highway_classes": classes,
+            "meta": np.array([FORMAT_VERSION, self.precision], dtype=np.int64),
+        }
+
+    def save(self, path: Path, compress: bool = False) -> None:
+        """Write ``path.npz``, or a directory of ``.npy`` files otherwise."""
+        path = Path(path)
+        if path.suffix == ".npz":
+            path.parent.mkdir(parents=True, exist_ok=True)
+            (np.savez_compressed if compress else np.savez)(path, **self.arrays())
+            return
+        path.mkdir(parents=True, exist_ok=True)
+        for name, values in self.arrays().items():
+            np.save(path / f"{name}.npy", values)
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "RoadGraph":
+        """Load a saved graph; ``.npy`` directories are memory-mapped."""
+        path = Path(path)
+        if path.is_dir():
+            mode = "r" if mmap else None
+            return cls({
+                name: np.load(path / f"{name}.npy", mmap_mode=mode) for name in _ARRAYS
+            })
+        with np.load(path) as data:
+            return cls({name: data[name] for name in _ARRAYS})
+
+
+def _collect_lines(input_file: Path):
+    """Stream line coordinates and per-feature attributes into typed arrays."""
+    xs, ys = array("d"), array("d")
+    line_offsets = array("q", [0])
+    line_feature = array("I")
+    feature_highway = array("B")
+    feature_oneway = array("b")
+    osm_ids = array("q")
+    classes: Dict[str, int] = {}
+    n_features = skipped = 0
+
+    for feature in iter_file_features(input_file):
+        geometry = feature.get("geometry") or {}
+        geom_type = geometry.get("type")
+        if geom_type == "LineString":
+            lines = [geometry["coordinates"]]
+        elif geom_type == "MultiLineString":
+            lines = geometry["coordinates"]
+        else:
+            skipped += 1
+            continue
+        properties = feature.get("properties") or {}
+        highway = properties.get("highway")
+        if isinstance(highway, str):
+            code = classes.setdefault(highway, len(classes) + 1)
+            if code > 255:
+                raise ValueError("More than 255 highway classes")
+        else:
+            code = 0
+        feature_highway.append(code)
+        feature_oneway.append(_oneway(properties))
+        osm_ids.append(_osm_id(feature))
+        for line in lines:
+            if len(line) < 2:
+                continue
+            xs.extend(c[0] for c in line)
+            ys.extend(c[1] for c in line)
+            line_offsets.append(len(xs))
+            line_feature.append(n_features)
+        n_features += 1
+
+    as_np = np.frombuffer
+    return (
+        as_np(xs, dtype=np.float64),
+        as_np(ys, dtype=np.float64),
+        as_np(line_offsets, dtype=np.int64),
+        as_np(line_feature, dtype=np.uint32),
+        as_np(feature_highway, dtype=np.uint8),
+        as_np(feature_oneway, dtype=np.int8),
+        as_np(osm_ids, dtype=np.int64),
+        [name for name, _ in sorted(classes.items(), key=lambda item: item[1])],
+        skipped,
+    )
+
+
+def build_graph(input_file: Path, precision: int = DEFAULT_PRECISION) -> RoadGraph:
+    """Build the CSR road graph of every (Multi)LineString in ``input_file``."""
+    if not 0 <= precision <= MAX_PRECISION:
+        raise ValueError(f"precision must be between 0 and {MAX_PRECISION}, got {precision}")
+    start = time.time()
+    (
+        x, y, line_offsets, line_feature, feature_highway, feature_oneway,
+        osm_ids, classes, skipped,
+    ) = _collect_lines(input_file)
+    n_lines = len(line_offsets) - 1
+    print(f"   Read {len(osm_ids)} ways, {n_lines} lines, {len(x)} vertices "
+          f"in {time.time() - start:.1f}s")
+    if skipped:
+        print(f"   ⚠️  Skipped {skipped} non-line features")
+
+    # Integer grid key per vertex: (lon, lat) quantized relative to the
+    # minimum and packed in one int64 when both spans fit in 32 bits (always
+    # true at the default precision); otherwise rows are compared pairwise.
+    scale = 10 ** precision
+    qx = np.rint(x * scale).astype(np.int64)
+    qy = np.rint(y * scale).astype(np.int64)
+    if len(qx):
+        qx -= qx.min()
+        qy -= qy.min()
+    if len(qx) and max(qx.max(), qy.max()) >> 32:
+        _, inverse, counts = np.unique(
+            np.column_stack([qx, qy]), axis=0, return_inverse=True, return_counts=True
+        )
+        inverse = inverse.ravel()
+    else:
+        _, inverse, counts = np.unique(
+            (qx << 32) | qy, return_inverse=True, return_counts=True
+        )
+
+    line = np.repeat(np.arange(n_lines), np.diff(line_offsets))
+    is_node = counts[inverse] > 1
+    is_node[line_offsets[:-1]] = True
+    is_node[line_offsets[1:] - 1] = True
+
+    node_key = np.zeros(len(counts), dtype=bool)
+    node_key[inverse[is_node]] = True
+    node_of_key = np.cumsum(node_key) - 1
+    vertex_node = node_of_key[inverse]
+    node_vertex = np.empty(int(node_key.sum()), dtype=np.int64)
+    node_vertex[vertex_node[is_node]] = np.flatnonzero(is_node)
+
+    # Cumulative length along the concatenated lines; gaps between lines
+    # contribute nothing because edges never span two lines.
+    seg = haversine_m(x[:-1], y[:-1], x[1:], y[1:])
+    seg[line_offsets[1:-1] - 1] = 0.0
+    cum = np.concatenate(([0.0], np.cumsum(seg)))
+
+    p = np.flatnonzero(is_node)
+    same_line = line[p[:-1]] == line[p[1:]]
+    a, b = p[:-1][same_line], p[1:][same_line]
+    u, v = vertex_node[a], vertex_node[b]
+    length = cum[b] - cum[a]
+    feature = line_feature[line[a]]
+    keep = (u != v) | (length > 0)
+    u, v, length, feature = u[keep], v[keep], length[keep], feature[keep]
+    direction = feature_oneway[feature]
+
+    forward = direction >= 0
+    backward = direction <= 0
+    src = np.concatenate((u[forward], v[backward]))
+    dst = np.concatenate((v[forward], u[backward]))
+    arc_feature = np.concatenate((feature[forward], feature[backward]))
+    arc_length = np.concatenate((length[forward], length[backward]))
+
+    order = np.argsort(src, kind="stable")
+    n_nodes = len(node_vertex)
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n_nodes), out=indptr[1:])
+    arc_feature = arc_feature[order]
+
+    graph = RoadGraph({
+        "indptr": indptr,
+        "indices": dst[order].astype(np.int32),
+        "length": arc_length[order].astype(np.float32),
+        "highway": feature_highway[arc_feature],
+        "oneway": feature_oneway[arc_feature] != 0,
+        "feature": arc_feature,
+        "node_lon": x[node_vertex],
+        "node_lat": y[node_vertex],
+        "osm_id": osm_ids,
+        "highway_classes": np.array([""] + classes),
+        "meta": np.array([FORMAT_VERSION, precision], dtype=np.int64),
+    })
+    print(f"   {n_nodes} nodes, {len(u)} edges, {graph.num_arcs} arcs "
+          f"in {time.time() - start:.1f}s")
+    return graph
+
+
+def _nbytes(graph: RoadGraph) -> int:
+    return sum(values.nbytes for values in graph.arrays().values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build or inspect a CSR road graph from merged road GeoJSON."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Build the graph")
+    build.add_argument(
+        "--input",
+        default="final-pulau-jawa/final_pulau_jawa.geojson",
+        help="Merged road file (default: final-pulau-jawa/final_pulau_jawa.geojson)",
+    )
+    build.add_argument(
+        "--output",
+        default="final-pulau-jawa/road_graph",
+        help=(
+            "Output: a directory of .npy files (memory-mappable, default: "
+            "final-pulau-jawa/road_graph) or a .npz file"
+        ),
+    )
+    build.add_argument(
+        "--precision",
+        type=int,
+        default=DEFAULT_PRECISION,
+        help=(
+            f"Decimals used to snap vertices to nodes, 0-{MAX_PRECISION} "
+            f"(default: {DEFAULT_PRECISION})"
+        ),
+    )
+    build.add_argument(
+        "--compress", action="store_true", help="Compress .npz output"
+    )
+    geojson_io.add_arguments(build)
+
+    info = sub.add_parser("info", help="Load a graph and print a summary")
+    info.add_argument(
+        "graph",
+        nargs="?",
+        default="final-pulau-jawa/road_graph",
+        help="Graph directory or .npz (default: final-pulau-jawa/road_graph)",
+    )
+    info.add_argument(
+        "--near",
+        nargs=2,
+        type=float,
+        metavar=("LON", "LAT"),
+        help="Also print the nearest node and its arcs",
+    )
+    args = parser.parse_args()
+
+    if args.command == "build":
+        geojson_io.configure(args)
+        input_file = Path(args.input)
+        if not input_file.exists():
+            print(f"❌ Input file not found: {input_file}")
+            exit(1)
+        if not 0 <= args.precision <= MAX_PRECISION:
+            print(f"❌ --precision must be between 0 and {MAX_PRECISION}")
+            exit(1)
+        print(f"Building road graph: {input_file}")
+        with instrumentation.stage("build"):
+            graph = build_graph(input_file, precision=args.precision)
+        with instrumentation.stage("save"):
+            graph.save(Path(args.output), compress=args.compress)
+        print(f"💾 Saved to: {args.output} ({_nbytes(graph) / 1e6:.1f} MB)")
+        return
+
+    start = time.perf_counter()
+    graph = RoadGraph.load(Path(args.graph))
+    elapsed = time.perf_counter() - start
+    print(f"📄 {args.graph}")
+    print(f"   Loaded in {elapsed * 1000:.1f} ms")
+    print(f"   Nodes: {graph.num_nodes}, arcs: {graph.num_arcs}")
+    print(f"   Total length: {float(graph.length.sum(dtype=np.float64)) / 1000:.0f} km (arcs)")
+    counts = np.bincount(graph.highway, minlength=len(graph.highway_classes))
+    for code, name in enumerate(graph.highway_classes):
+        if counts[code]:
+            print(f"   {name or '(none)'}: {counts[code]} arcs")
+    if args.near:
+        node = graph.nearest_node(*args.near)
+        targets, lengths = graph.neighbors(node)
+        print(f"   Nearest node {node}: ({graph.node_lon[node]:.7f}, {graph.node_lat[node]:.7f})")
+        for target, length in zip(targets.tolist(), lengths.tolist()):
+            print(f"      -> {target} ({length:.1f} m)")
+
+
+if __name__ == "__main__":
+    main()
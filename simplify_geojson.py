@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Shrink road GeoJSON by quantizing coordinates and simplifying geometries.
+
+Two independent, optional steps, both run on whole batches of features:
+
+* precision: round every coordinate to N decimals (6 decimals ~ 0.11 m) and
+  drop the consecutive duplicate vertices that rounding creates.
+* simplification with a tolerance in meters, either given directly or
+  derived from a web-map zoom level. ``dp`` is GEOS' topology-preserving
+  Douglas-Peucker (``shapely.simplify``); ``vw`` is Visvalingam-Whyatt
+  run vectorized over the packed coordinate array of the batch.
+
+``GeometryReducer`` is what merge_osm_results.py uses to apply the stage
+while it streams the merged output; this script applies it to an existing
+file.
+"""
+import argparse
+import itertools
+import math
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import numpy as np
+    import shapely
+except ImportError as exc:
+    raise SystemExit(
+        "Shapely is required. Install it with: pip install shapely"
+    ) from exc
+
+import geojson_io
+import instrumentation
+from stage_options import DEFAULT_PIXELS, METHODS, add_simplify_arguments
+
+METERS_PER_DEGREE = 111_320.0
+# Ground resolution of a 256 px web-mercator tile pixel at the equator, zoom 0.
+EQUATOR_METERS_PER_PIXEL = 156_543.034
+# Java spans roughly 5.9°S - 8.8°S.
+DEFAULT_LATITUDE = -7.3
+DEFAULT_BATCH_SIZE = 10000
+
+_SIMPLIFIABLE = {"LineString", "MultiLineString", "Polygon", "MultiPolygon"}
+_ROUNDABLE = _SIMPLIFIABLE | {"Point", "MultiPoint"}
+_POLYGONAL = {"Polygon", "MultiPolygon"}
+_TYPE_NAMES = {
+    int(shapely.GeometryType.POINT): "Point",
+    int(shapely.GeometryType.LINESTRING): "LineString",
+    int(shapely.GeometryType.POLYGON): "Polygon",
+    int(shapely.GeometryType.MULTIPOINT): "MultiPoint",
+    int(shapely.GeometryType.MULTILINESTRING): "MultiLineString",
+    int(shapely.GeometryType.MULTIPOLYGON): "MultiPolygon",
+}
+
+
+def tolerance_for_zoom(
+    zoom: float, pixels: float = DEFAULT_PIXELS, latitude: float = DEFAULT_LATITUDE
+) -> float:
+    """Tolerance in meters that stays below ``pixels`` on screen at ``zoom``."""
+    return pixels * EQUATOR_METERS_PER_PIXEL * math.cos(math.radians(latitude)) / 2 ** zoom
+
+
+def meters_to_degrees(meters: float) -> float:
+    # One degree of latitude; longitude degrees are within 1% of it on Java.
+    return meters / METERS_PER_DEGREE
+
+
+def _nest(coords: np.ndarray, offsets) -> List:
+    """GeoJSON coordinate lists per geometry from shapely.to_ragged_array output."""
+    items = coords.tolist()
+    for level in offsets:
+        items = [items[a:b] for a, b in zip(level[:-1].tolist(), level[1:].tolist())]
+    return items
+
+
+def _ring_ids(ring_offsets: np.ndarray) -> np.ndarray:
+    return np.repeat(np.arange(len(ring_offsets) - 1), np.diff(ring_offsets))
+
+
+def _compact(coords: np.ndarray, ring_offsets: np.ndarray, keep: np.ndarray):
+    """Drop vertices where ``keep`` is False; return (coords, new ring offsets)."""
+    counts = np.add.reduceat(keep, ring_offsets[:-1]) if len(coords) else np.zeros(0, int)
+    new_offsets = np.zeros(len(ring_offsets), dtype=ring_offsets.dtype)
+    np.cumsum(counts, out=new_offsets[1:])
+    return coords[keep], new_offsets
+
+
+def _drop_repeated(coords: np.ndarray, ring_offsets: np.ndarray, min_points: int) -> np.ndarray:
+    """Mask of vertices to keep after removing consecutive duplicates.
+
+    Ring/line endpoints are always kept, and a ring that would fall below
+    ``min_points`` keeps all of its vertices.
+    """
+    keep = np.ones(len(coords), dtype=bool)
+    if len(coords) < 2:
+        return keep
+    keep[1:] = (coords[1:] != coords[:-1]).any(axis=1)
+    keep[ring_offsets[:-1]] = True
+    keep[ring_offsets[1:] - 1] = True
+    counts = np.add.reduceat(keep, ring_offsets[:-1])
+    short = np.flatnonzero(counts < min_points)
+    if len(short):
+        keep[np.isin(_ring_ids(ring_offsets), short)] = True
+    return keep
+
+
+def _visvalingam(
+    coords: np.ndarray, ring_offsets: np.ndarray, min_area: float, min_points: int
+) -> np.ndarray:
+    """Visvalingam-Whyatt over every ring/line at once; returns the keep mask.
+
+    Each pass computes the effective triangle area of all remaining interior
+    vertices and removes those below ``min_area`` that are a local minimum
+    among their neighbours (so two adjacent vertices are never dropped on
+    the same pass), smallest first and never below ``min_points`` per ring.
+    Passes repeat until nothing changes.
+    """
+    n = len(coords)
+    keep = np.ones(n, dtype=bool)
+    if n < 3:
+        return keep
+    ring = _ring_ids(ring_offsets)
+    endpoint = np.zeros(n, dtype=bool)
+    endpoint[ring_offsets[:-1]] = True
+    endpoint[ring_offsets[1:] - 1] = True
+    x, y = coords[:, 0], coords[:, 1]
+    while True:
+        idx = np.flatnonzero(keep)
+        # Endpoints are always kept, so a kept interior vertex's neighbours in
+        # ``idx`` belong to the same ring.
+        pos = np.flatnonzero(~endpoint[idx])
+        if not len(pos):
+            return keep
+        prev, cur, nxt = idx[pos - 1], idx[pos], idx[pos + 1]
+        area = 0.5 * np.abs(
+            (x[prev] - x[cur]) * (y[nxt] - y[cur]) - (x[nxt] - x[cur]) * (y[prev] - y[cur])
+        )
+        full = np.full(len(idx), np.inf)
+        full[pos] = area
+        left = full[pos - 1]
+        right = full[pos + 1]
+        # Ties break towards the left neighbour.
+        candidate = (area < min_area) & (area <= left) & (area < right)
+        if not candidate.any():
+            return keep
+        cand = cur[candidate]
+        cand_ring = ring[cand]
+        budget = np.bincount(ring[idx], minlength=len(ring_offsets) - 1) - min_points
+        order = np.lexsort((area[candidate], cand_ring))
+        sorted_ring = cand_ring[order]
+        rank = np.arange(len(order)) - np.searchsorted(sorted_ring, sorted_ring)
+        allowed = order[rank < budget[sorted_ring]]
+        if not len(allowed):
+            return keep
+        keep[cand[allowed]] = False
+
+
+class GeometryReducer:
+    """Batch coordinate quantization and simplification for feature dicts.
+
+    Picklable, so merge_osm_results worker processes can carry it.
+    """
+
+    def __init__(
+        self,
+        precision: Optional[int] = None,
+        tolerance_m: Optional[float] = None,
+        method: str = "dp",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        if method not in METHODS:
+            raise ValueError(f"Unknown simplification method: {method}")
+        self.precision = precision
+        self.tolerance_m = tolerance_m or None
+        self.method = method
+        self.batch_size = batch_size
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.stats = {"features": 0, "vertices_in": 0, "vertices_out": 0, "fallbacks": 0}
+
+    def describe(self) -> Dict:
+        """Settings that change the output (stored in the merge manifest)."""
+        return {
+            "precision": self.precision,
+            "tolerance_m": self.tolerance_m,
+            "method": self.method if self.tolerance_m else None,
+        }
+
+    def __repr__(self) -> str:
+        parts = []
+        if self.precision is not None:
+            parts.append(f"{self.precision} decimals")
+        if self.tolerance_m:
+            parts.append(f"{self.method} {self.tolerance_m:g} m")
+        return ", ".join(parts) or "no-op"
+
+    def iter_apply(self, features: Iterator[Dict]) -> Iterator[Dict]:
+        """Apply to a feature stream, ``batch_size`` features at a time."""
+        features = iter(features)
+        while True:
+            batch = list(itertools.islice(features, self.batch_size))
+            if not batch:
+                return
+            yield from self.apply(batch)
+
+    def apply(self, features: List[Dict]) -> List[Dict]:
+        """Return ``features`` with reduced geometries (others untouched)."""
+        # Points only have something to gain from rounding.
+        allowed = _ROUNDABLE if self.precision is not None else _SIMPLIFIABLE
+        picked = [
+            i for i, f in enumerate(features)
+            if (f.get("geometry") or {}).get("type") in allowed
+        ]
+        if not picked:
+            return features
+        geoms = shapely.from_geojson(
+            [geojson_io.dumps(features[i]["geometry"], compact=True) for i in picked],
+            on_invalid="ignore",
+        )
+        ok = np.not_equal(geoms, None) & ~shapely.is_empty(geoms)
+        picked = np.asarray(picked)[ok]
+        geoms = geoms[ok]
+        self.stats["features"] += len(geoms)
+        self.stats["vertices_in"] += int(shapely.get_num_coordinates(geoms).sum())
+
+        if self.tolerance_m and self.method == "dp":
+            geoms = shapely.simplify(
+                geoms, meters_to_degrees(self.tolerance_m), preserve_topology=True
+            )
+
+        out = list(features)
+        type_ids = shapely.get_type_id(geoms)
+        for type_id in np.unique(type_ids):
+            group = np.flatnonzero(type_ids == type_id)
+            for i, geometry in zip(picked[group].tolist(), self._reduce(geoms[group])):
+                out[i] = dict(features[i], geometry=geometry)
+        return out
+
+    def _reduce(self, geoms: np.ndarray) -> List[Dict]:
+        """Round/VW-simplify geometries of one type via their ragged arrays."""
+        geom_type, coords, offsets = shapely.to_ragged_array(geoms)
+        type_name = _TYPE_NAMES[int(geom_type)]
+        offsets = list(offsets)
+        polygonal = type_name in _POLYGONAL
+        min_points = 4 if polygonal else 2
+        vw = bool(self.tolerance_m) and self.method == "vw" and type_name in _SIMPLIFIABLE
+
+        if self.precision is not None:
+            coords = np.round(coords, self.precision)
+            if type_name in _SIMPLIFIABLE:
+                keep = _drop_repeated(coords, offsets[0], min_points)
+                coords, offsets[0] = _compact(coords, offsets[0], keep)
+        if vw:
+            min_area = meters_to_degrees(self.tolerance_m) ** 2
+            keep = _visvalingam(coords, offsets[0], min_area, min_points)
+            coords, offsets[0] = _compact(coords, offsets[0], keep)
+        nested = _nest(coords, offsets)
+        self.stats["vertices_out"] += len(coords)
+
+        if vw and polygonal:
+            # VW is not topology-preserving; keep the input where it broke.
+            reduced = shapely.from_ragged_array(geom_type, coords, tuple(offsets))
+            broken = np.flatnonzero(~shapely.is_valid(reduced) & shapely.is_valid(geoms))
+            if len(broken):
+                _, fb_coords, fb_offsets = shapely.to_ragged_array(geoms[broken])
+                if self.precision is not None:
+                    fb_coords = np.round(fb_coords, self.precision)
+                for i, coordinates in zip(broken.tolist(), _nest(fb_coords, fb_offsets)):
+                    nested[i] = coordinates
+                self.stats["fallbacks"] += len(broken)
+                self.stats["vertices_out"] += len(fb_coords) - int(
+                    shapely.get_num_coordinates(reduced[broken]).sum()
+                )
+        return [{"type": type_name, "coordinates": c} for c in nested]
+
+    def summary(self) -> str:
+        stats = self.stats
+        kept = stats["vertices_out"] / stats["vertices_in"] if stats["vertices_in"] else 1.0
+        line = (
+            f"{stats['features']} geometries, {stats['vertices_in']} -> "
+            f"{stats['vertices_out']} vertices ({kept:.1%} kept)"
+        )
+        if stats["fallbacks"]:
+            line += f", {stats['fallbacks']} left unsimplified (would be invalid)"
+        return line
+
+
+def reducer_from_args(args: argparse.Namespace) -> Optional[GeometryReducer]:
+    """Build a reducer from the options of ``add_simplify_arguments`` (or None)."""
+    tolerance_m = args.simplify_m
+    if tolerance_m is None and args.zoom is not None:
+        tolerance_m = tolerance_for_zoom(args.zoom, args.pixels)
+    if args.precision is None and not tolerance_m:
+        return None
+    return GeometryReducer(args.precision, tolerance_m, args.simplify_method)
+
+
+def simplify_geojson(
+    input_file: Path,
+    output_file: Path,
+    reducer: GeometryReducer,
+    output_format: str = "geojson",
+) -> None:
+    from merge_osm_results import OUTPUT_FORMATS, iter_file_features
+
+    fmt = OUTPUT_FORMATS[output_format]
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    print(f"🔧 Reducing: {input_file} ({reducer})")
+    start = time.perf_counter()
+    dumps = geojson_io.get_backend().dumps
+    total = 0
+    with output_file.open("wb") as out:
+        out.write(fmt.header)
+        for feature in reducer.iter_apply(iter_file_features(input_file)):
+            if total:
+                out.write(fmt.separator)
+            out.write(fmt.prefix + dumps(feature) + fmt.suffix)
+            total += 1
+        out.write(fmt.footer)
+    elapsed = time.perf_counter() - start
+    size_in = os.path.getsize(input_file)
+    size_out = os.path.getsize(output_file)
+    print(f"   {reducer.summary()}")
+    print(
+        f"   {size_in / 1e6:.1f} MB -> {size_out / 1e6:.1f} MB "
+        f"({size_out / size_in:.1%}) in {elapsed:.1f}s, {total} features"
+    )
+    print(f"💾 Saved to: {output_file}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Quantize coordinates and simplify geometries of a GeoJSON file."
+    )
+    parser.add_argument(
+        "--input",
+        default="final-pulau-jawa/final_pulau_jawa.geojson",
+        help="Input GeoJSON/GeoJSONSeq (default: final-pulau-jawa/final_pulau_jawa.geojson)",
+    )
+    parser.add_argument("--output", required=True, help="Output file")
+    parser.add_argument(
+        "--format",
+        choices=["geojson", "geojsonseq", "ndjson"],
+        default="geojson",
+        help="Output format (default: geojson)",
+    )
+    add_simplify_arguments(parser)
+    geojson_io.add_arguments(parser)
+    args = parser.parse_args()
+    geojson_io.configure(args)
+
+    input_file = Path(args.input)
+    if not input_file.exists():
+        print(f"❌ Input file not found: {input_file}")
+        exit(1)
+    reducer = reducer_from_args(args)
+    if reducer is None:
+        print("❌ Nothing to do: give --precision and/or --simplify-m/--zoom")
+        exit(1)
+    with instrumentation.stage("simplify"):
+        simplify_geojson(input_file, Path(args.output), reducer, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Static packed Hilbert R-tree over a merged road file, for bbox queries.
+
+``build`` scans the output of merge_osm_results.py once, sorts the feature
+bboxes along a Hilbert curve and writes ``<output>.rtree`` next to it. Leaves
+point at each feature's byte range, so ``query`` seeks straight to the
+matching lines instead of parsing the whole file.
+
+Index layout (little-endian): magic b"JAWARTR1", uint64 header offset,
+uint64 header length, then the ``boxes`` (float64 x 4 per node, leaves
+first, root last), ``offsets`` and ``lengths`` (uint64 per leaf) arrays and
+a JSON header.
+"""
+import argparse
+import json
+import mmap
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError as exc:
+    raise SystemExit(
+        "NumPy is required. Install it with: pip install numpy"
+    ) from exc
+
+import geojson_io
+import instrumentation
+from merge_osm_results import iter_feature_records
+
+MAGIC = b"JAWARTR1"
+FORMAT_VERSION = 1
+DEFAULT_NODE_SIZE = 16
+_HILBERT_ORDER = 16
+
+
+def _coords_bounds(coords) -> Optional[Tuple[float, float, float, float]]:
+    """Bounds of arbitrarily nested GeoJSON coordinates (None if empty)."""
+    if not coords:
+        return None
+    if not isinstance(coords[0], list):
+        return coords[0], coords[1], coords[0], coords[1]
+    if not isinstance(coords[0][0], list):
+        xs = [c[0] for c in coords]
+        ys = [c[1] for c in coords]
+        return min(xs), min(ys), max(xs), max(ys)
+    boxes = [b for b in (_coords_bounds(c) for c in coords) if b is not None]
+    if not boxes:
+        return None
+    return (
+        min(b[0] for b in boxes),
+        min(b[1] for b in boxes),
+        max(b[2] for b in boxes),
+        max(b[3] for b in boxes),
+    )
+
+
+def geometry_bounds(geometry: Optional[Dict]) -> Optional[Tuple[float, float, float, float]]:
+    if not geometry:
+        return None
+    if geometry.get("type") == "GeometryCollection":
+        boxes = [
+            b for b in (geometry_bounds(g) for g in geometry.get("geometries", []))
+            if b is not None
+        ]
+        if not boxes:
+            return None
+        return (
+            min(b[0] for b in boxes),
+            min(b[1] for b in boxes),
+            max(b[2] for b in boxes),
+            max(b[3] for b in boxes),
+        )
+    return _coords_bounds(geometry.get("coordinates"))
+
+
+def hilbert_index(x: np.ndarray, y: np.ndarray, order: int = _HILBERT_ORDER) -> np.ndarray:
+    """Vectorized Hilbert curve distance for integer grid coordinates."""
+    x = x.astype(np.uint64)
+    y = y.astype(np.uint64)
+    d = np.zeros(x.shape, dtype=np.uint64)
+    s = np.uint64(1 << (order - 1))
+    one = np.uint64(1)
+    full = np.uint64((1 << order) - 1)
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((np.uint64(3) * rx) ^ ry.astype(np.uint64))
+        # Rotate the quadrant so the curve stays continuous.
+        flip = ~ry
+        swap_x = flip & rx
+        x = np.where(swap_x, full - x, x)
+        y = np.where(swap_x, full - y, y)
+        x, y = np.where(flip, y, x), np.where(flip, x, y)
+        s = s >> one
+    return d
+
+
+def _hilbert_order(boxes: np.ndarray) -> np.ndarray:
+    centers_x = (boxes[:, 0] + boxes[:, 2]) / 2
+    centers_y = (boxes[:, 1] + boxes[:, 3]) / 2
+    min_x, max_x = centers_x.min(), centers_x.max()
+    min_y, max_y = centers_y.min(), centers_y.max()
+    scale = (1 << _HILBERT_ORDER) - 1
+    gx = ((centers_x - min_x) / ((max_x - min_x) or 1.0) * scale).astype(np.uint64)
+    gy = ((centers_y - min_y) / ((max_y - min_y) or 1.0) * scale).astype(np.uint64)
+    return np.argsort(hilbert_index(gx, gy), kind="stable")
+
+
+def _pack_levels(leaves: np.ndarray, node_size: int) -> Tuple[np.ndarray, List[List[int]]]:
+    """Stack node boxes level by level; children of node j are j*ns..j*ns+ns-1."""
+    levels = [leaves]
+    while len(levels[-1]) > 1:
+        below = levels[-1]
+        n_nodes = -(-len(below) // node_size)
+        pad = n_nodes * node_size - len(below)
+        padded = np.concatenate([below, np.repeat(below[-1:], pad, axis=0)])
+        groups = padded.reshape(n_nodes, node_size, 4)
+        levels.append(np.column_stack([
+            groups[:, :, 0].min(axis=1),
+            groups[:, :, 1].min(axis=1),
+            groups[:, :, 2].max(axis=1),
+            groups[:, :, 3].max(axis=1),
+        ]))
+    bounds = []
+    start = 0
+    for level in levels:
+        bounds.append([start, start + len(level)])
+        start += len(level)
+    return np.concatenate(levels), bounds
+
+
+def index_path_for(data_file: Path) -> Path:
+    return data_file.with_name(data_file.name + ".rtree")
+
+
+def build_index(
+    data_file: Path, index_file: Optional[Path] = None, node_size: int = DEFAULT_NODE_SIZE
+) -> Path:
+    if node_size < 2:
+        raise ValueError(f"node_size must be at least 2, got {node_size}")
+    index_file = index_file or index_path_for(data_file)
+    print(f"Indexing: {data_file}")
+    start_all = time.time()
+
+    # Flat typed arrays keep ~40 bytes per feature instead of boxed tuples.
+    boxes = array("d")
+    offsets = array("Q")
+    lengths = array("Q")
+    skipped = 0
+    for offset, record in iter_feature_records(data_file):
+        bounds = geometry_bounds(geojson_io.loads(record).get("geometry"))
+        if bounds is None:
+            skipped += 1
+            continue
+        boxes.extend(bounds)
+        offsets.append(offset)
+        lengths.append(len(record))
+    if not offsets:
+        raise ValueError(f"No features with geometry found in {data_file}")
+    print(f"   Read {len(offsets)} feature bboxes in {time.time() - start_all:.1f}s")
+    if skipped:
+        print(f"   Skipped {skipped} features without geometry")
+
+    leaf_boxes = np.frombuffer(boxes, dtype=np.float64).reshape(-1, 4)
+    order = _hilbert_order(leaf_boxes)
+    node_boxes, level_bounds = _pack_levels(leaf_boxes[order], node_size)
+    sections = {
+        "boxes": node_boxes.astype("<f8"),
+        "offsets": np.frombuffer(offsets, dtype=np.uint64)[order].astype("<u8"),
+        "lengths": np.frombuffer(lengths, dtype=np.uint64)[order].astype("<u8"),
+    }
+
+    st = data_file.stat()
+    header: Dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "node_size": node_size,
+        "feature_count": len(offsets),
+        "level_bounds": level_bounds,
+        "bbox": node_boxes[-1].tolist(),
+        "source": {"name": data_file.name, "size": st.st_size, "mtime_ns": st.st_mtime_ns},
+        "sections": {},
+    }
+    tmp_file = index_file.with_name(index_file.name + ".tmp")
+    with tmp_file.open("wb") as f:
+        f.write(MAGIC)
+        f.write(bytes(16))
+        pos = len(MAGIC) + 16
+        for name, arr in sections.items():
+            data = arr.tobytes()
+            header["sections"][name] = {
+                "offset": pos,
+                "dtype": arr.dtype.str,
+                "count": arr.size,
+            }
+            f.write(data)
+            pos += len(data)
+        header_bytes = json.dumps(header).encode("utf-8")
+        f.write(header_bytes)
+        f.seek(len(MAGIC))
+        f.write(pos.to_bytes(8, "little"))
+        f.write(len(header_bytes).to_bytes(8, "little"))
+    tmp_file.replace(index_file)
+
+    print(
+        f"Done. {len(offsets)} features, {len(level_bounds)} levels, "
+        f"{index_file.stat().st_size / 1e6:.1f} MB index. "
+        f"Elapsed: {time.time() - start_all:.1f}s"
+    )
+    return index_file
+
+
+class PackedRTree:
+    """Memory-mapped packed R-tree written by ``build_index``."""
+
+    def __init__(self, index_file: Path) -> None:
+        self.path = Path(index_file)
+        with self.path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a packed R-tree index: {self.path}")
+        pos = len(MAGIC)
+        header_offset = int.from_bytes(self._mmap[pos:pos + 8], "little")
+        header_length = int.from_bytes(self._mmap[pos + 8:pos + 16], "little")
+        self.header: Dict[str, Any] = json.loads(
+            self._mmap[header_offset:header_offset + header_length]
+        )
+        if self.header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported R-tree version in {self.path}")
+        self.node_size: int = self.header["node_size"]
+        self.level_bounds: List[List[int]] = self.header["level_bounds"]
+        self.boxes = self._section("boxes").reshape(-1, 4)
+        self.offsets = self._section("offsets")
+        self.lengths = self._section("lengths")
+
+    def _section(self, name: str) -> np.ndarray:
+        meta = self.header["sections"][name]
+        return np.frombuffer(
+            self._mmap, dtype=meta["dtype"], count=meta["count"], offset=meta["offset"]
+        )
+
+    def __len__(self) -> int:
+        return self.header["feature_count"]
+
+    def is_stale(self, data_file: Path) -> bool:
+        st = data_file.stat()
+        source = self.header["source"]
+        return source["size"] != st.st_size or source["mtime_ns"] != st.st_mtime_ns
+
+    def search(self, min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+        """Leaf positions whose bbox intersects the query window, in file order."""
+        node_size = self.node_size
+        # Walk from the root down; each level is one vectorized box test.
+        candidates = np.zeros(1, dtype=np.int64)
+        for level in range(len(self.level_bounds) - 1, -1, -1):
+            start, end = self.level_bounds[level]
+            boxes = self.boxes[start + candidates]
+            hit = (
+                (boxes[:, 0] <= max_x)
+                & (boxes[:, 2] >= min_x)
+                & (boxes[:, 1] <= max_y)
+                & (boxes[:, 3] >= min_y)
+            )
+            candidates = candidates[hit]
+            if level == 0 or not len(candidates):
+                break
+            below = self.level_bounds[level - 1][1] - self.level_bounds[level - 1][0]
+            children = (candidates[:, None] * node_size + np.arange(node_size)).ravel()
+            candidates = children[children < below]
+        return candidates[np.argsort(self.offsets[candidates], kind="stable")]
+
+    def read_features(self, data_file: Path, positions: np.ndarray) -> Iterator[Dict]:
+        with data_file.open("rb") as f:
+            for pos in positions:
+                f.seek(int(self.offsets[pos]))
+                yield geojson_io.loads(f.read(int(self.lengths[pos])))
+
+    def query(
+        self, data_file: Path, min_x: float, min_y: float, max_x: float, max_y: float
+    ) -> Iterator[Dict]:
+        return self.read_features(data_file, self.search(min_x, min_y, max_x, max_y))
+
+
+def _boundary_filter(boundary_file: Path):
+    """Return (bbox, predicate) for an exact test against a boundary polygon."""
+    try:
+        from shapely import prepared
+        from shapely.geometry import shape
+    except ImportError as exc:
+        raise SystemExit(
+            "Shapely is required for --boundary. Install it with: pip install shapely"
+        ) from exc
+    doc = geojson_io.load(boundary_file)
+    geom = shape(doc.get("geometry", doc))
+    prepared_geom = prepared.prep(geom)
+
+    def predicate(feature: Dict) -> bool:
+        return feature.get("geometry") is not None and prepared_geom.intersects(
+            shape(feature["geometry"])
+        )
+
+    return geom.bounds, predicate
+
+
+def _write_collection(output_file: Path, features: Iterator[Dict]) -> int:
+    count = 0
+    dumps = geojson_io.get_backend().dumps
+    with output_file.open("wb") as f:
+        f.write(b"{\n")
+        f.write(b"  \"type\": \"FeatureCollection\",\n")
+        f.write(b"  \"features\": [\n")
+        for feature in features:
+            if count:
+                f.write(b",\n")
+            f.write(dumps(feature))
+            count += 1
+        f.write(b"\n  ]\n")
+        f.write(b"}\n")
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build or query a packed R-tree over a merged road GeoJSON file."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Build <input>.rtree")
+    build.add_argument(
+        "--input",
+        default="final-pulau-jawa/final_pulau_jawa.geojson",
+        help="Merged road file (default: final-pulau-jawa/final_pulau_jawa.geojson)",
+    )
+    build.add_argument("--index", help="Index file (default: <input>.rtree)")
+    build.add_argument(
+        "--node-size",
+        type=int,
+        default=DEFAULT_NODE_SIZE,
+        help=f"Children per node, at least 2 (default: {DEFAULT_NODE_SIZE})",
+    )
+
+    query = sub.add_parser("query", help="Fetch features inside a bbox or boundary")
+    query.add_argument(
+        "--input",
+        default="final-pulau-jawa/final_pulau_jawa.geojson",
+        help="Merged road file (default: final-pulau-jawa/final_pulau_jawa.geojson)",
+    )
+    query.add_argument("--index", help="Index file (default: <input>.rtree)")
+    window = query.add_mutually_exclusive_group(required=True)
+    window.add_argument(
+        "--bbox",
+        type=float,
+        nargs=4,
+        metavar=("MIN_LON", "MIN_LAT", "MAX_LON", "MAX_LAT"),
+        help="Query window",
+    )
+    window.add_argument(
+        "--boundary",
+        help="GeoJSON polygon (e.g. a province); features must intersect it",
+    )
+    query.add_argument("--output", help="Write matches as a FeatureCollection")
+    for command in (build, query):
+        geojson_io.add_arguments(command)
+    args = parser.parse_args()
+    geojson_io.configure(args)
+
+    data_file = Path(args.input)
+    if not data_file.exists():
+        print(f"❌ Input file not found: {data_file}")
+        exit(1)
+    index_file = Path(args.index) if args.index else index_path_for(data_file)
+
+    if args.command == "build":
+        if args.node_size < 2:
+            print("❌ --node-size must be at least 2")
+            exit(1)
+        with instrumentation.stage("build"):
+            build_index(data_file, index_file, node_size=args.node_size)
+        return
+
+    tree = PackedRTree(index_file)
+    if tree.is_stale(data_file):
+        print(f"⚠️  {index_file.name} is older than {data_file.name}; rebuild it")
+
+    predicate = None
+    if args.boundary:
+        bbox, predicate = _boundary_filter(Path(args.boundary))
+    else:
+        bbox = tuple(args.bbox)
+
+    with instrumentation.stage("query") as query_stage:
+        start = time.perf_counter()
+        positions = tree.search(*bbox)
+        search_ms = (time.perf_counter() - start) * 1000
+        print(f"Index lookup: {len(positions)} candidates in {search_ms:.3f} ms")
+
+        features = tree.read_features(data_file, positions)
+        if predicate is not None:
+            features = (feature for feature in features if predicate(feature))
+        if args.output:
+            count = _write_collection(Path(args.output), features)
+            print(f"💾 Saved {count} features to: {args.output}")
+        else:
+            count = sum(1 for _ in features)
+            print(f"Matched {count} features")
+        query_stage.features = count
+    print(f"Elapsed: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
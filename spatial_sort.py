@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Reorder a merged road file along a Hilbert curve (external sort).
+
+Inputs are merged in file-name order and each Overpass response lists its
+ways in id order, so neighbouring roads end up scattered across the output
+and every bbox filter or tile job reads the whole file. Sorting features by
+the Hilbert key of their bbox centre keeps nearby roads in nearby bytes:
+range reads touch fewer pages, the R-tree's leaves map to short byte spans
+and the output compresses better.
+
+Records are buffered up to ``memory_mb``; each full buffer is keyed in
+batches (``shapely.from_geojson`` + ``bounds``, vectorized), stably sorted
+and spilled as a run file next to the output. Runs are then k-way merged
+with ``heapq.merge`` (in several passes beyond ``max_open_runs``). Ties
+keep input order, so the result does not depend on the budget. Features
+without geometry go last.
+
+merge_osm_results.py runs this as its final pass (``--spatial-sort``);
+this script sorts an existing file.
+"""
+import argparse
+import heapq
+import os
+import struct
+import tempfile
+import time
+from operator import itemgetter
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+    import shapely
+except ImportError as exc:
+    raise SystemExit(
+        "Shapely is required. Install it with: pip install shapely"
+    ) from exc
+
+import instrumentation
+from spatial_index import hilbert_index
+from stage_options import DEFAULT_MEMORY_MB, add_sort_arguments
+
+DEFAULT_BATCH_SIZE = 20000
+DEFAULT_MAX_OPEN_RUNS = 64
+# Curve order over the whole lon/lat range: 2^31 cells per axis (~2 cm).
+HILBERT_ORDER = 31
+NO_GEOMETRY_KEY = (1 << 64) - 1
+# Per buffered record: bytes object header, list slot and key.
+_RECORD_OVERHEAD = 64
+# Run file framing: big-endian key, little-endian record length.
+_RUN_HEADER = struct.Struct(">QI")
+_RUN_BUFFER_SIZE = 1 << 20
+
+
+def hilbert_keys(records: List[bytes], order: int = HILBERT_ORDER) -> np.ndarray:
+    """uint64 Hilbert key of each serialized feature's bbox centre."""
+    geoms = shapely.from_geojson(records, on_invalid="ignore")
+    bounds = shapely.bounds(geoms)
+    cx = (bounds[:, 0] + bounds[:, 2]) / 2
+    cy = (bounds[:, 1] + bounds[:, 3]) / 2
+    present = ~(np.isnan(cx) | np.isnan(cy))
+    scale = (1 << order) - 1
+    gx = np.clip((cx[present] + 180.0) / 360.0, 0.0, 1.0) * scale
+    gy = np.clip((cy[present] + 90.0) / 180.0, 0.0, 1.0) * scale
+    keys = np.full(len(records), NO_GEOMETRY_KEY, dtype=np.uint64)
+    keys[present] = hilbert_index(gx.astype(np.uint64), gy.astype(np.uint64), order)
+    return keys
+
+
+def _read_run(path: Path) -> Iterator[Tuple[int, bytes]]:
+    with path.open("rb", buffering=_RUN_BUFFER_SIZE) as f:
+        while True:
+            header = f.read(_RUN_HEADER.size)
+            if not header:
+                return
+            key, length = _RUN_HEADER.unpack(header)
+            yield key, f.read(length)
+
+
+class HilbertSorter:
+    """Bounded-memory sort of feature records by Hilbert key."""
+
+    def __init__(
+        self,
+        memory_mb: int = DEFAULT_MEMORY_MB,
+        spill_dir: Optional[Path] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_open_runs: int = DEFAULT_MAX_OPEN_RUNS,
+    ) -> None:
+        self.memory_mb = memory_mb
+        self.spill_dir = spill_dir
+        self.batch_size = batch_size
+        self.max_open_runs = max(2, max_open_runs)
+        self._runs: List[Path] = []
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.stats = {"features": 0, "runs": 0, "spilled_bytes": 0}
+
+    def describe(self) -> Dict:
+        """Settings that change the output (stored in the merge manifest)."""
+        return {"order": "hilbert-bbox-centre", "bits": HILBERT_ORDER}
+
+    def __repr__(self) -> str:
+        return f"Hilbert curve of bbox centres (runs of {self.memory_mb} MB)"
+
+    def _keys(self, records: List[bytes]) -> np.ndarray:
+        return np.concatenate([
+            hilbert_keys(records[start:start + self.batch_size])
+            for start in range(0, len(records), self.batch_size)
+        ]) if records else np.empty(0, dtype=np.uint64)
+
+    def _sorted(self, records: List[bytes]) -> Iterator[Tuple[int, bytes]]:
+        keys = self._keys(records)
+        order = np.argsort(keys, kind="stable")
+        return zip(keys[order].tolist(), (records[i] for i in order.tolist()))
+
+    def _new_run(self) -> Tuple[Path, BinaryIO]:
+        fd, name = tempfile.mkstemp(prefix=".sort-run-", suffix=".bin", dir=self.spill_dir)
+        path = Path(name)
+        self._runs.append(path)
+        return path, os.fdopen(fd, "wb", buffering=_RUN_BUFFER_SIZE)
+
+    def _write_run(self, items: Iterable[Tuple[int, bytes]]) -> Path:
+        path, f = self._new_run()
+        pack = _RUN_HEADER.pack
+        with f:
+            for key, record in items:
+                f.write(pack(key, len(record)))
+                f.write(record)
+        self.stats["spilled_bytes"] += path.stat().st_size
+        return path
+
+    def _merge(self, runs: List[Path]) -> Iterator[Tuple[int, bytes]]:
+        # Earlier runs win ties, which keeps the sort stable across runs.
+        while len(runs) > self.max_open_runs:
+            merged = []
+            for start in range(0, len(runs), self.max_open_runs):
+                group = runs[start:start + self.max_open_runs]
+                merged.append(self._write_run(
+                    heapq.merge(*map(_read_run, group), key=itemgetter(0))
+                ))
+                self._remove(group)
+            runs = merged
+        return heapq.merge(*map(_read_run, runs), key=itemgetter(0))
+
+    def _remove(self, runs: List[Path]) -> None:
+        for path in runs:
+            path.unlink(missing_ok=True)
+            self._runs.remove(path)
+
+    def sort_records(self, records: Iterable[bytes]) -> Iterator[bytes]:
+        """Yield ``records`` (feature JSON) in Hilbert order."""
+        budget = self.memory_mb * 1_000_000
+        buffer: List[bytes] = []
+        size = 0
+        runs: List[Path] = []
+        for record in records:
+            buffer.append(record)
+            size += len(record) + _RECORD_OVERHEAD
+            if size >= budget:
+                runs.append(self._write_run(self._sorted(buffer)))
+                buffer, size = [], 0
+        if not runs:
+            # Fits in memory: no run files at all.
+            self.stats["runs"] += 1 if buffer else 0
+            self.stats["features"] += len(buffer)
+            for _, record in self._sorted(buffer):
+                yield record
+            return
+        if buffer:
+            runs.append(self._write_run(self._sorted(buffer)))
+            buffer = []
+        self.stats["runs"] += len(runs)
+        try:
+            for _, record in self._merge(runs):
+                self.stats["features"] += 1
+                yield record
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Delete any run files left behind."""
+        self._remove(list(self._runs))
+
+    def summary(self) -> str:
+        text = f"{self.stats['features']} features in {self.stats['runs']} run(s)"
+        if self.stats["spilled_bytes"]:
+            text += f", {self.stats['spilled_bytes'] / 1e6:.1f} MB spilled"
+        return text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Reorder a merged road file along a Hilbert curve."
+    )
+    parser.add_argument(
+        "--input",
+        default="final-pulau-jawa/final_pulau_jawa.geojson",
+        help="Merged output (default: final-pulau-jawa/final_pulau_jawa.geojson)",
+    )
+    parser.add_argument("--output", required=True, help="Sorted output file")
+    parser.add_argument(
+        "--format",
+        choices=["geojson", "geojsonseq", "ndjson"],
+        default="geojson",
+        help="Output format (default: geojson)",
+    )
+    add_sort_arguments(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+
+    from merge_osm_results import OUTPUT_FORMATS, _FeatureWriter, iter_feature_records
+
+    input_file = Path(args.input)
+    output_file = Path(args.output)
+    if not input_file.exists():
+        print(f"❌ Input file not found: {input_file}")
+        exit(1)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    sorter = HilbertSorter(args.sort_memory_mb, spill_dir=output_file.parent)
+    fmt = OUTPUT_FORMATS[args.format]
+    print(f"🌀 Sorting: {input_file} ({sorter})")
+    start = time.perf_counter()
+    try:
+        with instrumentation.stage("sort") as sort_stage:
+            with output_file.open("wb") as out:
+                writer = _FeatureWriter(out, fmt)
+                writer.write(fmt.header)
+                records = (record for _, record in iter_feature_records(input_file))
+                for record in sorter.sort_records(records):
+                    writer.write_record(record)
+                writer.write(fmt.footer)
+            sort_stage.features = sorter.stats["features"]
+    finally:
+        sorter.close()
+    elapsed = time.perf_counter() - start
+    print(f"   {sorter.summary()} in {elapsed:.1f}s")
+    print(f"💾 Saved to: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
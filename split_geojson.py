@@ -1,81 +1,258 @@
-import json
+import itertools
+import math
 import os
 
 try:
-    from shapely.geometry import LineString, shape
+    import numpy as np
+    import shapely
+    from shapely import prepared
+    from shapely.geometry import LineString, MultiPolygon, Polygon, box, shape
     from shapely.ops import split, unary_union
+    from shapely.validation import make_valid
 except ImportError as exc:
     raise SystemExit(
         "Shapely is required. Install it with: pip install shapely"
     ) from exc
 
+import geojson_io
+import instrumentation
+
+KM_PER_DEGREE = 111.32
+# Rough road length per km² for Javanese regencies; tune per region.
+DEFAULT_ROAD_DENSITY = 2.0
+DEFAULT_MAX_DEPTH = 16
+
 def load_geojson(file_path):
     """Load GeoJSON file"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return geojson_io.load(file_path)
+
+_COORD_DEPTH = {
+    "Point": 0,
+    "MultiPoint": 1,
+    "LineString": 1,
+    "MultiLineString": 2,
+    "Polygon": 2,
+    "MultiPolygon": 3,
+}
+
+def _iter_position_lists(geom):
+    """Yield the position lists (rings, lines, point sets) of a geometry."""
+    geom_type = geom['type']
+    if geom_type == 'GeometryCollection':
+        for part in geom.get('geometries', []):
+            yield from _iter_position_lists(part)
+        return
+    if geom_type not in _COORD_DEPTH:
+        raise ValueError(f"Unsupported geometry type: {geom_type}")
+
+    coords = geom['coordinates']
+    depth = _COORD_DEPTH[geom_type]
+    if depth == 0:
+        yield [coords]
+    elif depth == 1:
+        yield coords
+    elif depth == 2:
+        yield from coords
+    else:
+        for polygon in coords:
+            yield from polygon
+
+def coords_array(geom):
+    """Return all x/y positions of a geometry as one (n, 2) float array.
+
+    Positions are streamed straight from the GeoJSON lists into a single
+    buffer with ``np.fromiter``; no flattened Python copies are made.
+    """
+    position_lists = list(_iter_position_lists(geom))
+    n_positions = sum(map(len, position_lists))
+    if not n_positions:
+        return np.empty((0, 2))
+    dims = len(next(p for positions in position_lists for p in positions))
+    flat = np.fromiter(
+        itertools.chain.from_iterable(itertools.chain.from_iterable(position_lists)),
+        dtype=float,
+    )
+    if flat.size == n_positions * dims:
+        return flat.reshape(n_positions, dims)[:, :2]
+    # Mixed 2D/3D positions: fall back to slicing x/y one position at a time.
+    flat = np.fromiter(
+        itertools.chain.from_iterable(
+            p[:2] for p in itertools.chain.from_iterable(position_lists)
+        ),
+        dtype=float,
+    )
+    return flat.reshape(-1, 2)
 
 def get_bounds(geom):
-    """Get bounding box of geometry"""
-    coords = []
-    
-    if geom['type'] == 'MultiPolygon':
-        for polygon in geom['coordinates']:
-            for ring in polygon:
-                coords.extend(ring)
-    elif geom['type'] == 'Polygon':
-        for ring in geom['coordinates']:
-            coords.extend(ring)
-    
-    # Extract all coordinates
-    lons = [c[0] for c in coords]
-    lats = [c[1] for c in coords]
-    
-    return min(lons), min(lats), max(lons), max(lats)
+    """Get bounding box of any GeoJSON geometry type"""
+    coords = coords_array(geom)
+    if not len(coords):
+        raise ValueError("Geometry has no coordinates")
+    # Per-column 1-D reductions are much faster than min(axis=0) on (n, 2).
+    lons = coords[:, 0]
+    lats = coords[:, 1]
+    return float(lons.min()), float(lats.min()), float(lons.max()), float(lats.max())
+
+def _polygon_parts(geoms):
+    """Flatten clip results to a list of non-empty Polygons."""
+    polygons = []
+    for part in shapely.get_parts(geoms):
+        if part.geom_type == "Polygon":
+            if not part.is_empty:
+                polygons.append(part)
+        elif part.geom_type in ("MultiPolygon", "GeometryCollection"):
+            polygons.extend(_polygon_parts(part))
+    return polygons
+
+def _clip_sides(geom, axis_value, vertical):
+    """Clip every polygon against the two half-planes of the split line.
+
+    Parts lying wholly on one side are passed through untouched; only the
+    parts straddling the line are clipped, all in one vectorized call per
+    side. Returns (below, above) polygon lists along the split axis.
+    """
+    parts = shapely.get_parts(geom)
+    bounds = shapely.bounds(parts)
+    lo, hi = (bounds[:, 0], bounds[:, 2]) if vertical else (bounds[:, 1], bounds[:, 3])
+    below_only = hi <= axis_value
+    above_only = lo >= axis_value
+    crossing = parts[~(below_only | above_only)]
 
-def _split_by_line(data, output_prefix, line, axis_value, sides):
+    x0, y0, x1, y1 = geom.bounds
+    if vertical:
+        below_rect = (x0, y0, axis_value, y1)
+        above_rect = (axis_value, y0, x1, y1)
+    else:
+        below_rect = (x0, y0, x1, axis_value)
+        above_rect = (x0, axis_value, x1, y1)
+
+    below = list(parts[below_only]) + _polygon_parts(shapely.clip_by_rect(crossing, *below_rect))
+    above = list(parts[above_only]) + _polygon_parts(shapely.clip_by_rect(crossing, *above_rect))
+    return below, above
+
+def split_in_half(geom, vertical):
+    """Split a polygonal geometry at the middle of its bounds, in memory.
+
+    Returns the (below, above) halves along the split axis: west/east for a
+    vertical line, south/north otherwise. Either may be None if empty.
+    """
+    if not geom.is_valid:
+        geom = unary_union(geom)
+    x0, y0, x1, y1 = geom.bounds
+    axis_value = (x0 + x1) / 2 if vertical else (y0 + y1) / 2
+    halves = _clip_sides(geom, axis_value, vertical)
+    return tuple(
+        (polygons[0] if len(polygons) == 1 else MultiPolygon(polygons)) if polygons else None
+        for polygons in halves
+    )
+
+def _split_by_line(
+    data, output_prefix, line, axis_value, sides, engine="clip", precision=None, indent=None
+):
     geometry = data["geometry"]
-    properties = data["properties"]
 
     geom = shape(geometry)
-    merged = unary_union(geom)
-    result = split(merged, line)
-
     side_geoms = {sides[0]: [], sides[1]: []}
-    for part in result.geoms:
-        if part.is_empty:
-            continue
-        center = part.representative_point()
+    if engine == "clip":
+        # clip_by_rect needs valid input; only pay for the union otherwise.
+        if not geom.is_valid:
+            geom = unary_union(geom)
+        below, above = _clip_sides(geom, axis_value, vertical=sides[0] == "left")
         if sides[0] == "left":
-            key = sides[0] if center.x < axis_value else sides[1]
+            side_geoms["left"], side_geoms["right"] = below, above
         else:
-            key = sides[0] if center.y >= axis_value else sides[1]
-        side_geoms[key].append(part)
+            side_geoms["south"], side_geoms["north"] = below, above
+    else:
+        merged = unary_union(geom)
+        result = split(merged, line)
+
+        for part in result.geoms:
+            if part.is_empty:
+                continue
+            center = part.representative_point()
+            if sides[0] == "left":
+                key = sides[0] if center.x < axis_value else sides[1]
+            else:
+                key = sides[0] if center.y >= axis_value else sides[1]
+            side_geoms[key].append(part)
 
+    output_files = []
     for idx, side in enumerate(sides, 1):
         if not side_geoms[side]:
             raise ValueError(f"No geometry created for side: {side}")
 
-        merged_side = unary_union(side_geoms[side])
-        output_data = {
-            "type": "Feature",
-            "metadata": data.get("metadata", {}),
-            "properties": {
-                **properties,
-                "part": idx,
-                "side": side,
-                "original_region": properties.get("name", "Unknown"),
-            },
-            "geometry": json.loads(json.dumps(merged_side.__geo_interface__)),
-        }
-
+        if engine == "clip":
+            polygons = side_geoms[side]
+            merged_side = polygons[0] if len(polygons) == 1 else MultiPolygon(polygons)
+        else:
+            merged_side = unary_union(side_geoms[side])
         output_file = f"{output_prefix}_{side}.geojson"
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        _write_part(
+            data,
+            output_file,
+            merged_side,
+            {"part": idx, "side": side},
+            precision=precision,
+            indent=indent,
+        )
+        output_files.append(output_file)
 
         print(f"✓ Created: {output_file}")
 
+    return output_files
+
+
+def _ring_coords(ring, precision):
+    coords = shapely.get_coordinates(ring)
+    if precision is not None:
+        coords = np.round(coords, precision)
+    return coords.tolist()
+
+def _geometry_json(geom, precision=None):
+    """GeoJSON dict for a geometry, with coordinates optionally rounded."""
+    if precision is None:
+        # Every JSON backend serializes the tuples in __geo_interface__ directly.
+        return geom.__geo_interface__
+    if geom.geom_type == "Polygon":
+        return {
+            "type": "Polygon",
+            "coordinates": [
+                _ring_coords(ring, precision) for ring in (geom.exterior, *geom.interiors)
+            ],
+        }
+    if geom.geom_type == "MultiPolygon":
+        return {
+            "type": "MultiPolygon",
+            "coordinates": [
+                _geometry_json(polygon, precision)["coordinates"] for polygon in geom.geoms
+            ],
+        }
+    return geojson_io.loads(shapely.to_geojson(shapely.set_precision(geom, 10 ** -precision)))
+
+def _write_part(data, output_file, geom, part_properties, precision=None, indent=None):
+    """Write one piece of ``data`` as a Feature, keeping its metadata.
+
+    Output is compact unless ``indent`` is given; ``precision`` rounds
+    coordinates to that many decimals.
+    """
+    properties = data["properties"]
+    output_data = {
+        "type": "Feature",
+        "metadata": data.get("metadata", {}),
+        "properties": {
+            **properties,
+            **part_properties,
+            "original_region": properties.get("name", "Unknown"),
+        },
+        "geometry": _geometry_json(geom, precision),
+    }
+
+    geojson_io.dump(output_data, output_file, indent=indent, compact=True)
+
 
-def split_geojson_by_longitude(input_file, output_prefix):
+def split_geojson_by_longitude(
+    input_file, output_prefix, engine="clip", precision=None, indent=None
+):
     """Split GeoJSON into two parts by longitude (vertical line)."""
 
     data = load_geojson(input_file)
@@ -91,9 +268,20 @@ def split_geojson_by_longitude(input_file, output_prefix):
     line = LineString(
         [(center_lon, min_lat - 1.0), (center_lon, max_lat + 1.0)]
     )
-    _split_by_line(data, output_prefix, line, center_lon, ("left", "right"))
+    return _split_by_line(
+        data,
+        output_prefix,
+        line,
+        center_lon,
+        ("left", "right"),
+        engine=engine,
+        precision=precision,
+        indent=indent,
+    )
 
-def split_geojson_by_latitude(input_file, output_prefix):
+def split_geojson_by_latitude(
+    input_file, output_prefix, engine="clip", precision=None, indent=None
+):
     """Split GeoJSON into two parts by latitude (horizontal line)."""
 
     data = load_geojson(input_file)
@@ -109,25 +297,214 @@ def split_geojson_by_latitude(input_file, output_prefix):
     line = LineString(
         [(min_lon - 1.0, center_lat), (max_lon + 1.0, center_lat)]
     )
-    _split_by_line(data, output_prefix, line, center_lat, ("north", "south"))
+    return _split_by_line(
+        data,
+        output_prefix,
+        line,
+        center_lat,
+        ("north", "south"),
+        engine=engine,
+        precision=precision,
+        indent=indent,
+    )
+
+def _polygonal(geom):
+    """Drop the point/line slivers an intersection can leave behind."""
+    if geom.geom_type in ("Polygon", "MultiPolygon"):
+        return geom
+    polygons = [
+        part for part in shapely.get_parts(geom)
+        if part.geom_type in ("Polygon", "MultiPolygon")
+    ]
+    return unary_union(polygons) if polygons else Polygon()
+
+def _area_km2(geom):
+    """Approximate area in km² from a lon/lat geometry (equirectangular)."""
+    min_lon, min_lat, max_lon, max_lat = geom.bounds
+    mid_lat = math.radians((min_lat + max_lat) / 2)
+    return geom.area * KM_PER_DEGREE ** 2 * math.cos(mid_lat)
+
+def _over_budget(geom, max_vertices, max_area_km2, max_road_km, road_density):
+    if max_vertices is not None and shapely.get_num_coordinates(geom) > max_vertices:
+        return True
+    if max_area_km2 is None and max_road_km is None:
+        return False
+    area = _area_km2(geom)
+    if max_area_km2 is not None and area > max_area_km2:
+        return True
+    return max_road_km is not None and area * road_density > max_road_km
+
+def recursive_tiles(
+    geom,
+    max_vertices=None,
+    max_area_km2=None,
+    max_road_km=None,
+    road_density=DEFAULT_ROAD_DENSITY,
+    max_depth=DEFAULT_MAX_DEPTH,
+):
+    """(path, piece) tiles of a valid polygonal geometry, in memory.
+
+    ``path`` is the string of 0/1 choices that led to the tile ("" for an
+    input that already fits).
+    """
+    region = prepared.prep(geom)
+    leaves = []
+    stack = [("", geom)]
+    while stack:
+        path, piece = stack.pop()
+        if len(path) >= max_depth or not _over_budget(
+            piece, max_vertices, max_area_km2, max_road_km, road_density
+        ):
+            leaves.append((path, piece))
+            continue
+
+        x0, y0, x1, y1 = piece.bounds
+        width_km = (x1 - x0) * KM_PER_DEGREE * math.cos(math.radians((y0 + y1) / 2))
+        height_km = (y1 - y0) * KM_PER_DEGREE
+        if width_km >= height_km:
+            mid = (x0 + x1) / 2
+            halves = (box(x0, y0, mid, y1), box(mid, y0, x1, y1))
+        else:
+            mid = (y0 + y1) / 2
+            halves = (box(x0, mid, x1, y1), box(x0, y0, x1, mid))
+
+        children = []
+        for suffix, half in zip("01", halves):
+            if not region.intersects(half):
+                continue
+            if region.contains(half):
+                child = half
+            else:
+                child = _polygonal(piece.intersection(half))
+            if not child.is_empty:
+                children.append((path + suffix, child))
+        stack.extend(reversed(children))
+
+    return leaves
+
+def split_geojson_recursive(
+    input_file,
+    output_prefix,
+    max_vertices=None,
+    max_area_km2=None,
+    max_road_km=None,
+    road_density=DEFAULT_ROAD_DENSITY,
+    max_depth=DEFAULT_MAX_DEPTH,
+    precision=None,
+    indent=None,
+):
+    """Split GeoJSON into tiles along the longer axis until every tile fits.
+
+    A tile is final once it is under every given budget: vertex count, area
+    in km², or estimated road length (area × ``road_density`` km/km²). The
+    input is parsed and prepared once; each step clips only the parent tile,
+    and halves that lie entirely inside or outside the region skip the
+    clipping altogether.
+    """
+    if max_vertices is None and max_area_km2 is None and max_road_km is None:
+        raise ValueError("At least one tile budget is required")
+
+    data = load_geojson(input_file)
+    geom = shape(data["geometry"])
+    if not geom.is_valid:
+        geom = make_valid(geom)
+    geom = _polygonal(geom)
+
+    min_lon, min_lat, max_lon, max_lat = geom.bounds
+    print(f"Bounds: lon({min_lon:.4f} - {max_lon:.4f}), lat({min_lat:.4f} - {max_lat:.4f})")
+    print(f"Vertices: {shapely.get_num_coordinates(geom)}")
+    print("Split method: Recursive (longer axis)\n")
+
+    leaves = recursive_tiles(
+        geom, max_vertices, max_area_km2, max_road_km, road_density, max_depth
+    )
+
+    output_files = []
+    for idx, (path, piece) in enumerate(leaves, 1):
+        tile = path or "root"
+        output_file = f"{output_prefix}_tile_{tile}.geojson"
+        _write_part(
+            data,
+            output_file,
+            piece,
+            {"part": idx, "tile": tile},
+            precision=precision,
+            indent=indent,
+        )
+        output_files.append(output_file)
+        print(
+            f"✓ Created: {output_file} "
+            f"({shapely.get_num_coordinates(piece)} vertices, "
+            f"{_area_km2(piece):.0f} km²)"
+        )
+    print(f"\nTiles: {len(leaves)}")
+    return output_files
 
 if __name__ == "__main__":
-    import sys
-    
-    # Default file to process
-    input_file = "provinsi-pulau-indonesia/jawa_barat_32.geojson"
-    output_prefix = "results/jawa_barat_split"
-    
-    # Accept command line arguments
-    if len(sys.argv) > 1:
-        input_file = sys.argv[1]
-    if len(sys.argv) > 2:
-        output_prefix = sys.argv[2]
-    
-    # Choose split method (longitude is default)
-    split_method = "longitude"
-    if len(sys.argv) > 3:
-        split_method = sys.argv[3]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Split a GeoJSON region into parts.")
+    parser.add_argument(
+        "input_file",
+        nargs="?",
+        default="provinsi-pulau-indonesia/jawa_barat_32.geojson",
+    )
+    parser.add_argument("output_prefix", nargs="?", default="results/jawa_barat_split")
+    parser.add_argument(
+        "split_method",
+        nargs="?",
+        default="longitude",
+        help="longitude (default), latitude or recursive",
+    )
+    parser.add_argument(
+        "--max-vertices",
+        type=int,
+        help="recursive: maximum vertices per tile (default: 5000 if no other budget)",
+    )
+    parser.add_argument("--max-area-km2", type=float, help="recursive: maximum tile area")
+    parser.add_argument(
+        "--max-road-km",
+        type=float,
+        help="recursive: maximum estimated road length per tile",
+    )
+    parser.add_argument(
+        "--road-density",
+        type=float,
+        default=DEFAULT_ROAD_DENSITY,
+        help=f"recursive: km of road per km² for --max-road-km (default: {DEFAULT_ROAD_DENSITY})",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=DEFAULT_MAX_DEPTH,
+        help=f"recursive: maximum split depth (default: {DEFAULT_MAX_DEPTH})",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["clip", "union"],
+        default="clip",
+        help=(
+            "longitude/latitude: clip each polygon against half-planes (default) "
+            "or the previous union + split path"
+        ),
+    )
+    parser.add_argument(
+        "--precision",
+        type=int,
+        help="Round output coordinates to N decimals (default: full precision)",
+    )
+    parser.add_argument(
+        "--indent",
+        type=int,
+        help="Pretty-print output JSON with this indent (default: compact)",
+    )
+    geojson_io.add_arguments(parser)
+    args = parser.parse_args()
+    geojson_io.configure(args)
+
+    input_file = args.input_file
+    output_prefix = args.output_prefix
+    split_method = args.split_method
     
     print(f"🔄 Processing: {input_file}")
     print()
@@ -136,10 +513,38 @@ if __name__ == "__main__":
     os.makedirs(os.path.dirname(output_prefix) or '.', exist_ok=True)
     
     try:
-        if split_method == "latitude":
-            split_geojson_by_latitude(input_file, output_prefix)
-        else:
-            split_geojson_by_longitude(input_file, output_prefix)
+        with instrumentation.stage(f"split_{split_method}"):
+            if split_method == "latitude":
+                split_geojson_by_latitude(
+                    input_file,
+                    output_prefix,
+                    engine=args.engine,
+                    precision=args.precision,
+                    indent=args.indent,
+                )
+            elif split_method == "recursive":
+                max_vertices = args.max_vertices
+                if max_vertices is None and args.max_area_km2 is None and args.max_road_km is None:
+                    max_vertices = 5000
+                split_geojson_recursive(
+                    input_file,
+                    output_prefix,
+                    max_vertices=max_vertices,
+                    max_area_km2=args.max_area_km2,
+                    max_road_km=args.max_road_km,
+                    road_density=args.road_density,
+                    max_depth=args.max_depth,
+                    precision=args.precision,
+                    indent=args.indent,
+                )
+            else:
+                split_geojson_by_longitude(
+                    input_file,
+                    output_prefix,
+                    engine=args.engine,
+                    precision=args.precision,
+                    indent=args.indent,
+                )
         
         print("\n✅ Split completed successfully!")
         print(f"   Output files in: {os.path.dirname(output_prefix)}/")
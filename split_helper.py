@@ -1,9 +1,16 @@
 #!/usr/bin/env python3
 """
 Helper script untuk split GeoJSON files dengan mudah
+
+Batch mode (non-interaktif, paralel):
+    python3 split_helper.py --batch boundaries-provinsi-pulau-jawa --method longitude
 """
+import contextlib
+import glob
+import io
 import os
 import sys
+import time
 
 def print_menu():
     print("\n" + "="*60)
@@ -89,5 +96,114 @@ def main():
         print("\n❌ Error saat processing")
         return 1
 
+def _split_one(input_file, output_prefix, method, max_vertices):
+    """Split one file in a worker process; returns (outputs, elapsed, error)."""
+    import split_geojson
+
+    start = time.time()
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            if method == "latitude":
+                outputs = split_geojson.split_geojson_by_latitude(input_file, output_prefix)
+            elif method == "recursive":
+                outputs = split_geojson.split_geojson_recursive(
+                    input_file, output_prefix, max_vertices=max_vertices
+                )
+            else:
+                outputs = split_geojson.split_geojson_by_longitude(input_file, output_prefix)
+    except Exception as e:
+        return [], time.time() - start, str(e)
+    return outputs, time.time() - start, None
+
+def _batch_inputs(pattern):
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.geojson")
+    return sorted(f for f in glob.glob(pattern) if validate_file(f))
+
+def batch_main(argv):
+    import argparse
+    from concurrent.futures import ProcessPoolExecutor
+
+    import instrumentation
+
+    parser = argparse.ArgumentParser(
+        description="Split semua file GeoJSON di folder/glob secara paralel."
+    )
+    parser.add_argument("--batch", required=True, help="Folder atau glob file .geojson")
+    parser.add_argument(
+        "--method",
+        choices=["longitude", "latitude", "recursive"],
+        default="longitude",
+        help="Metode split (default: longitude)",
+    )
+    parser.add_argument(
+        "--output-dir", default="results", help="Folder output (default: results)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Jumlah proses (default: 0 = semua CPU)",
+    )
+    parser.add_argument(
+        "--max-vertices",
+        type=int,
+        default=5000,
+        help="Budget vertex per tile untuk metode recursive (default: 5000)",
+    )
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentation.configure(args)
+
+    files = _batch_inputs(args.batch)
+    if not files:
+        print(f"❌ Tidak ada file .geojson di: {args.batch}")
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    workers = min(workers, len(files))
+
+    print(f"\n📁 {len(files)} file, metode {args.method}, {workers} proses")
+    start_all = time.time()
+    with instrumentation.stage("split"):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = []
+            for input_file in files:
+                output_prefix = os.path.join(
+                    args.output_dir,
+                    os.path.basename(input_file).replace('.geojson', '_split'),
+                )
+                futures.append(pool.submit(
+                    _split_one, input_file, output_prefix, args.method, args.max_vertices
+                ))
+            results = [future.result() for future in futures]
+    elapsed_all = time.time() - start_all
+
+    print("\n" + "="*78)
+    print(f"  {'File':<42} {'Output':>6} {'Size':>10} {'Waktu':>8}")
+    print("="*78)
+    failed = 0
+    total_cpu = 0.0
+    for input_file, (outputs, elapsed, error) in zip(files, results):
+        total_cpu += elapsed
+        name = os.path.basename(input_file)
+        if error:
+            failed += 1
+            print(f"  ❌ {name:<40} {error}")
+            continue
+        size = sum(os.path.getsize(f) for f in outputs) / 1024
+        print(f"  {name:<42} {len(outputs):>6} {size:>8.1f} KB {elapsed:>7.2f}s")
+        for output in outputs:
+            print(f"     • {os.path.basename(output)}")
+    print("="*78)
+    print(
+        f"Selesai dalam {elapsed_all:.2f}s "
+        f"(jumlah waktu per file {total_cpu:.2f}s, {len(files) - failed}/{len(files)} berhasil)"
+    )
+    return 1 if failed else 0
+
 if __name__ == "__main__":
+    if any(arg == "--batch" or arg.startswith("--batch=") for arg in sys.argv[1:]):
+        sys.exit(batch_main(sys.argv[1:]))
     sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Command-line options of the optional stages merge_osm_results.py can run.
+
+simplify_geojson.py and spatial_sort.py need shapely at import time, but
+merge_osm_results.py lists their options in ``--help`` whether or not
+shapely is installed. The defaults and ``add_*_arguments`` helpers live
+here so each option has a single definition.
+"""
+import argparse
+
+DEFAULT_MEMORY_MB = 512
+DEFAULT_PIXELS = 0.5
+METHODS = ("dp", "vw")
+
+
+def add_simplify_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the simplify_geojson.py geometry reduction options."""
+    parser.add_argument(
+        "--precision",
+        type=int,
+        help="Round coordinates to N decimals (6 ~ 0.1 m, 5 ~ 1 m)",
+    )
+    tolerance = parser.add_mutually_exclusive_group()
+    tolerance.add_argument(
+        "--simplify-m",
+        type=float,
+        help="Simplify lines/polygons with this tolerance in meters",
+    )
+    tolerance.add_argument(
+        "--zoom",
+        type=float,
+        help="Simplify for display at this web-map zoom level (tolerance = --pixels at that zoom)",
+    )
+    parser.add_argument(
+        "--pixels",
+        type=float,
+        default=DEFAULT_PIXELS,
+        help=f"--zoom: tolerance in screen pixels (default: {DEFAULT_PIXELS})",
+    )
+    parser.add_argument(
+        "--simplify-method",
+        choices=METHODS,
+        default="dp",
+        help="dp = topology-preserving Douglas-Peucker (default), vw = Visvalingam-Whyatt",
+    )
+
+
+def add_sort_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add ``--sort-memory-mb`` (spatial_sort.py / ``--spatial-sort``)."""
+    parser.add_argument(
+        "--sort-memory-mb",
+        type=int,
+        default=DEFAULT_MEMORY_MB,
+        help=(
+            "Memory budget in MB for buffered records before a run is spilled "
+            f"to disk (default: {DEFAULT_MEMORY_MB})"
+        ),
+    )
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic inputs for benchmarking the pipeline offline.
+
+The real inputs are either small (the six province boundaries) or not in
+the repository (the Overpass results and the merged output are LFS
+pointers), so this writes look-alikes of any size from a seed:
+
+    roads       Overpass-style FeatureCollections of OSM ways across Java.
+                Roads cluster around towns, follow a random walk with
+                per-class vertex spacing and a heavy-tailed (log-normal)
+                vertex count, and carry OSM-like tags (highway, name,
+                oneway, surface, lanes, maxspeed, ref, bridge/layer).
+                Consecutive files share ``overlap`` ways, like adjacent
+                Overpass query tiles, for the de-duplication paths.
+    boundaries  Province Features shaped like boundaries-provinsi-pulau-jawa:
+                strips of the island with jagged, exactly shared borders
+                (a valid coverage, so dissolve can use coverage_union),
+                wiggly coastlines and offshore island parts; a fraction of
+                the islands can be made self-intersecting for fix_geojson.
+
+Every file is seeded from ``(seed, file number)``, so the same arguments give
+the same bytes on every machine (orjson and the stdlib backend serialize
+these documents identically). Road files are streamed one feature per line,
+so sizes of several GB need no more memory than a few thousand features.
+
+    synthetic_data.py roads --output-dir synth/roads --size-mb 2000 --files 16
+    synthetic_data.py boundaries --output-dir synth/boundaries --vertices 20000
+"""
+import argparse
+import collections
+import time
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError as exc:
+    raise SystemExit(
+        "NumPy is required. Install it with: pip install numpy"
+    ) from exc
+
+import geojson_io
+
+DEFAULT_SEED = 42
+DEFAULT_OVERLAP = 500
+# lon/lat box of Java, as in the merge benchmarks.
+JAVA_BBOX = (105.2, -8.8, 114.6, -5.8)
+METERS_PER_DEGREE = 111_320.0
+MAX_WAY_VERTICES = 2000
+_BATCH = 4096
+_TOWNS = 60
+_RURAL_SHARE = 0.2
+
+# highway, share of ways, mean vertices, vertex spacing (m), turn per vertex
+# (radians, std dev), share named.
+ROAD_CLASSES = [
+    ("motorway", 0.005, 30, 120.0, 0.03, 0.95),
+    ("trunk", 0.010, 28, 100.0, 0.05, 0.90),
+    ("primary", 0.030, 25, 80.0, 0.08, 0.95),
+    ("secondary", 0.050, 20, 60.0, 0.10, 0.90),
+    ("tertiary", 0.080, 16, 50.0, 0.12, 0.85),
+    ("unclassified", 0.100, 12, 40.0, 0.15, 0.40),
+    ("residential", 0.400, 9, 30.0, 0.20, 0.60),
+    ("service", 0.150, 5, 20.0, 0.30, 0.10),
+    ("track", 0.080, 14, 40.0, 0.25, 0.05),
+    ("path", 0.050, 10, 15.0, 0.35, 0.05),
+    ("footway", 0.045, 6, 10.0, 0.35, 0.05),
+]
+_MAJOR = {"motorway", "trunk", "primary"}
+_LANED = {"motorway", "trunk", "primary", "secondary", "tertiary"}
+_STREET_NAMES = [
+    "Merdeka", "Sudirman", "Diponegoro", "Gatot Subroto", "Ahmad Yani",
+    "Pahlawan", "Raya", "Pemuda", "Veteran", "Kartini", "Pattimura",
+    "Imam Bonjol", "Hayam Wuruk", "Gajah Mada", "Asia Afrika", "Siliwangi",
+    "Cendrawasih", "Melati", "Mawar", "Anggrek", "Kenanga", "Flamboyan",
+    "Kenari", "Nangka", "Mangga", "Rambutan", "Pramuka", "Pasar Baru",
+    "Stasiun", "Kauman", "Pesantren", "Bhayangkara", "Kaliurang", "Magelang",
+]
+_SURFACES = {
+    "paved": (["asphalt", "concrete", "paved"], [0.7, 0.2, 0.1]),
+    "mixed": (["asphalt", "paved", "concrete", "unpaved", "gravel"], [0.4, 0.2, 0.2, 0.1, 0.1]),
+    "rough": (["unpaved", "ground", "gravel", "dirt"], [0.4, 0.3, 0.2, 0.1]),
+}
+_CLASS_SHARE = np.array([c[1] for c in ROAD_CLASSES])
+_CLASS_VERTICES = np.array([c[2] for c in ROAD_CLASSES], dtype=np.float64)
+_CLASS_SPACING = np.array([c[3] for c in ROAD_CLASSES])
+_CLASS_TURN = np.array([c[4] for c in ROAD_CLASSES])
+
+
+def _segment_cumsum(values: np.ndarray, starts: np.ndarray, owner: np.ndarray) -> np.ndarray:
+    """Cumulative sum of ``values`` restarting at every index in ``starts``."""
+    total = np.cumsum(values)
+    return total - (total[starts] - values[starts])[owner]
+
+
+def _towns(seed: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Town centres, spreads (degrees) and Zipf-like weights, shared by all files."""
+    rng = np.random.default_rng([seed, 0xC17])
+    west, south, east, north = JAVA_BBOX
+    lon = rng.uniform(west + 0.2, east - 0.2, _TOWNS)
+    lat = rng.uniform(south + 0.4, north - 0.2, _TOWNS)
+    weights = 1.0 / np.arange(1, _TOWNS + 1)
+    spread = 0.03 + 0.25 * weights ** 0.5
+    return np.column_stack([lon, lat]), spread, weights / weights.sum()
+
+
+def _tags(rng: np.random.Generator, cls: int, way_id: int) -> Dict[str, Any]:
+    highway = ROAD_CLASSES[cls][0]
+    props: Dict[str, Any] = {"@id": f"way/{way_id}", "highway": highway}
+    draw = rng.random(9)
+    if draw[0] < ROAD_CLASSES[cls][5]:
+        street = _STREET_NAMES[int(draw[1] * len(_STREET_NAMES))]
+        if highway in _LANED or draw[8] < 0.7:
+            props["name"] = f"Jalan {street}"
+        else:
+            props["name"] = f"Gang {street} {way_id % 17 + 1}"
+    if highway in _MAJOR and draw[2] < 0.6:
+        props["ref"] = f"{'N' if highway != 'motorway' else 'E'}{way_id % 40 + 1}"
+    if draw[3] < (0.4 if highway in _MAJOR else 0.06):
+        props["oneway"] = "yes"
+    if highway in _LANED and draw[4] < 0.5:
+        props["lanes"] = str(1 + int(draw[4] * 8) if highway in _MAJOR else 2)
+    if highway in _MAJOR and draw[5] < 0.35:
+        props["maxspeed"] = str(60 + 20 * int(draw[5] * 9))
+    kind = "paved" if highway in _LANED else "rough" if highway in ("track", "path") else "mixed"
+    if draw[6] < 0.7:
+        names, weights = _SURFACES[kind]
+        props["surface"] = names[int(np.searchsorted(np.cumsum(weights), draw[7] * 0.9999))]
+    if draw[6] > 0.98:
+        props["bridge"] = "yes"
+        props["layer"] = "1"
+    return props
+
+
+def iter_roads(seed: int, file_idx: int, first_id: int) -> Iterator[Dict[str, Any]]:
+    """Endless stream of road Features for one file, ids counting from ``first_id``."""
+    rng = np.random.default_rng([seed, file_idx])
+    centres, spread, weights = _towns(seed)
+    west, south, east, north = JAVA_BBOX
+    way_id = first_id
+    while True:
+        classes = rng.choice(len(ROAD_CLASSES), size=_BATCH, p=_CLASS_SHARE)
+        counts = rng.lognormal(np.log(_CLASS_VERTICES[classes]) - 0.32, 0.8)
+        counts = np.clip(counts.astype(np.int64), 2, MAX_WAY_VERTICES)
+        town = rng.choice(_TOWNS, size=_BATCH, p=weights)
+        start = centres[town] + rng.normal(0.0, 1.0, (_BATCH, 2)) * spread[town, None]
+        rural = rng.random(_BATCH) < _RURAL_SHARE
+        start[rural] = rng.uniform((west, south), (east, north), (int(rural.sum()), 2))
+        start = np.clip(start, (west, south), (east, north))
+
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        starts = offsets[:-1]
+        owner = np.repeat(np.arange(_BATCH), counts)
+        vertex_class = classes[owner]
+        turn = rng.normal(0.0, 1.0, len(owner)) * _CLASS_TURN[vertex_class]
+        turn[starts] = rng.uniform(0.0, 2 * np.pi, _BATCH)
+        heading = _segment_cumsum(turn, starts, owner)
+        step = _CLASS_SPACING[vertex_class] * rng.uniform(0.5, 1.5, len(owner))
+        step[starts] = 0.0
+        dlat = step * np.sin(heading) / METERS_PER_DEGREE
+        dlon = step * np.cos(heading) / (METERS_PER_DEGREE * np.cos(np.radians(start[owner, 1])))
+        lon = np.round(start[owner, 0] + _segment_cumsum(dlon, starts, owner), 7)
+        lat = np.round(start[owner, 1] + _segment_cumsum(dlat, starts, owner), 7)
+        coords = np.column_stack([lon, lat]).tolist()
+
+        for i in range(_BATCH):
+            props = _tags(rng, int(classes[i]), way_id)
+            yield {
+                "type": "Feature",
+                "properties": props,
+                "geometry": {
+                    "type": "LineString",
+                    "coordinates": coords[offsets[i]:offsets[i + 1]],
+                },
+                "id": props["@id"],
+            }
+            way_id += 1
+
+
+def write_roads(
+    output_dir: Path,
+    files: int = 4,
+    size_mb: Optional[float] = None,
+    features: Optional[int] = None,
+    overlap: int = DEFAULT_OVERLAP,
+    seed: int = DEFAULT_SEED,
+) -> List[Path]:
+    """Write ``files`` road FeatureCollections; return their paths.
+
+    Each file holds ``features`` ways, or is cut once it reaches
+    ``size_mb / files`` MB. Every file after the first starts with the last
+    ``overlap`` ways of the one before.
+    """
+    if (size_mb is None) == (features is None):
+        raise ValueError("Give exactly one of size_mb and features")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    budget = size_mb * 1_000_000 / files if size_mb is not None else None
+    header = geojson_io.dumps({
+        "type": "FeatureCollection",
+        "generator": "overpass-turbo",
+        "copyright": "Synthetic data for benchmarks, not OpenStreetMap.",
+        "timestamp": "2026-01-01T00:00:00Z",
+    }, compact=True)[:-1] + b',"features":[\n'
+    tail: Deque[bytes] = collections.deque(maxlen=overlap)
+    paths = []
+    for idx in range(files):
+        path = output_dir / f"synthetic_{idx:03d}.geojson"
+        carried = list(tail)
+        tail.clear()
+        written = 0
+        with path.open("wb") as f:
+            f.write(header)
+            size = len(header)
+            for record in carried:
+                f.write(b",\n" if written else b"")
+                f.write(record)
+                size += len(record) + 2
+                written += 1
+                tail.append(record)
+            roads = iter_roads(seed, idx + 1, first_id=(idx + 1) * 1_000_000_000)
+            for feature in roads:
+                if features is not None and written >= features:
+                    break
+                if budget is not None and size >= budget:
+                    break
+                record = geojson_io.dumps(feature, compact=True)
+                f.write(b",\n" if written else b"")
+                f.write(record)
+                size += len(record) + 2
+                written += 1
+                tail.append(record)
+            f.write(b"\n]}\n")
+        paths.append(path)
+    return paths
+
+
+def _smooth(x: np.ndarray, waves: np.ndarray) -> np.ndarray:
+    """Sum of sines; ``waves`` rows are (amplitude, frequency, phase)."""
+    return np.sum(waves[:, 0, None] * np.sin(waves[:, 1, None] * x + waves[:, 2, None]), axis=0)
+
+
+def _waves(rng: np.random.Generator, scale: float) -> np.ndarray:
+    amplitude = scale * np.array([1.0, 0.5, 0.25, 0.08])
+    frequency = np.array([0.7, 1.9, 4.3, 11.0])
+    return np.column_stack([amplitude, frequency, rng.uniform(0, 2 * np.pi, 4)])
+
+
+def _island(rng: np.random.Generator, cx: float, cy: float, r: float, invalid: bool) -> List:
+    n = int(np.clip(r / 0.04 * 96, 8, 400))
+    step = 2 * np.pi / n
+    angles = np.arange(n) * step + rng.uniform(0.0, 0.8 * step, n)
+    radius = r * rng.uniform(0.7, 1.0, n)
+    ring = np.round(
+        np.column_stack([cx + radius * np.cos(angles), cy + radius * np.sin(angles)]), 7
+    )
+    if invalid:
+        # Bow-tie: walk half of the ring backwards so its edges cross.
+        half = n // 2
+        ring = np.concatenate([ring[:half], ring[half:][::-1]])
+    ring = ring.tolist()
+    return [ring + ring[:1]]
+
+
+def _provinces(
+    rng: np.random.Generator, provinces: int, vertices: int
+) -> Tuple[List[List], np.ndarray, Tuple[Callable, Callable]]:
+    """Outer rings of ``provinces`` strips sharing their borders exactly."""
+    west, south, east, north = JAVA_BBOX
+    south_wave, north_wave = _waves(rng, 0.12), _waves(rng, 0.12)
+    base_south, base_north = south + 0.5, north - 0.4
+
+    def coast_south(x):
+        return base_south + _smooth(x, south_wave)
+
+    def coast_north(x):
+        return base_north + _smooth(x, north_wave)
+
+    per_side = max(4, vertices // 4)
+    xs = np.linspace(west + 0.3, east - 0.3, provinces + 1)
+    width = xs[1] - xs[0]
+    borders = []
+    t = np.linspace(0.0, 1.0, per_side)
+    # Borders wiggle between the coasts but meet them straight on, so they
+    # never cross a coastline; coast jitter stays below the vertex spacing.
+    taper = np.sin(np.pi * t)
+    jitter = 0.5 * width / per_side
+    for x0 in xs:
+        x = x0 + taper * _smooth(6.0 * t, _waves(rng, 0.12 * width))
+        y0, y1 = coast_south(x), coast_north(x)
+        borders.append(np.round(np.column_stack([x, y0 + t * (y1 - y0)]), 7))
+
+    rings = []
+    for i in range(provinces):
+        left, right = borders[i], borders[i + 1]
+        xb = np.sort(rng.uniform(left[0, 0], right[0, 0], per_side))
+        yb = coast_south(xb) - np.abs(rng.normal(0.0, jitter, per_side))
+        xt = np.sort(rng.uniform(left[-1, 0], right[-1, 0], per_side))[::-1]
+        yt = coast_north(xt) + np.abs(rng.normal(0.0, jitter, per_side))
+        bottom = np.round(np.column_stack([xb, yb]), 7)
+        top = np.round(np.column_stack([xt, yt]), 7)
+        ring = np.concatenate([left[:1], bottom, right, top, left[::-1]])
+        rings.append(ring.tolist())
+    return rings, xs, (coast_south, coast_north)
+
+
+def write_boundaries(
+    output_dir: Path,
+    provinces: int = 6,
+    vertices: int = 2000,
+    islands: int = 50,
+    invalid: float = 0.0,
+    seed: int = DEFAULT_SEED,
+) -> List[Path]:
+    """Write one province Feature per file; return their paths.
+
+    ``vertices`` is the size of each province's main outline, ``islands``
+    the number of extra polygon parts per province and ``invalid`` the share
+    of those parts that self-intersect.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng([seed, 0xB0D])
+    rings, xs, coasts = _provinces(rng, provinces, vertices)
+    width = xs[1] - xs[0]
+    placed: List[Tuple[float, float, float]] = []
+    paths = []
+    for i, ring in enumerate(rings):
+        parts = [[ring]]
+        lo, hi = xs[i] + 0.3 * width, xs[i + 1] - 0.3 * width
+        attempts = 0
+        while len(parts) <= islands and attempts < islands * 20:
+            attempts += 1
+            r = float(np.exp(rng.uniform(np.log(0.003), np.log(0.04))))
+            cx = float(rng.uniform(lo, hi))
+            north = rng.random() < 0.5
+            coast = float(coasts[int(north)](np.array([cx]))[0])
+            gap = 1.5 * r + 0.02 + float(rng.uniform(0.0, 0.3))
+            cy = coast + gap if north else coast - gap
+            if any((cx - x) ** 2 + (cy - y) ** 2 < (r + rr + 0.002) ** 2 for x, y, rr in placed):
+                continue
+            placed.append((cx, cy, r))
+            parts.append(_island(rng, cx, cy, r, invalid=rng.random() < invalid))
+        code = str(91 + i)
+        name = f"Provinsi Sintetis {i + 1}"
+        outline = np.array(ring)
+        feature = {
+            "type": "Feature",
+            "metadata": {
+                "generator": {"name": "synthetic_data.py", "version": "1.0"},
+                "query": {"region": name, "region_code": code, "level": "province"},
+                "result": {"total_features": 1, "seed": seed},
+            },
+            "properties": {
+                "code": code,
+                "name": name,
+                "level": "province",
+                "latitude": round(float(outline[:, 1].mean()), 10),
+                "longitude": round(float(outline[:, 0].mean()), 10),
+            },
+            "geometry": {"type": "MultiPolygon", "coordinates": parts},
+        }
+        path = output_dir / f"provinsi_sintetis_{i + 1}_{code}.geojson"
+        geojson_io.dump(feature, path, indent=2)
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Write deterministic synthetic road and boundary GeoJSON."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    roads = commands.add_parser("roads", help="Overpass-style road FeatureCollections")
+    roads.add_argument("--output-dir", required=True, help="Directory for the files")
+    roads.add_argument("--files", type=int, default=4, help="Files to write (default: 4)")
+    size = roads.add_mutually_exclusive_group()
+    size.add_argument(
+        "--size-mb", type=float, help="Total size across all files (default: 100)"
+    )
+    size.add_argument("--features", type=int, help="Features per file instead of a size")
+    roads.add_argument(
+        "--overlap",
+        type=int,
+        default=DEFAULT_OVERLAP,
+        help=f"Ways repeated from the previous file (default: {DEFAULT_OVERLAP})",
+    )
+    boundaries = commands.add_parser("boundaries", help="Province boundary Features")
+    boundaries.add_argument("--output-dir", required=True, help="Directory for the files")
+    boundaries.add_argument(
+        "--provinces", type=int, default=6, help="Province files (default: 6)"
+    )
+    boundaries.add_argument(
+        "--vertices",
+        type=int,
+        default=2000,
+        help="Vertices of each province's main outline (default: 2000)",
+    )
+    boundaries.add_argument(
+        "--islands", type=int, default=50, help="Island parts per province (default: 50)"
+    )
+    boundaries.add_argument(
+        "--invalid",
+        type=float,
+        default=0.0,
+        help="Share of island parts that self-intersect (default: 0)",
+    )
+    for command in (roads, boundaries):
+        command.add_argument(
+            "--seed", type=int, default=DEFAULT_SEED, help=f"Seed (default: {DEFAULT_SEED})"
+        )
+        geojson_io.add_arguments(command)
+    args = parser.parse_args()
+    geojson_io.configure(args)
+
+    output_dir = Path(args.output_dir)
+    start = time.perf_counter()
+    if args.command == "roads":
+        paths = write_roads(
+            output_dir,
+            files=args.files,
+            size_mb=None if args.features is not None else args.size_mb or 100,
+            features=args.features,
+            overlap=args.overlap,
+            seed=args.seed,
+        )
+    else:
+        paths = write_boundaries(
+            output_dir,
+            provinces=args.provinces,
+            vertices=args.vertices,
+            islands=args.islands,
+            invalid=args.invalid,
+            seed=args.seed,
+        )
+    total = sum(path.stat().st_size for path in paths)
+    elapsed = time.perf_counter() - start
+    print(f"💾 {len(paths)} files, {total / 1e6:.1f} MB in {output_dir} ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
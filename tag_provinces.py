@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Tag road features with the province they fall in.
+
+The province boundaries (boundaries-provinsi-pulau-jawa/*.geojson) are
+loaded once, repaired if needed, prepared and put in an STRtree. Features
+are then assigned a batch at a time:
+
+* ``anchor`` (default): the middle vertex of each feature is bbox-filtered
+  through ``STRtree.query`` and checked with a vectorized prepared
+  ``contains_xy``. No feature geometry is ever built, so this is the one
+  for ~10M roads.
+* ``intersects``: the full geometry goes through
+  ``STRtree.query(predicate="intersects")``; roads crossing a border go to
+  the province holding the longest stretch (largest area for polygons).
+
+Anything outside every province (piers, roads just past a simplified
+coastline) falls back to the nearest province within ``max_distance_m``.
+Tagged features get ``province`` (name) and ``province_code`` properties.
+merge_osm_results.py runs this while it streams its output
+(``--provinces``); this script tags an existing file.
+"""
+import argparse
+import itertools
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+try:
+    import numpy as np
+    import shapely
+except ImportError as exc:
+    raise SystemExit(
+        "Shapely is required. Install it with: pip install shapely"
+    ) from exc
+
+import geojson_io
+import instrumentation
+
+DEFAULT_BOUNDARY_DIR = Path("boundaries-provinsi-pulau-jawa")
+DEFAULT_MAX_DISTANCE_M = 1000.0
+DEFAULT_BATCH_SIZE = 20000
+METERS_PER_DEGREE = 111_320.0
+RULES = ("anchor", "intersects")
+UNASSIGNED = "unassigned"
+
+# Nesting depth of the first position inside "coordinates".
+_POSITION_DEPTH = {
+    "Point": 0,
+    "MultiPoint": 1,
+    "LineString": 1,
+    "MultiLineString": 2,
+    "Polygon": 2,
+    "MultiPolygon": 3,
+}
+
+
+class Province(NamedTuple):
+    slug: str
+    name: str
+    code: Optional[str]
+
+
+def _anchor(geometry: Optional[Dict]) -> Optional[List[float]]:
+    """Middle vertex of the first line/ring/point set, or None."""
+    if not geometry:
+        return None
+    depth = _POSITION_DEPTH.get(geometry.get("type"))
+    coords = geometry.get("coordinates")
+    if depth is None or not coords:
+        return None
+    for _ in range(depth - 1):
+        coords = coords[0]
+        if not coords:
+            return None
+    if depth:
+        coords = coords[len(coords) // 2]
+    return coords
+
+
+class ProvinceTagger:
+    """Assigns features to provinces; picklable for worker processes."""
+
+    def __init__(
+        self,
+        boundary_dir: Path = DEFAULT_BOUNDARY_DIR,
+        rule: str = "anchor",
+        max_distance_m: float = DEFAULT_MAX_DISTANCE_M,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        if rule not in RULES:
+            raise ValueError(f"Unknown assignment rule: {rule}")
+        self.boundary_dir = Path(boundary_dir)
+        self.rule = rule
+        self.max_distance_m = max_distance_m
+        self.batch_size = batch_size
+
+        files = sorted(self.boundary_dir.glob("*.geojson"))
+        if not files:
+            raise FileNotFoundError(f"No .geojson boundaries found in {self.boundary_dir}")
+        self.provinces: List[Province] = []
+        geoms = []
+        for file_path in files:
+            doc = geojson_io.load(file_path)
+            properties = doc.get("properties") or {}
+            self.provinces.append(Province(
+                file_path.stem, properties.get("name", file_path.stem), properties.get("code")
+            ))
+            geoms.append(shapely.from_geojson(
+                geojson_io.dumps(doc.get("geometry", doc), compact=True)
+            ))
+        geoms = np.array(geoms)
+        invalid = ~shapely.is_valid(geoms)
+        geoms[invalid] = shapely.make_valid(geoms[invalid])
+        shapely.prepare(geoms)
+        self._slugs = {p.code: p.slug for p in self.provinces if p.code is not None}
+        self.geoms = geoms
+        self.tree = shapely.STRtree(geoms)
+        self.reset_stats()
+
+    def __getstate__(self) -> Dict:
+        # Rebuilt on unpickling: prepared geometries and trees do not travel.
+        return {
+            "boundary_dir": self.boundary_dir,
+            "rule": self.rule,
+            "max_distance_m": self.max_distance_m,
+            "batch_size": self.batch_size,
+        }
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__init__(**state)
+
+    def reset_stats(self) -> None:
+        self.stats = {province.slug: 0 for province in self.provinces}
+        self.stats[UNASSIGNED] = 0
+
+    def describe(self) -> Dict:
+        """Settings that change the output (stored in the merge manifest)."""
+        return {
+            "provinces": [province.slug for province in self.provinces],
+            "rule": self.rule,
+            "max_distance_m": self.max_distance_m,
+        }
+
+    def __repr__(self) -> str:
+        return f"{len(self.provinces)} provinces from {self.boundary_dir} ({self.rule})"
+
+    def _nearest(self, geoms: np.ndarray, assigned: np.ndarray, pending: np.ndarray) -> None:
+        if not len(pending) or self.max_distance_m <= 0:
+            return
+        idx, tree_idx = self.tree.query_nearest(
+            geoms[pending], max_distance=self.max_distance_m / METERS_PER_DEGREE
+        )
+        # Ties return several rows per input; keep the first.
+        first = np.unique(idx, return_index=True)[1]
+        assigned[pending[idx[first]]] = tree_idx[first]
+
+    def _assign_anchor(self, features: List[Dict]) -> np.ndarray:
+        anchors = [_anchor(f.get("geometry")) for f in features]
+        has_anchor = np.array([a is not None for a in anchors], dtype=bool)
+        assigned = np.full(len(features), -1, dtype=np.int64)
+        if not has_anchor.any():
+            return assigned
+        xy = np.array([a[:2] for a in anchors if a is not None], dtype=np.float64)
+        rows = np.flatnonzero(has_anchor)
+        points = shapely.points(xy)
+        idx, tree_idx = self.tree.query(points)
+        for p in np.unique(tree_idx):
+            sel = idx[tree_idx == p]
+            sel = sel[assigned[rows[sel]] < 0]
+            hit = shapely.contains_xy(self.geoms[p], xy[sel, 0], xy[sel, 1])
+            assigned[rows[sel[hit]]] = p
+        pending = np.flatnonzero(assigned[rows] < 0)
+        sub = np.full(len(rows), -1, dtype=np.int64)
+        self._nearest(points, sub, pending)
+        fallback = rows[pending]
+        assigned[fallback] = sub[pending]
+        return assigned
+
+    def _assign_intersects(self, features: List[Dict]) -> np.ndarray:
+        geoms = shapely.from_geojson(
+            [
+                geojson_io.dumps(f["geometry"], compact=True) if f.get("geometry") else None
+                for f in features
+            ],
+            on_invalid="ignore",
+        )
+        assigned = np.full(len(features), -1, dtype=np.int64)
+        idx, tree_idx = self.tree.query(geoms, predicate="intersects")
+        single = np.bincount(idx, minlength=len(features)) == 1
+        one = single[idx]
+        assigned[idx[one]] = tree_idx[one]
+        shared = ~one
+        if shared.any():
+            # Border-crossing features: keep the province with the most of it.
+            pieces = shapely.intersection(geoms[idx[shared]], self.geoms[tree_idx[shared]])
+            share = np.where(
+                shapely.area(pieces) > 0, shapely.area(pieces), shapely.length(pieces)
+            )
+            order = np.lexsort((-share, idx[shared]))
+            first = order[np.unique(idx[shared][order], return_index=True)[1]]
+            assigned[idx[shared][first]] = tree_idx[shared][first]
+        pending = np.flatnonzero((assigned < 0) & np.not_equal(geoms, None))
+        self._nearest(geoms, assigned, pending)
+        return assigned
+
+    def assign(self, features: List[Dict]) -> np.ndarray:
+        """Province index per feature (into ``provinces``), -1 if none."""
+        if self.rule == "intersects":
+            return self._assign_intersects(features)
+        return self._assign_anchor(features)
+
+    def apply(self, features: List[Dict]) -> List[Dict]:
+        out = []
+        for feature, p in zip(features, self.assign(features).tolist()):
+            properties = dict(feature.get("properties") or {})
+            if p >= 0:
+                province = self.provinces[p]
+                properties["province"] = province.name
+                properties["province_code"] = province.code
+                self.stats[province.slug] += 1
+            else:
+                properties["province"] = None
+                properties["province_code"] = None
+                self.stats[UNASSIGNED] += 1
+            out.append(dict(feature, properties=properties))
+        return out
+
+    def iter_apply(self, features: Iterator[Dict]) -> Iterator[Dict]:
+        """Tag a feature stream, ``batch_size`` features at a time."""
+        features = iter(features)
+        while True:
+            batch = list(itertools.islice(features, self.batch_size))
+            if not batch:
+                return
+            yield from self.apply(batch)
+
+    def slug_for(self, feature: Dict) -> str:
+        """Output file key of a tagged feature."""
+        code = (feature.get("properties") or {}).get("province_code")
+        return self._slugs.get(code, UNASSIGNED)
+
+    def summary(self) -> str:
+        return ", ".join(f"{slug} {count}" for slug, count in self.stats.items() if count)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Add province/province_code properties to road features."
+    )
+    parser.add_argument(
+        "--input",
+        default="final-pulau-jawa/final_pulau_jawa.geojson",
+        help="Input GeoJSON/GeoJSONSeq (default: final-pulau-jawa/final_pulau_jawa.geojson)",
+    )
+    parser.add_argument("--output", required=True, help="Tagged output file")
+    parser.add_argument(
+        "--boundaries",
+        default=str(DEFAULT_BOUNDARY_DIR),
+        help=f"Directory of province boundaries (default: {DEFAULT_BOUNDARY_DIR})",
+    )
+    parser.add_argument(
+        "--rule",
+        choices=RULES,
+        default="anchor",
+        help="anchor = middle vertex, fast (default); intersects = full geometry",
+    )
+    parser.add_argument(
+        "--max-distance-m",
+        type=float,
+        default=DEFAULT_MAX_DISTANCE_M,
+        help=(
+            "Assign features outside every province to the nearest one within "
+            f"this distance (default: {DEFAULT_MAX_DISTANCE_M:g})"
+        ),
+    )
+    parser.add_argument(
+        "--split",
+        action="store_true",
+        help="Also write one <output>_<province>.<ext> file per province",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["geojson", "geojsonseq", "ndjson"],
+        default="geojson",
+        help="Output format (default: geojson)",
+    )
+    geojson_io.add_arguments(parser)
+    args = parser.parse_args()
+    geojson_io.configure(args)
+
+    from merge_osm_results import ProvinceOutputs, OUTPUT_FORMATS, iter_file_features
+
+    input_file = Path(args.input)
+    output_file = Path(args.output)
+    if not input_file.exists():
+        print(f"❌ Input file not found: {input_file}")
+        exit(1)
+    tagger = ProvinceTagger(Path(args.boundaries), args.rule, args.max_distance_m)
+    fmt = OUTPUT_FORMATS[args.format]
+    print(f"🗺️  Tagging: {input_file} ({tagger})")
+    start = time.perf_counter()
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    dumps = geojson_io.get_backend().dumps
+    splitter = ProvinceOutputs(output_file, fmt, tagger) if args.split else None
+    total = 0
+    with instrumentation.stage("tag") as tag_stage:
+        with output_file.open("wb") as out:
+            out.write(fmt.header)
+            for feature in tagger.iter_apply(iter_file_features(input_file)):
+                record = dumps(feature)
+                if total:
+                    out.write(fmt.separator)
+                out.write(fmt.prefix + record + fmt.suffix)
+                if splitter is not None:
+                    splitter.write(feature, record)
+                total += 1
+            out.write(fmt.footer)
+        tag_stage.features = total
+    if splitter is not None:
+        splitter.close()
+    elapsed = time.perf_counter() - start
+    print(f"   {total} features in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} features/s)")
+    print(f"   {tagger.summary()}")
+    print(f"💾 Saved to: {output_file}")
+    if splitter is not None:
+        for path in splitter.paths().values():
+            print(f"💾 Saved to: {path}")
+
+
+if __name__ == "__main__":
+    main()
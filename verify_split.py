@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 """
 Verify GeoJSON split files - Check struktur dan size
+
+FeatureCollections dan GeoJSONSeq (mis. final_pulau_jawa.geojson) dihitung
+statistiknya per feature lewat feature_stats.py, paralel dengan --workers.
 """
-import json
+import argparse
 import os
 import sys
 
+import geojson_io
+import instrumentation
+
 def format_size(bytes):
     """Format bytes to human readable"""
     for unit in ['B', 'KB', 'MB']:
@@ -20,8 +26,8 @@ def verify_geojson(file_path):
         return None
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Read-only: scan() skips decoding the coordinates when it can.
+        data = geojson_io.scan(file_path)
         
         size = os.path.getsize(file_path)
         
@@ -54,8 +60,75 @@ def verify_geojson(file_path):
             'valid': False
         }
 
+_SEQ_SUFFIXES = ('.geojsons', '.geojsonl', '.geojsonseq', '.ndjson')
+
+
+def is_collection(file_path):
+    """FeatureCollection / feature sequence: needs the per-feature stats"""
+    if file_path.endswith(_SEQ_SUFFIXES):
+        return True
+    from feature_stats import peek_type
+    return peek_type(file_path) == 'FeatureCollection'
+
+
+def print_collection_stats(file_path, workers, batch_size):
+    """Stream/partition a FeatureCollection and print its stats"""
+    from feature_stats import compute_stats
+
+    size = os.path.getsize(file_path)
+    stats, elapsed = compute_stats(file_path, workers=workers, batch_size=batch_size)
+    rate = 1 / elapsed if elapsed > 0 else 0.0
+    
+    print(f"   Size: {format_size(size)}")
+    print(f"   Features: {stats.features}")
+    types = ', '.join(f"{name} {count}" for name, count in stats.types.most_common())
+    print(f"   Geometry Types: {types or '-'}")
+    print(f"   Vertices: {stats.vertices}")
+    bounds = stats.to_dict()['bounds']
+    if bounds:
+        print(f"   Bounds: lon({bounds[0]:.4f} - {bounds[2]:.4f}), "
+              f"lat({bounds[1]:.4f} - {bounds[3]:.4f})")
+    if stats.highways:
+        print(f"   Length per highway:")
+        for highway, count in stats.highways.most_common():
+            print(f"      • {highway or '(none)'}: {count} features, "
+                  f"{stats.length_m[highway] / 1000:.1f} km")
+    
+    problems = stats.invalid + stats.null_geometries + stats.errors
+    if problems:
+        print(f"   ⚠️  Invalid geometry: {stats.invalid}, "
+              f"null/unreadable geometry: {stats.null_geometries}, "
+              f"unreadable records: {stats.errors}")
+    else:
+        print(f"   ✓ Semua geometry valid")
+    print(f"   Elapsed: {elapsed:.1f}s ({size * rate / 1e6:.1f} MB/s, "
+          f"{stats.features * rate:.0f} features/s)")
+    return size, stats
+
+
 def main():
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(
+        description="Verify GeoJSON split files and FeatureCollection outputs."
+    )
+    parser.add_argument('files', nargs='*', help="GeoJSON files (default: split files in results/)")
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help="Processes for FeatureCollection stats (default: 1; 0 = all CPUs)",
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=20000,
+        help="Features decoded per batch (default: 20000)",
+    )
+    geojson_io.add_arguments(parser)
+    args = parser.parse_args()
+    geojson_io.configure(args)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    
+    if not args.files:
         # Look for split files
         base_patterns = [
             'results/jawa_barat_split',
@@ -77,7 +150,7 @@ def main():
         
         files = found_files
     else:
-        files = sys.argv[1:]
+        files = args.files
     
     print("\n" + "="*70)
     print("  📊 GeoJSON SPLIT VERIFICATION")
@@ -85,10 +158,24 @@ def main():
     
     total_size = 0
     total_polygons = 0
+    total_features = 0
     
     for file_path in files:
         print(f"📄 {file_path}")
-        result = verify_geojson(file_path)
+        if os.path.exists(file_path) and is_collection(file_path):
+            try:
+                with instrumentation.stage("stats") as stats_stage:
+                    size, stats = print_collection_stats(file_path, workers, args.batch_size)
+                    stats_stage.features = stats.features
+            except (OSError, ValueError) as e:
+                print(f"   ❌ Error: {e}\n")
+                continue
+            total_size += size
+            total_features += stats.features
+            print()
+            continue
+        with instrumentation.stage("verify"):
+            result = verify_geojson(file_path)
         
         if result is None:
             print(f"   ❌ File tidak ditemukan\n")
@@ -131,6 +218,8 @@ def main():
     print(f"Files analyzed: {len(files)}")
     print(f"Total size: {format_size(total_size)}")
     print(f"Total polygons: {total_polygons}")
+    if total_features:
+        print(f"Total features: {total_features}")
     print()
     
     if total_size < 100_000_000:  # Less than 100MB